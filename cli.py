@@ -5,13 +5,8 @@ import sys
 import os
 from pathlib import Path
 
-# Import individual pipeline components for legacy functionality
-from pipeline.cs_parser import parse_cs_file, serialize_to_json
-from pipeline.enrich import enrich_ast
-from pipeline.insert_graph import ingest_enriched_json
-
-# Import for batch mode ETL pipeline
-from pipeline.run_etl import ETLRunner, run_etl_pipeline
+# Pipeline components are imported by the mode that uses them, so argument
+# errors and --help don't pay for the parser, LLM client and Neo4j driver
 
 # Import centralized logging module
 from logs.logger import get_logger, configure_root_logger
@@ -73,6 +68,7 @@ def main():
         if args.batch or input_path.lower().endswith('.zip'):
             # Use the batch ETL pipeline
             logger.info(f"Starting batch ETL pipeline for {input_path}")
+            from pipeline.run_etl import run_etl_pipeline
             
             try:
                 # Run the ETL pipeline with provided options
@@ -104,6 +100,9 @@ def main():
         else:
             # Original single file mode
             logger.info(f"Using legacy mode for processing {input_path}")
+            from pipeline.cs_parser import parse_cs_file, serialize_to_json
+            from pipeline.enrich import enrich_ast
+            from pipeline.insert_graph import ingest_enriched_json
             
             # Collect .cs files from the given path
             if os.path.isdir(input_path):
@@ -11,17 +11,26 @@ This module implements task D4 from the batch ETL requirements.
 
 import os
 import sys
-import json
+import heapq
+import queue
+import atexit
 import logging
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Any, Dict, Optional, Union
 
+import orjson
+
 # Constants for log directories
-PROJECT_ROOT = Path(__file__).parent.parent.absolute()
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
 ETL_LOG_DIR = PROJECT_ROOT / 'logs' / 'etl'
 LLM_LOG_DIR = PROJECT_ROOT / 'logs' / 'llm_raw'
 
+# Log files stay indented for reading; int keys are written as strings like
+# the standard json module does
+JSON_LOG_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
 # Create log directories if they don't exist
 ETL_LOG_DIR.mkdir(parents=True, exist_ok=True)
 LLM_LOG_DIR.mkdir(parents=True, exist_ok=True)
@@ -30,6 +39,14 @@ LLM_LOG_DIR.mkdir(parents=True, exist_ok=True)
 PIPELINE_LOG_FILE = PROJECT_ROOT / 'pipeline_run.log'
 ETL_SUMMARY_PATTERN = "etl_run_{}.json"  # Formatted with timestamp
 LLM_OUTPUT_PATTERN = "llm_response_{}.json"  # Formatted with timestamp + identifier
+LLM_BATCH_LOG_PATTERN = "llm_responses_{}.jsonl"  # Formatted with date; one record per line
+
+# Background writer for raw LLM logs (see queue_llm_raw_output)
+LLM_LOG_QUEUE_SIZE = 1000
+LLM_LOG_BATCH_SIZE = 32
+_LLM_LOG_QUEUE: "queue.Queue[tuple]" = queue.Queue(maxsize=LLM_LOG_QUEUE_SIZE)
+_llm_log_thread: Optional[threading.Thread] = None
+_llm_log_lock = threading.Lock()
 
 
 def get_logger(name: str, level: int = logging.INFO) -> logging.Logger:
@@ -82,22 +99,23 @@ def configure_root_logger(level: int = logging.INFO) -> None:
     )
 
 
-def log_etl_summary(run_id: str, data: Dict[str, Any]) -> str:
+def log_etl_summary(run_id: str, data: Dict[str, Any], log_dir: Optional[Union[str, Path]] = None) -> str:
     """
     Log ETL run summary data to a JSON file in the ETL log directory.
     
     Args:
         run_id: Unique identifier for the ETL run (typically timestamp)
         data: Dict containing ETL run statistics and metadata
+        log_dir: Directory to write the summary to (defaults to logs/etl/)
     
     Returns:
         Path to the created log file
     """
-    log_file = ETL_LOG_DIR / ETL_SUMMARY_PATTERN.format(run_id)
+    log_file = Path(log_dir or ETL_LOG_DIR) / ETL_SUMMARY_PATTERN.format(run_id)
     
     try:
-        with open(log_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
+        with open(log_file, 'wb') as f:
+            f.write(orjson.dumps(data, option=JSON_LOG_OPTIONS))
         
         logger = get_logger(__name__)
         logger.info(f"ETL run summary saved to: {log_file}")
@@ -109,44 +127,77 @@ def log_etl_summary(run_id: str, data: Dict[str, Any]) -> str:
         return ""
 
 
-def log_llm_raw_output(
-    request_data: Dict[str, Any], 
-    response_data: Dict[str, Any], 
+def _llm_log_record(
+    request_data: Dict[str, Any],
+    response_data: Dict[str, Any],
     identifier: Optional[str] = None,
     run_id: Optional[str] = None
-) -> str:
+) -> Dict[str, Any]:
     """
-    Log raw LLM request and response data to a JSON file.
+    Build the logged form of one LLM request/response pair.
     
     Args:
         request_data: The request sent to the LLM API
         response_data: The raw response received from the LLM API
-        identifier: Optional identifier for the specific LLM call (e.g., class/method name)
-        run_id: Optional ETL run ID to associate with the LLM call
-              (defaults to current timestamp if not provided)
+        identifier: Optional identifier for the specific LLM call
+        run_id: Optional ETL run ID (defaults to the current timestamp)
     
     Returns:
-        Path to the created log file
+        Dict with the timestamp, run_id, identifier, request and response
     """
     # Generate run_id if not provided
     if not run_id:
         run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
     
-    # Create identifier string
-    id_str = f"_{identifier}" if identifier else ""
-    log_file = LLM_LOG_DIR / LLM_OUTPUT_PATTERN.format(f"{run_id}{id_str}")
-    
-    log_data = {
+    return {
         "timestamp": datetime.now().isoformat(),
         "run_id": run_id,
         "identifier": identifier,
         "request": request_data,
         "response": response_data
     }
+
+
+def _llm_log_name(log_data: Dict[str, Any]) -> str:
+    """
+    Name under which an LLM log record is written or listed.
+    
+    Args:
+        log_data: Record built by _llm_log_record
+    
+    Returns:
+        File name of the form llm_response_<run_id>[_<identifier>].json
+    """
+    # Create identifier string
+    id_str = f"_{log_data['identifier']}" if log_data.get("identifier") else ""
+    return LLM_OUTPUT_PATTERN.format(f"{log_data['run_id']}{id_str}")
+
+
+def log_llm_raw_output(
+    request_data: Dict[str, Any], 
+    response_data: Dict[str, Any], 
+    identifier: Optional[str] = None,
+    run_id: Optional[str] = None
+) -> str:
+    """
+    Log raw LLM request and response data to a JSON file.
+    
+    Args:
+        request_data: The request sent to the LLM API
+        response_data: The raw response received from the LLM API
+        identifier: Optional identifier for the specific LLM call (e.g., class/method name)
+        run_id: Optional ETL run ID to associate with the LLM call
+              (defaults to current timestamp if not provided)
+    
+    Returns:
+        Path to the created log file
+    """
+    log_data = _llm_log_record(request_data, response_data, identifier, run_id)
+    log_file = LLM_LOG_DIR / _llm_log_name(log_data)
     
     try:
-        with open(log_file, 'w', encoding='utf-8') as f:
-            json.dump(log_data, f, indent=2)
+        with open(log_file, 'wb') as f:
+            f.write(orjson.dumps(log_data, option=JSON_LOG_OPTIONS))
         
         logger = get_logger(__name__)
         logger.debug(f"LLM raw output saved to: {log_file}")
@@ -158,6 +209,105 @@ def log_llm_raw_output(
         return ""
 
 
+def _write_llm_log_batch(batch: list) -> None:
+    """
+    Append a batch of queued LLM log records to the day's JSONL log.
+    
+    The whole batch is serialized up front and written with a single append,
+    rather than one file per record.
+    
+    Args:
+        batch: Queued (request_data, response_data, identifier, run_id) tuples
+    """
+    log_file = LLM_LOG_DIR / LLM_BATCH_LOG_PATTERN.format(datetime.now().strftime("%Y%m%d"))
+    lines = b"".join(
+        orjson.dumps(_llm_log_record(*item), option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+        for item in batch
+    )
+    try:
+        with open(log_file, 'ab') as f:
+            f.write(lines)
+        get_logger(__name__).debug(f"{len(batch)} LLM raw outputs appended to: {log_file}")
+    except Exception as e:
+        get_logger(__name__).error(f"Failed to save {len(batch)} LLM raw outputs: {e}")
+
+
+def _drain_llm_log_queue() -> None:
+    """
+    Consume queued LLM log records forever, writing them in batches.
+    """
+    while True:
+        batch = [_LLM_LOG_QUEUE.get()]
+        while len(batch) < LLM_LOG_BATCH_SIZE:
+            try:
+                batch.append(_LLM_LOG_QUEUE.get_nowait())
+            except queue.Empty:
+                break
+        
+        try:
+            _write_llm_log_batch(batch)
+        finally:
+            for _ in batch:
+                _LLM_LOG_QUEUE.task_done()
+
+
+def _ensure_llm_log_writer() -> None:
+    """
+    Start the background LLM log writer thread on first use.
+    """
+    global _llm_log_thread
+    
+    if _llm_log_thread is not None:
+        return
+    with _llm_log_lock:
+        if _llm_log_thread is None:
+            _llm_log_thread = threading.Thread(
+                target=_drain_llm_log_queue, name="llm-log-writer", daemon=True
+            )
+            _llm_log_thread.start()
+            atexit.register(flush_llm_log_queue)
+
+
+def queue_llm_raw_output(
+    request_data: Dict[str, Any], 
+    response_data: Dict[str, Any], 
+    identifier: Optional[str] = None,
+    run_id: Optional[str] = None
+) -> bool:
+    """
+    Queue raw LLM request/response data to be written by a background thread.
+    
+    Non-blocking counterpart of log_llm_raw_output for use on the LLM call
+    path. If the queue is full the record is dropped with a warning rather
+    than stalling the caller.
+    
+    Args:
+        request_data: The request sent to the LLM API
+        response_data: The raw response received from the LLM API
+        identifier: Optional identifier for the specific LLM call
+        run_id: Optional ETL run ID to associate with the LLM call
+    
+    Returns:
+        True if the record was queued, False if it was dropped
+    """
+    _ensure_llm_log_writer()
+    
+    try:
+        _LLM_LOG_QUEUE.put_nowait((request_data, response_data, identifier, run_id))
+        return True
+    except queue.Full:
+        get_logger(__name__).warning(f"LLM log queue full, dropping record: {identifier}")
+        return False
+
+
+def flush_llm_log_queue() -> None:
+    """
+    Block until every queued LLM log record has been written.
+    """
+    if _llm_log_thread is not None and _llm_log_thread.is_alive():
+        _LLM_LOG_QUEUE.join()
+
+
 def get_etl_logs(limit: int = 10) -> Dict[str, Dict]:
     """
     Get the most recent ETL run logs.
@@ -177,8 +327,8 @@ def get_etl_logs(limit: int = 10) -> Dict[str, Dict]:
         
         # Take only the requested number of logs
         for log_file in etl_files[:limit]:
-            with open(log_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(log_file, 'rb') as f:
+                data = orjson.loads(f.read())
                 run_id = data.get('run_id', log_file.stem.replace('etl_run_', ''))
                 logs[run_id] = data
                 
@@ -190,6 +340,27 @@ def get_etl_logs(limit: int = 10) -> Dict[str, Dict]:
         return {}
 
 
+def _iter_llm_logs():
+    """
+    Yield every logged LLM call with its time and listing name.
+    
+    Covers both the batched JSONL logs and per-call JSON files written by
+    log_llm_raw_output.
+    
+    Yields:
+        Tuple of (POSIX time, log name, record dict or path of a per-call file)
+    """
+    for log_file in LLM_LOG_DIR.glob("llm_response_*.json"):
+        yield os.path.getmtime(log_file), log_file.name, log_file
+    for log_file in LLM_LOG_DIR.glob("llm_responses_*.jsonl"):
+        with open(log_file, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                data = orjson.loads(line)
+                yield datetime.fromisoformat(data["timestamp"]).timestamp(), _llm_log_name(data), data
+
+
 def get_llm_logs(run_id: Optional[str] = None, limit: int = 10) -> Dict[str, Dict]:
     """
     Get LLM raw output logs, optionally filtered by run_id.
@@ -199,26 +370,22 @@ def get_llm_logs(run_id: Optional[str] = None, limit: int = 10) -> Dict[str, Dic
         limit: Maximum number of logs to return (default: 10)
     
     Returns:
-        Dict mapping log filenames to their LLM log data
+        Dict mapping log names (llm_response_<run_id>[_<identifier>].json)
+        to their LLM log data, newest first
     """
     logs = {}
     
     try:
-        if run_id:
-            # Filter logs for the specific run
-            llm_files = list(LLM_LOG_DIR.glob(f"llm_response_{run_id}*.json"))
-        else:
-            # Get all logs
-            llm_files = list(LLM_LOG_DIR.glob("llm_response_*.json"))
-            
-        # Sort by modification time (newest first)
-        llm_files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
+        # Filter logs for the specific run, if one was given
+        prefix = f"llm_response_{run_id}" if run_id else "llm_response_"
+        entries = [entry for entry in _iter_llm_logs() if entry[1].startswith(prefix)]
         
-        # Take only the requested number of logs
-        for log_file in llm_files[:limit]:
-            with open(log_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                logs[log_file.name] = data
+        # Take only the requested number of logs, newest first
+        for _, name, data in heapq.nlargest(limit, entries, key=lambda entry: entry[0]):
+            if isinstance(data, Path):
+                with open(data, 'rb') as f:
+                    data = orjson.loads(f.read())
+            logs[name] = data
                 
         return logs
         
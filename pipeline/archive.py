@@ -57,9 +57,6 @@ def archive_processed_files(raw_dir: str = None,
     archive_subdir = os.path.join(archive_dir, f"run_{run_id}")
     
     try:
-        # Create the archive subdirectory
-        Path(archive_subdir).mkdir(parents=True, exist_ok=True)
-        
         # Check if raw directory exists
         if not os.path.exists(raw_dir):
             logger.warning(f"Raw directory not found: {raw_dir}")
@@ -72,6 +69,22 @@ def archive_processed_files(raw_dir: str = None,
             logger.info(f"No files to archive in {raw_dir}")
             return 0, []
             
+        # On the same filesystem a rename is a metadata update, so moving
+        # raw/ itself archives everything in one call without copying
+        same_device = os.stat(raw_dir).st_dev == os.stat(archive_dir).st_dev
+        if same_device and not os.path.exists(archive_subdir):
+            try:
+                os.rename(raw_dir, archive_subdir)
+                Path(raw_dir).mkdir(parents=True, exist_ok=True)
+                logger.info(f"Archived {len(raw_items)} items to {archive_subdir}")
+                return len(raw_items), raw_items
+            except OSError as e:
+                logger.warning(f"Could not move {raw_dir} as a whole, archiving item by item: {e}")
+                Path(raw_dir).mkdir(parents=True, exist_ok=True)
+                
+        # Create the archive subdirectory
+        Path(archive_subdir).mkdir(parents=True, exist_ok=True)
+        
         # Archive each item (file or directory)
         archived_items = []
         
@@ -80,8 +93,13 @@ def archive_processed_files(raw_dir: str = None,
             dst_path = os.path.join(archive_subdir, item)
             
             try:
+                # Same filesystem: rename in place. Across filesystems, copy
+                # then delete; shutil already copies file data in-kernel
+                # (os.sendfile on Linux), so no user-space buffer is involved.
+                if same_device:
+                    os.rename(src_path, dst_path)
                 # If it's a directory, copy the whole tree
-                if os.path.isdir(src_path):
+                elif os.path.isdir(src_path):
                     shutil.copytree(src_path, dst_path)
                     # After successful copy, remove the source directory
                     shutil.rmtree(src_path)
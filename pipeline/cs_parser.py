@@ -3,10 +3,10 @@
 import sys
 import os
 import logging
-import json
 import traceback
 # Third-party imports
-from antlr4 import FileStream, CommonTokenStream
+import orjson
+from antlr4 import InputStream, CommonTokenStream
 
 # Local application imports
 from generated.csharp.CSharpLexer import CSharpLexer
@@ -16,6 +16,25 @@ from generated.csharp.CSharpParserVisitor import CSharpParserVisitor
 # Set up logger for this module
 logger = logging.getLogger(__name__)
 
+# Small source covering the common declarations, parsed once per process to
+# fill ANTLR's shared prediction caches before real files arrive
+_WARM_UP_SOURCE = """
+using System;
+namespace Warm.Up
+{
+    public interface IShape { double Area(); }
+    public enum Kind { Square, Circle }
+    public struct Point { public int X; public int Y; }
+    public class Square : IShape
+    {
+        private readonly double _side;
+        public Square(double side) { _side = side; }
+        public double Side { get; set; }
+        public double Area() { return _side * _side; }
+    }
+}
+"""
+
 
 class ASTCollector(CSharpParserVisitor):
     """Visitor to collect AST nodes from a C# parse tree."""
@@ -842,7 +861,12 @@ def parse_cs_file(file_path: str) -> list[dict]:
     """
     try:
         logger.info(f"Starting to parse file: {file_path}")
-        data = FileStream(file_path, encoding="utf-8")
+        # Read once as bytes and decode as utf-8-sig, so the byte order mark
+        # Visual Studio writes is not handed to the lexer as a character
+        with open(file_path, "rb") as f:
+            source = f.read().decode("utf-8-sig")
+        data = InputStream(source)
+        data.name = file_path
         lexer = CSharpLexer(data)
         stream = CommonTokenStream(lexer)
         parser = CSharpParser(stream)
@@ -853,34 +877,24 @@ def parse_cs_file(file_path: str) -> list[dict]:
         try:
             visitor.visit(tree)
             
-            # Count all nodes including nested ones
-            def count_nodes(node_list):
-                count = len(node_list)
+            # Count all nodes including nested ones, and the types of entities
+            # found, in one walk over an explicit stack of node lists
+            total_nodes = 0
+            entity_types = {}
+            pending = [visitor.nodes["statements"]]
+            while pending:
+                node_list = pending.pop()
+                total_nodes += len(node_list)
                 for node in node_list:
+                    if "type" in node:
+                        entity_types[node["type"]] = entity_types.get(node["type"], 0) + 1
                     if "body" in node:
-                        count += count_nodes(node["body"])
+                        pending.append(node["body"])
                     elif "members" in node:
-                        count += len(node["members"])
-                return count
+                        total_nodes += len(node["members"])
             
-            total_nodes = count_nodes(visitor.nodes["statements"])
             logger.info(f"Parsing completed. Found {total_nodes} total nodes across all structures.")
             logger.debug(f"Top-level nodes: {len(visitor.nodes['statements'])}")
-            
-            # Log types of entities found
-            entity_types = {}
-            def collect_entity_types(node_list):
-                for node in node_list:
-                    if "type" in node:
-                        entity_type = node["type"]
-                        if entity_type not in entity_types:
-                            entity_types[entity_type] = 0
-                        entity_types[entity_type] += 1
-                    
-                    if "body" in node:
-                        collect_entity_types(node["body"])
-            
-            collect_entity_types(visitor.nodes["statements"])
             logger.info(f"Found entity types: {entity_types}")
             
             logger.debug(f"Nodes: {visitor.nodes}")
@@ -899,13 +913,30 @@ def parse_cs_file(file_path: str) -> list[dict]:
         raise
 
 
+def warm_up_parser() -> None:
+    """
+    Prime the ANTLR lexer and parser in the current process.
+    
+    ANTLR keeps its prediction DFAs at class level and grows them as input
+    is parsed, so the first files a process sees are parsed slowest. Parsing
+    a small representative source up front moves that cost out of the
+    per-file path; worker processes call this once when they start.
+    """
+    try:
+        lexer = CSharpLexer(InputStream(_WARM_UP_SOURCE))
+        parser = CSharpParser(CommonTokenStream(lexer))
+        parser.compilation_unit()
+    except Exception as e:
+        logger.warning(f"Parser warm-up failed: {str(e)}")
+
+
 def serialize_to_json(ast_nodes: list[dict], output_path: str) -> None:
     """
     Serialize AST nodes to a JSON file.
     
     This function takes the parsed AST nodes and writes them to a JSON file
-    for persistence or further processing. The JSON is formatted with indentation
-    for readability.
+    for persistence or further processing. The JSON is written compactly,
+    without indentation, and is encoded by orjson and written in a single call.
     
     Args:
         ast_nodes: List of AST node dictionaries containing parsed C# entities
@@ -919,10 +950,10 @@ def serialize_to_json(ast_nodes: list[dict], output_path: str) -> None:
         # Log the start of serialization process
         logger.info(f"Serializing {len(ast_nodes)} nodes to {output_path}")
         
-        # Open file with UTF-8 encoding to properly handle C# symbols
-        with open(output_path, "w", encoding="utf-8") as f:
-            # Write with indentation for human readability
-            json.dump(ast_nodes, f, indent=2)
+        # Compact output; orjson emits UTF-8, so C# symbols are preserved as-is
+        payload = orjson.dumps(ast_nodes, option=orjson.OPT_APPEND_NEWLINE)
+        with open(output_path, "wb") as f:
+            f.write(payload)
             
         # Log successful completion
         logger.info(f"Serialization complete. Output file created: {output_path}")
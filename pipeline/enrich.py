@@ -6,40 +6,147 @@ with additional metadata using Large Language Models (LLMs).
 The enrichment process adds summaries, dependencies, and tags to the AST nodes.
 """
 import os
-import json
+import functools
+import hashlib
+import threading
+import ijson
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 import logging
 import re
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime
+from types import GeneratorType, SimpleNamespace
 from dotenv import load_dotenv
+from json_repair import repair_json
 
 # Import centralized logging module
-from logs.logger import get_logger, log_llm_raw_output
+from logs.logger import get_logger, queue_llm_raw_output
 
 # Get logger for this module
 logger = get_logger(__name__)
 
-# Load environment variables from the .env file
-# These contain API endpoints and model configurations
-# Force reload the environment to ensure we get fresh values
-import os
-for key in ['LLM_MODEL', 'OLLAMA_BASE_URL', 'LLM_PROVIDER']:
-    if key in os.environ:
-        del os.environ[key]
+# Shared HTTP session so Ollama calls reuse keep-alive connections
+# (requests.Session is safe for concurrent independent requests)
+_SESSION = requests.Session()
+# Kept-alive connections per host, and distinct LLM hosts kept pooled
+_HTTP_POOL_SIZE = 16
+_HTTP_POOL_HOSTS = 4
+_http_adapter: HTTPAdapter | None = None
+_http_pool_size = 0
+_http_pool_lock = threading.Lock()
+
+
+def _ensure_http_pool(size: int, hosts: int = _HTTP_POOL_HOSTS) -> None:
+    """
+    Grow the shared session's connection pool to at least `size` connections per host.
+    
+    Connections returned to a full pool are closed, so the pool has to be
+    at least as large as the number of concurrent requests for every call
+    to reuse one. The pool only ever grows; the adapter it replaces is
+    closed so its pooled sockets are released.
+    
+    Args:
+        size (int): Kept-alive connections per host
+        hosts (int): Number of per-host pools to keep
+    """
+    global _http_adapter, _http_pool_size
+    if size <= _http_pool_size:
+        return
+    with _http_pool_lock:
+        if size <= _http_pool_size:
+            return
+        previous = _http_adapter
+        adapter = HTTPAdapter(pool_connections=hosts, pool_maxsize=size, max_retries=0)
+        _SESSION.mount("http://", adapter)
+        _SESSION.mount("https://", adapter)
+        _http_adapter, _http_pool_size = adapter, size
+    if previous is not None:
+        previous.close()
+
+
+def _enrichment_executor(workers: int) -> ThreadPoolExecutor:
+    """
+    Create a thread pool for concurrent LLM calls, with a matching HTTP pool.
+    
+    Args:
+        workers (int): Number of worker threads
+        
+    Returns:
+        ThreadPoolExecutor: The new executor
+    """
+    _ensure_http_pool(workers)
+    return ThreadPoolExecutor(max_workers=workers)
 
-load_dotenv(override=True)  # Override any existing environment variables
-OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")  # Base URL for the Ollama API
-LLM_MODEL = os.getenv("LLM_MODEL", "deepseek-coder:1.3b")  # Use deepseek-coder as default
 
-# Clean up the LLM_MODEL in case it has comments
-if LLM_MODEL and '#' in LLM_MODEL:
-    LLM_MODEL = LLM_MODEL.split('#')[0].strip()
+_ensure_http_pool(_HTTP_POOL_SIZE)
 
-# Debug logging for environment variables
-logger.info(f"Environment - OLLAMA_BASE_URL: {OLLAMA_BASE_URL}")
-logger.info(f"Environment - LLM_MODEL: {repr(LLM_MODEL)}")
-logger.info(f"Environment - Full URL will be: {OLLAMA_BASE_URL}/api/generate")
+
+@functools.lru_cache(maxsize=1)
+def _config() -> SimpleNamespace:
+    """
+    Resolve LLM settings from the environment, loading .env on first use.
+    
+    Evaluated lazily (once per process) so importing this module does no
+    file I/O and worker processes started with a configured environment
+    keep it.
+    
+    Returns:
+        SimpleNamespace: base_url, model, ctx_bytes, workers, method_batch, cache_dir and mock_mode settings
+    """
+    load_dotenv(override=False)
+    
+    model = os.getenv("LLM_MODEL", "deepseek-coder:1.3b")  # Use deepseek-coder as default
+    # Clean up the model name in case it has comments
+    if model and '#' in model:
+        model = model.split('#')[0].strip()
+    
+    config = SimpleNamespace(
+        base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),  # Base URL for the Ollama API
+        model=model,
+        # Prompt size budget in characters (~4 characters per token); larger
+        # whole-AST prompts are split into several LLM calls
+        ctx_bytes=int(os.getenv("LLM_CTX_BYTES", "12000")),
+        # Concurrent enrichment requests; match the server's OLLAMA_NUM_PARALLEL
+        workers=int(os.getenv("ENRICH_WORKERS") or os.getenv("OLLAMA_NUM_PARALLEL") or "8"),
+        # Methods enriched per LLM call; 1 sends one prompt per method
+        method_batch=max(1, int(os.getenv("ENRICH_METHOD_BATCH", "8"))),
+        # On-disk cache of LLM enrichment results, reused across runs
+        cache_dir=os.getenv("ENRICH_CACHE_DIR", os.path.join(os.path.dirname(__file__), '..', '.enrich_cache')),
+        # Mock enrichment instead of calling the LLM
+        mock_mode=os.getenv("MOCK_ENRICHMENT", "false").strip().lower() == "true"
+    )
+    
+    # Debug logging for environment variables
+    logger.info(f"Environment - OLLAMA_BASE_URL: {config.base_url}")
+    logger.info(f"Environment - LLM_MODEL: {repr(config.model)}")
+    logger.info(f"Environment - Full URL will be: {config.base_url}/api/generate")
+    return config
+
+
+_PROMPT_TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), '..', 'prompt_templates')
+
+
+@functools.lru_cache(maxsize=None)
+def _load_prompt_template(name: str) -> str | None:
+    """
+    Read a prompt template from prompt_templates/, once per process.
+    
+    Args:
+        name (str): File name of the template
+        
+    Returns:
+        str | None: Template text, or None if the file does not exist
+    """
+    try:
+        with open(os.path.join(_PROMPT_TEMPLATE_DIR, name), "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
 
 
 def build_prompt(ast_nodes: list[dict]) -> str:
@@ -61,16 +168,91 @@ def build_prompt(ast_nodes: list[dict]) -> str:
         Exception: If the template file cannot be read or processed
     """
     try:
-        # Open the template file containing the prompt structure
-        with open("prompt_templates/csharp_enrich_prompt.txt", "r", encoding="utf-8") as f:
-            template = f.read()
+        # Template containing the prompt structure, read once per process
+        template = _load_prompt_template("csharp_enrich_prompt.txt")
+        if template is None:
+            raise FileNotFoundError("prompt_templates/csharp_enrich_prompt.txt not found")
         # Replace the placeholder with the actual AST JSON data
-        return template.replace("{{AST_JSON}}", json.dumps(ast_nodes, indent=2))
+        return template.replace("{{AST_JSON}}", orjson.dumps(ast_nodes).decode())
     except Exception as e:
         logger.error(f"Error reading prompt template: {e}")
         raise
 
 
+def _splittable_nodes(ast_nodes: list[dict]) -> list[dict]:
+    """
+    Find the level at which an oversized AST can be split into several calls.
+    
+    A lone top-level namespace or class (the usual shape of a C# file) is
+    replaced by its body members, repeatedly, until there is more than one
+    node to split between or nothing left to descend into.
+    
+    Args:
+        ast_nodes (list[dict]): List of AST node dictionaries
+        
+    Returns:
+        list[dict]: The nodes to group into separate LLM calls
+    """
+    while len(ast_nodes) == 1 and ast_nodes[0].get(_TYPE) in _CONTAINER_TYPES and ast_nodes[0].get(_BODY):
+        ast_nodes = ast_nodes[0][_BODY]
+    return ast_nodes
+
+
+def _call_llm_chunked(ast_nodes: list[dict], prompt_length: int) -> dict:
+    """
+    Split an oversized AST into groups that fit the prompt budget and
+    enrich each group separately, merging the results.
+    
+    Args:
+        ast_nodes (list[dict]): List of AST node dictionaries to analyze
+        prompt_length (int): Length of the full, oversized prompt
+        
+    Returns:
+        dict: Raw-response-shaped dict whose "response" holds the merged JSON
+    """
+    node_sizes = [len(orjson.dumps(node)) for node in ast_nodes]
+    # Template text around {{AST_JSON}}, plus separators, is constant per call
+    overhead = prompt_length - sum(node_sizes)
+    budget = max(_config().ctx_bytes - overhead, 1)
+    
+    groups = []
+    current, current_size = [], 0
+    for node, size in zip(ast_nodes, node_sizes):
+        if current and current_size + size > budget:
+            groups.append(current)
+            current, current_size = [], 0
+        current.append(node)
+        current_size += size
+    if current:
+        groups.append(current)
+    
+    logger.info(f"Prompt of {prompt_length} characters exceeds budget of {_config().ctx_bytes}; "
+                f"splitting {len(ast_nodes)} nodes into {len(groups)} LLM calls")
+    
+    summaries, tags, dependencies, errors = [], {}, {}, []
+    for group in groups:
+        raw_response = call_llm(group)
+        if raw_response.get("error"):
+            errors.append(raw_response["error"])
+            continue
+        enriched = extract_enriched_data(raw_response)
+        if enriched.get("summary"):
+            summaries.append(enriched["summary"])
+        # dicts keep first-seen order while dropping duplicates
+        tags.update(dict.fromkeys(t for t in enriched.get("tags", []) if isinstance(t, str)))
+        dependencies.update(dict.fromkeys(d for d in enriched.get("dependencies", []) if isinstance(d, str)))
+    
+    merged = {
+        "summary": "; ".join(summaries),
+        "tags": list(tags),
+        "dependencies": list(dependencies)
+    }
+    result = {"response": orjson.dumps(merged).decode(), "chunks": len(groups)}
+    if errors:
+        result["errors"] = errors
+    return result
+
+
 def call_llm(ast_nodes: list[dict]) -> dict:
     """
     Calls the LLM with our prompt and returns raw JSON response.
@@ -91,13 +273,25 @@ def call_llm(ast_nodes: list[dict]) -> dict:
     Raises:
         requests.RequestException: If the API call fails
     """
+    # A byte-identical AST seen before (e.g. an unchanged file on a re-run)
+    # reuses the earlier response
+    cache_key = _cache_key("ast", ast_nodes)
+    cached = _cache_load(cache_key)
+    if cached is not None:
+        logger.info("Using cached LLM response for identical AST")
+        return cached
+    
     # Generate the prompt using the AST nodes
     prompt = build_prompt(ast_nodes)
     logger.debug(f"Prompt length: {len(prompt)} characters")
+    if len(prompt) > _config().ctx_bytes:
+        split_nodes = _splittable_nodes(ast_nodes)
+        if len(split_nodes) > 1:
+            return _call_llm_chunked(split_nodes, len(prompt))
     
     # Configure the payload for the Ollama API request
     payload = {
-        "model": LLM_MODEL,                 # Model to use for generation
+        "model": _config().model,                 # Model to use for generation
         "prompt": prompt,                   # The prompt containing instructions and AST
         "stream": False,                    # Get complete response at once, not streaming
         "options": {
@@ -109,21 +303,21 @@ def call_llm(ast_nodes: list[dict]) -> dict:
     }
     
     # Log which model we're using
-    logger.info(f"Using LLM model: {LLM_MODEL}")
+    logger.info(f"Using LLM model: {_config().model}")
     
     try:
         # Log that we're sending a request
-        logger.info(f"Sending request to Ollama API at {OLLAMA_BASE_URL}/api/generate")
+        logger.info(f"Sending request to Ollama API at {_config().base_url}/api/generate")
         
         # Generate a unique identifier for this LLM call
         request_id = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # Send POST request to the Ollama API
-        response = requests.post(
-            f"{OLLAMA_BASE_URL}/api/generate",      # Endpoint for text generation
+        response = _SESSION.post(
+            f"{_config().base_url}/api/generate",      # Endpoint for text generation
             headers={"Content-Type": "application/json"},
-            json=payload,
-            timeout=60                              # 60 second timeout
+            data=orjson.dumps(payload),               # UTF-8 body, non-ASCII left unescaped
+            timeout=600                             # Whole-AST prompts can take minutes
         )
         
         # Log the response status
@@ -134,35 +328,40 @@ def call_llm(ast_nodes: list[dict]) -> dict:
         
         # Try to parse the JSON response
         try:
-            result = response.json()
+            result = orjson.loads(response.content)
             # Log the keys in the response to help with debugging
             if result:
                 logger.info(f"Response keys: {list(result.keys())}")
             
-            # Save raw LLM request and response to log file
-            log_file = log_llm_raw_output(
+            # Hand raw LLM request and response to the background log writer
+            queue_llm_raw_output(
                 request_data=payload,
                 response_data=result,
                 identifier="ast_enrichment",
                 run_id=request_id
             )
-            logger.info(f"LLM raw output saved to: {log_file}")
             
+            # Only the generated text is needed again, not token context or
+            # timings; replies that do not parse are not cached, so a later
+            # run asks again instead of reusing them
+            cacheable = {key: result[key] for key in ("response", "choices") if key in result}
+            if cacheable and _is_usable_response(cacheable):
+                _cache_store(cache_key, cacheable)
             return result
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse JSON from response: {e}")
-            logger.error(f"Raw response text: {response.text[:200]}...")  # Log the first 200 chars
+            logger.error(f"Raw response text: {response.content[:200].decode('utf-8', 'replace')}...")  # Log the first 200 chars
             # Log error response
             error_response = {
                 "response": "",
                 "error": f"Invalid JSON in response: {str(e)}",
-                "raw_text": response.text[:500] if response.text else ""  # Include some raw text for debugging
+                "raw_text": response.content[:500].decode('utf-8', 'replace')  # Include some raw text for debugging
             }
             
             # Save error details
-            log_llm_raw_output(
+            queue_llm_raw_output(
                 request_data=payload,
-                response_data={"error": str(e), "partial_text": response.text[:500] if response.text else ""},
+                response_data={"error": str(e), "partial_text": response.content[:500].decode('utf-8', 'replace')},
                 identifier="ast_enrichment_error",
                 run_id=request_id
             )
@@ -179,117 +378,120 @@ def call_llm(ast_nodes: list[dict]) -> dict:
         }
 
 
-def clean_json_response(text: str) -> str:
+# JSON validation helper
+
+def validate_json(text: str) -> dict | None:
+    """
+    Validate and parse JSON text strictly.
+    Returns parsed dict if valid, otherwise None.
+    
+    Text that does not start with '{' and end with '}' is rejected without
+    invoking the parser, so prose responses go straight to repair.
+    """
+    stripped = text.strip()
+    if not (stripped.startswith('{') and stripped.endswith('}')):
+        return None
+    try:
+        return orjson.loads(stripped)
+    except orjson.JSONDecodeError as e:
+        logger.debug(f"JSON validation failed: {e}")
+        logger.debug(f"Failed text: {text[:100]}...")
+        return None
+
+
+def _augment(parsed: dict) -> dict:
     """
-    Clean and extract JSON from LLM response text.
+    Ensure the enrichment fields expected downstream are present.
     
     Args:
-        text (str): Raw text response from LLM
+        parsed (dict): Parsed LLM JSON
         
     Returns:
-        str: Cleaned JSON string
+        dict: The same dictionary with summary, dependencies and tags defaulted
     """
-    import re
-    
-    # Remove common prefixes and suffixes
-    text = re.sub(r'^.*?(?=\{)', '', text, flags=re.DOTALL)  # Remove everything before first {
-    
-    # Only remove content after last } if there actually is a }
-    if '}' in text:
-        text = re.sub(r'\}.*?$', '}', text, flags=re.DOTALL)     # Remove everything after last }
-    
-    # Remove comments from JSON
-    text = re.sub(r'//.*?$', '', text, flags=re.MULTILINE)   # Remove // comments
-    text = re.sub(r'/\*.*?\*/', '', text, flags=re.DOTALL)   # Remove /* */ comments
-    
-    # Fix common JSON formatting issues
-    text = re.sub(r',\s*([}\]])', r'\1', text)               # Remove trailing commas
+    parsed.setdefault("summary", "")
+    parsed.setdefault("dependencies", [])
+    parsed.setdefault("tags", [])
+    return parsed
+
+
+# Phrases that mark an LLM reply as a refusal rather than an analysis
+_REFUSAL_PATTERNS = (
+    "i'm sorry",
+    "i cannot",
+    "you didn't provide",
+    "no method",
+    "no code",
+    "therefore i can only"
+)
+
+
+def _is_refusal(text: str) -> bool:
+    """
+    Check whether LLM output text is a refusal to analyze the code.
     
-    # Check if JSON appears to be truncated (no closing brace)
-    if text.strip() and not text.strip().endswith('}'):
-        # Count opening and closing braces/brackets
-        open_braces = text.count('{')
-        close_braces = text.count('}')
-        open_brackets = text.count('[')
-        close_brackets = text.count(']')
-        
-        logger.info(f"Truncated JSON detected - Open braces: {open_braces}, Close braces: {close_braces}")
-        logger.info(f"Open brackets: {open_brackets}, Close brackets: {close_brackets}")
+    Args:
+        text (str): Generated text from the LLM
         
-        # Add missing closing brackets first
-        missing_brackets = open_brackets - close_brackets
-        if missing_brackets > 0:
-            logger.info(f"Adding {missing_brackets} missing closing brackets")
-            text += ']' * missing_brackets
-            
-        # Add missing closing braces
-        missing_braces = open_braces - close_braces
-        if missing_braces > 0:
-            logger.info(f"Adding {missing_braces} missing closing braces")
-            text += '}' * missing_braces
-    
-    # More aggressive comma fixing for the specific pattern we see
-    # The main issue: "property": "value" "nextProperty" should be "property": "value", "nextProperty"
-    
-    # Step 1: Handle quoted strings followed by other quoted strings (property names)
-    # Pattern: "value" "property" -> "value", "property"
-    text = re.sub(r'("\s*)\s+"([a-zA-Z_])', r'\1, "\2', text)
-    
-    # Step 2: Handle arrays followed by property names
-    # Pattern: ["item"] "property" -> ["item"], "property"
-    text = re.sub(r'(\])\s+"([a-zA-Z_])', r'\1, "\2', text)
-    
-    # Step 3: Handle objects followed by property names
-    # Pattern: {...} "property" -> {...}, "property"  
-    text = re.sub(r'(\})\s+"([a-zA-Z_])', r'\1, "\2', text)
-    
-    # Step 4: Handle newlines between properties
-    # Pattern: "value"\n  "property" -> "value",\n  "property"
-    text = re.sub(r'("\s*)\n(\s*"[a-zA-Z_])', r'\1,\n\2', text)
-    
-    # Step 5: Handle arrays on newlines
-    # Pattern: ]\n  "property" -> ],\n  "property"
-    text = re.sub(r'(\])\s*\n(\s*"[a-zA-Z_])', r'\1,\n\2', text)
-    
-    # Step 6: Handle objects on newlines  
-    # Pattern: }\n  "property" -> },\n  "property"
-    text = re.sub(r'(\})\s*\n(\s*"[a-zA-Z_])', r'\1,\n\2', text)
-    
-    # Step 7: Clean up any issues we may have introduced
-    # Remove double commas
-    text = re.sub(r',,+', ',', text)
-    
-    # Remove commas right after opening braces (fixes the {, issue)
-    text = re.sub(r'{\s*,', '{', text)
-    
-    # Remove trailing commas before closing brackets/braces
-    text = re.sub(r',\s*([}\]])', r'\1', text)
-    
-    return text.strip()
+    Returns:
+        bool: True if the text matches a known refusal pattern
+    """
+    text_lower = text.lower()
+    return any(pattern in text_lower for pattern in _REFUSAL_PATTERNS)
 
 
-# JSON validation helper
+def _parse_response_json(text: str) -> dict | None:
+    """
+    Parse LLM output text as a JSON object, repairing it if necessary.
+    
+    Args:
+        text (str): Generated text from the LLM
+        
+    Returns:
+        dict | None: The parsed object, or None if no non-empty object could be recovered
+    """
+    # Fast path: well-formed JSON, otherwise a single repair + parse pass
+    parsed = validate_json(text)
+    if not isinstance(parsed, dict):
+        logger.info("Direct JSON parsing failed, attempting repair...")
+        parsed = repair_json(text, return_objects=True)
+    return parsed if isinstance(parsed, dict) and parsed else None
 
-def validate_json(text: str) -> dict | None:
+
+def _is_usable_response(raw_resp: dict) -> bool:
     """
-    Validate and parse JSON text strictly.
-    Returns parsed dict if valid, otherwise None.
+    Check that a raw LLM response holds an analysis that parses.
+    
+    Used before caching, so an empty, refused or unparseable reply is not
+    served again on later runs.
+    
+    Args:
+        raw_resp (dict): Raw JSON response from the LLM API
+        
+    Returns:
+        bool: True if the response text parses to a non-empty JSON object
     """
+    if "response" in raw_resp:
+        text = raw_resp["response"]
+    elif raw_resp.get("choices"):
+        text = raw_resp["choices"][0].get("text", "")
+    else:
+        return False
+    if not isinstance(text, str) or not text.strip() or _is_refusal(text):
+        return False
     try:
-        parsed = json.loads(text)
-        return parsed
-    except json.JSONDecodeError as e:
-        logger.debug(f"JSON validation failed: {e}")
-        logger.debug(f"Failed text: {text[:100]}...")
-        return None
+        return _parse_response_json(text.strip()) is not None
+    except Exception:
+        return False
 
 
 def extract_enriched_data(raw_resp: dict) -> dict:
     """
-    Extract and parse JSON from LLM response with aggressive cleaning.
+    Extract and parse JSON from LLM response, repairing it if necessary.
     
     This function handles LLM responses that often contain explanatory text
-    alongside the requested JSON by using multiple extraction strategies.
+    or malformed JSON (missing commas, truncation, comments) by running the
+    text through json-repair when strict parsing fails.
     
     Args:
         raw_resp (dict): Raw JSON response from the LLM API
@@ -319,178 +521,27 @@ def extract_enriched_data(raw_resp: dict) -> dict:
             return {"summary": "No response generated", "dependencies": [], "tags": ["no-response"]}
         
         # Handle common LLM refusal patterns
-        refusal_patterns = [
-            "i'm sorry",
-            "i cannot",
-            "you didn't provide",
-            "no method",
-            "no code",
-            "therefore i can only"
-        ]
-        
-        text_lower = text.lower()
-        if any(pattern in text_lower for pattern in refusal_patterns):
+        if _is_refusal(text):
             logger.warning(f"LLM refused to analyze: {text[:100]}...")
             # Try to extract any JSON that might still be in the response
             json_match = re.search(r'\{[^{}]*\}', text)
             if json_match:
                 try:
-                    parsed = json.loads(json_match.group())
+                    parsed = orjson.loads(json_match.group())
                     if isinstance(parsed, dict):
                         parsed.setdefault("summary", "Generic implementation")
                         parsed.setdefault("dependencies", [])
                         parsed.setdefault("tags", ["generic"])
                         return parsed
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     pass
             return {"summary": "Generic implementation", "dependencies": [], "tags": ["generic"]}
         
-        # First, try to parse as direct JSON
-        try:
-            direct_json = json.loads(text)
-            if isinstance(direct_json, dict) and ('summary' in direct_json or 'tags' in direct_json):
-                # Ensure required fields exist
-                direct_json.setdefault("summary", "")
-                direct_json.setdefault("dependencies", [])
-                direct_json.setdefault("tags", [])
-                logger.info(f"Successfully parsed direct JSON: {direct_json}")
-                return direct_json
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON Decode Error: {e}")
-            logger.info(f"Direct JSON parsing failed: {e}")
-            logger.info(f"Failed text: {text[:500]}...")
-        
-        # If direct parsing fails, clean the response and try again
-        logger.info(f"Direct parsing failed, attempting to clean JSON response...")
-        logger.info(f"Original text to clean: {repr(text)}")
-        cleaned = clean_json_response(text)
-        logger.info(f"Cleaned JSON result: {repr(cleaned)}")
-        
-        # Try strict JSON validation on cleaned text
-        parsed = validate_json(cleaned)
+        parsed = _parse_response_json(text)
         if parsed is not None:
-            # Ensure required fields exist
-            parsed.setdefault("summary", "")
-            parsed.setdefault("dependencies", [])
-            parsed.setdefault("tags", [])
-            logger.info(f"Successfully parsed cleaned JSON: {parsed}")
-            return parsed
-        else:
-            logger.warning(f"Cleaned JSON also failed to parse")
-            logger.warning(f"Full cleaned text: {repr(cleaned)}")
-        
-        # Aggressive fix for the specific comma issue we're seeing
-        # The LLM consistently generates: "tags": ["tag1", "tag2"] "dependencies": ["dep1"]
-        # We need to add commas between JSON properties
-        comma_fixed_text = text
-        
-        # Fix missing commas after quoted values before new properties
-        import re
+            logger.debug(f"Successfully parsed LLM JSON: {parsed}")
+            return _augment(parsed)
         
-        # Step 1: Add commas after quoted strings before new properties
-        comma_fixed_text = re.sub(r'"\s+"([a-zA-Z_])', r'", "\1', comma_fixed_text)
-        
-        # Step 2: Add commas after arrays before new properties  
-        comma_fixed_text = re.sub(r'(\])\s+"([a-zA-Z_])', r'\1, "\2', comma_fixed_text)
-        
-        # Step 3: Add commas after closing braces before new properties
-        comma_fixed_text = re.sub(r'(\})\s+"([a-zA-Z_])', r'\1, "\2', comma_fixed_text)
-        
-        # Step 4: Handle newlines between properties
-        comma_fixed_text = re.sub(r'"\s*\n\s*"([a-zA-Z_])', r'",\n"\1', comma_fixed_text)
-        comma_fixed_text = re.sub(r'(\])\s*\n\s*"([a-zA-Z_])', r'\1,\n"\2', comma_fixed_text)
-        comma_fixed_text = re.sub(r'(\})\s*\n\s*"([a-zA-Z_])', r'\1,\n"\2', comma_fixed_text)
-        
-        # Step 5: Fix array elements without commas
-        comma_fixed_text = re.sub(r'("\w+[^,]*")\s+(")', r'\1, \2', comma_fixed_text)
-        
-        # Step 6: Clean up any double commas that might have been introduced
-        comma_fixed_text = re.sub(r',,+', ',', comma_fixed_text)
-        
-        # Step 7: Remove trailing commas before closing brackets/braces
-        comma_fixed_text = re.sub(r',\s*([}\]])', r'\1', comma_fixed_text)
-        
-        # Try parsing the comma-fixed version
-        try:
-            comma_parsed = json.loads(comma_fixed_text)
-            if isinstance(comma_parsed, dict):
-                comma_parsed.setdefault("summary", "")
-                comma_parsed.setdefault("dependencies", [])
-                comma_parsed.setdefault("tags", [])
-                logger.debug(f"Successfully parsed comma-fixed JSON: {comma_parsed}")
-                return comma_parsed
-        except json.JSONDecodeError as e:
-            logger.debug(f"Comma-fixed JSON still failed: {e}")
-            logger.debug(f"Comma-fixed text: {comma_fixed_text[:200]}...")
-            pass
-        
-        # Strategy: Find JSON objects with regex patterns
-        logger.info(f"Attempting regex extraction on text length: {len(text)}")
-        json_patterns = [
-            r'\{[^{}]*"summary"[^{}]*\}',  # Simple JSON with summary
-            r'\{(?:[^{}]|(?:\{[^{}]*\}))*\}',  # Nested JSON objects
-            r'\{[^}]*\}',  # Any JSON-like structure
-        ]
-        
-        for pattern in json_patterns:
-            matches = re.findall(pattern, text, re.DOTALL | re.IGNORECASE)
-            for match in matches:
-                try:
-                    # Clean the match
-                    cleaned_match = match.strip()
-                    # Fix common JSON issues
-                    cleaned_match = re.sub(r',\s*([}\]])', r'\1', cleaned_match)  # Remove trailing commas
-                    cleaned_match = re.sub(r'(["\w])\s*:\s*(["\w])', r'\1: \2', cleaned_match)  # Fix spacing
-                    
-                    result = json.loads(cleaned_match)
-                    if isinstance(result, dict) and ('summary' in result or 'tags' in result):
-                        # Ensure required fields exist
-                        result.setdefault("summary", "")
-                        result.setdefault("dependencies", [])
-                        result.setdefault("tags", [])
-                        logger.debug(f"Successfully extracted JSON with regex: {result}")
-                        return result
-                except json.JSONDecodeError as e:
-                    logger.debug(f"JSON decode error on match '{cleaned_match[:50]}...': {e}")
-                    continue
-        
-        # Final fallback: Try to extract meaningful information even from broken JSON
-        fallback_result = {"summary": "", "dependencies": [], "tags": []}
-        
-        # Extract any quoted strings that might be summaries
-        summary_candidates = re.findall(r'["\']([^"\']{10,100})["\']', text)
-        if summary_candidates:
-            # Use the longest reasonable string as summary
-            fallback_result["summary"] = max(summary_candidates, key=len)
-        
-        # Extract any array-like content for tags
-        tags_candidates = re.findall(r'\[(.*?)\]', text, re.DOTALL)
-        for candidate in tags_candidates:
-            # Extract quoted strings from arrays
-            tags = re.findall(r'["\']([^"\']+)["\']', candidate)
-            if tags:
-                fallback_result["tags"] = tags[:5]  # Limit to 5 tags
-                break
-        
-        # If we couldn't extract anything meaningful, use generic values
-        if not fallback_result["summary"]:
-            fallback_result["summary"] = "Analysis completed"
-        if not fallback_result["tags"]:
-            fallback_result["tags"] = ["parsed"]
-            
-        logger.warning(f"Could not extract meaningful data from: {text[:100]}...")
-        return fallback_result
-        if tags_match:
-            tags_text = tags_match.group(1)
-            tags = [tag.strip().strip('"') for tag in tags_text.split(',')]
-            fallback_result["tags"] = [tag for tag in tags if tag]
-        
-        # If we found some content, return it
-        if fallback_result["summary"] or fallback_result["tags"]:
-            logger.debug(f"Used fallback extraction: {fallback_result}")
-            return fallback_result
-        
-        # Final fallback - create a basic response
         logger.warning(f"Could not extract meaningful data from: {text[:100]}...")
         return {
             "summary": "Could not parse LLM response",
@@ -507,12 +558,165 @@ def extract_enriched_data(raw_resp: dict) -> dict:
         }
 
 
+_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _dump_json(obj, path: str) -> None:
+    """
+    Write an object as JSON using orjson, streaming large parts.
+    
+    Top-level dict keys are serialized one at a time and list values are
+    written element by element (one per line), so the full document is
+    never held in memory as a single bytes object. ``obj`` may also be a
+    generator of ``(key, value)`` pairs, and values may be generators; each
+    pair is only requested after the previous value has been written, so
+    later values can depend on earlier ones having been consumed.
+    
+    Args:
+        obj: JSON-serializable object, or generator of (key, value) pairs
+        path (str): Destination file path
+    """
+    with open(path, "wb") as f:
+        if isinstance(obj, dict):
+            items = obj.items()
+        elif isinstance(obj, GeneratorType):
+            items = obj
+        else:
+            f.write(orjson.dumps(obj, option=_JSON_OPTIONS | orjson.OPT_INDENT_2))
+            return
+        
+        f.write(b"{")
+        for index, (key, value) in enumerate(items):
+            f.write(b",\n  " if index else b"\n  ")
+            f.write(orjson.dumps(str(key)))
+            f.write(b": ")
+            if isinstance(value, (list, tuple, GeneratorType)):
+                _write_json_array(f, value)
+            else:
+                f.write(orjson.dumps(value, option=_JSON_OPTIONS))
+        f.write(b"\n}\n")
+
+
+def _write_json_array(f, items) -> None:
+    """
+    Stream a JSON array to an open binary file, one element per line.
+    
+    Args:
+        f: File object opened in binary write mode
+        items: Iterable of JSON-serializable elements
+    """
+    f.write(b"[")
+    empty = True
+    for item in items:
+        f.write(b"\n    " if empty else b",\n    ")
+        f.write(orjson.dumps(item, option=_JSON_OPTIONS))
+        empty = False
+    f.write(b"]" if empty else b"\n  ]")
+
+
 # Chunked Enrichment Strategy Functions
 
+_TYPE = "type"
+_BODY = "body"
+_NAME = "name"
+
+# Node types whose body may contain further classes
+_CONTAINER_TYPES = ("Namespace", "Class")
+
+
+def _qualify(prefix: str, name: str) -> str:
+    """
+    Join an enclosing namespace/class path and a member name.
+    
+    Args:
+        prefix (str): Qualified name of the enclosing node ("" at top level)
+        name (str): Name of the node itself
+        
+    Returns:
+        str: Dotted qualified name
+    """
+    return f"{prefix}.{name}" if prefix else name
+
+
+def _class_core(node: dict, method_names: list[str], qualified_name: str | None = None) -> dict:
+    """
+    Build the core metadata dictionary for a class chunk.
+    
+    Args:
+        node (dict): Class AST node
+        method_names (list[str]): Names of the methods declared in the class
+        qualified_name (str | None): Namespace and enclosing class path of
+            the class; defaults to its bare name
+        
+    Returns:
+        dict: Class core metadata
+    """
+    return {
+        "type": node[_TYPE],
+        "name": node[_NAME],
+        "qualifiedName": qualified_name or node[_NAME],
+        "startLine": node.get("startLine"),
+        "modifiers": node.get("modifiers", []),
+        "baseTypes": node.get("baseTypes", []),
+        "method_names": method_names
+    }
+
+
+def iter_chunks(ast_nodes: list[dict]):
+    """
+    Lazily walk the AST and yield class and method chunks.
+    
+    Uses an explicit deque instead of recursion, so namespaces and classes
+    may be nested to any depth. Each class is yielded as ``("class", core)``
+    followed by one ``("method", {"class_name", "qualified_class_name",
+    "method"})`` per method. Classes are identified by their qualified name
+    (enclosing namespaces and classes joined with dots), so same-named
+    classes in different namespaces stay apart.
+    
+    Args:
+        ast_nodes (list[dict]): List of AST node dictionaries
+        
+    Yields:
+        tuple[str, dict]: Chunk kind ("class" or "method") and chunk data
+    """
+    stack = deque((node, "") for node in ast_nodes)
+    while stack:
+        node, prefix = stack.popleft()
+        node_type = node.get(_TYPE)
+        if node_type not in _CONTAINER_TYPES:
+            continue
+        
+        qualified_name = _qualify(prefix, node.get(_NAME, ""))
+        body = node.get(_BODY, [])
+        if node_type == "Namespace":
+            stack.extend((body_item, qualified_name) for body_item in body)
+            continue
+        
+        # Class: collect its methods, queue nested types for later
+        methods = []
+        for body_item in body:
+            item_type = body_item.get(_TYPE)
+            if item_type == "Method":
+                methods.append(body_item)
+            elif item_type in _CONTAINER_TYPES:
+                stack.append((body_item, qualified_name))
+        
+        class_name = node[_NAME]
+        yield "class", _class_core(node, [m[_NAME] for m in methods], qualified_name)
+        for method in methods:
+            yield "method", {
+                "class_name": class_name,
+                "qualified_class_name": qualified_name,
+                "method": method
+            }
+
+
 def extract_chunks(ast_nodes: list[dict]) -> dict:
     """
     Extract class and method chunks from AST for chunked processing.
     
+    Materializes :func:`iter_chunks` into lists for callers that need them.
+    
     Args:
         ast_nodes (list[dict]): List of AST node dictionaries
         
@@ -521,58 +725,11 @@ def extract_chunks(ast_nodes: list[dict]) -> dict:
     """
     class_chunks = []
     method_chunks = []
-    
-    # Navigate through the AST structure
-    for node in ast_nodes:
-        if node.get("type") == "Namespace":
-            # Look inside namespace body
-            for namespace_item in node.get("body", []):
-                if namespace_item.get("type") == "Class":
-                    # Extract class core metadata
-                    class_core = {
-                        "type": namespace_item["type"],
-                        "name": namespace_item["name"],
-                        "startLine": namespace_item.get("startLine"),
-                        "modifiers": namespace_item.get("modifiers", []),
-                        "baseTypes": namespace_item.get("baseTypes", [])
-                    }
-                    
-                    # Extract methods from class body
-                    class_methods = []
-                    for body_item in namespace_item.get("body", []):
-                        if body_item.get("type") == "Method":
-                            method_chunk = {
-                                "class_name": namespace_item["name"],
-                                "method": body_item
-                            }
-                            method_chunks.append(method_chunk)
-                            class_methods.append(body_item["name"])
-                    
-                    # Add class chunk with method names list
-                    class_core["method_names"] = class_methods
-                    class_chunks.append(class_core)
-        elif node.get("type") == "Class":
-            # Direct class node (not in namespace)
-            class_core = {
-                "type": node["type"],
-                "name": node["name"],
-                "startLine": node.get("startLine"),
-                "modifiers": node.get("modifiers", []),
-                "baseTypes": node.get("baseTypes", [])
-            }
-            
-            class_methods = []
-            for body_item in node.get("body", []):
-                if body_item.get("type") == "Method":
-                    method_chunk = {
-                        "class_name": node["name"],
-                        "method": body_item
-                    }
-                    method_chunks.append(method_chunk)
-                    class_methods.append(body_item["name"])
-            
-            class_core["method_names"] = class_methods
-            class_chunks.append(class_core)
+    for kind, chunk in iter_chunks(ast_nodes):
+        if kind == "class":
+            class_chunks.append(chunk)
+        else:
+            method_chunks.append(chunk)
     
     return {
         "class_chunks": class_chunks,
@@ -580,6 +737,87 @@ def extract_chunks(ast_nodes: list[dict]) -> dict:
     }
 
 
+# Prompt templates that produce each kind of cached enrichment; methods are
+# enriched either one at a time or in batches and share one cache
+_CACHE_TEMPLATES = {
+    "ast": ("csharp_enrich_prompt.txt",),
+    "class": ("csharp_class_enrich_prompt.txt",),
+    "method": ("csharp_method_enrich_prompt.txt", "csharp_method_batch_enrich_prompt.txt"),
+}
+
+
+def _cache_key(kind: str, summary: dict | list) -> str:
+    """
+    Hash a prompt summary into a cache key.
+    
+    The key also covers the model, the LLM endpoint and the text of the
+    prompt templates for this kind, so changing any of them stops earlier
+    enrichments from being reused.
+    
+    Args:
+        kind (str): Kind of enrichment ("class", "method" or "ast")
+        summary (dict | list): Summary dictionary, or AST nodes, sent to the LLM
+        
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    material = {
+        "kind": kind,
+        "model": _config().model,
+        "base_url": _config().base_url,
+        "templates": [_load_prompt_template(name) for name in _CACHE_TEMPLATES.get(kind, ())],
+        "summary": summary
+    }
+    return hashlib.sha256(orjson.dumps(material, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def _cache_load(key: str) -> dict | None:
+    """
+    Load a cached enrichment result from disk.
+    
+    Args:
+        key (str): Cache key from _cache_key
+        
+    Returns:
+        dict | None: Cached enrichment, or None on a miss or unreadable entry
+    """
+    path = os.path.join(_config().cache_dir, f"{key}.json")
+    try:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, orjson.JSONDecodeError) as e:
+        logger.warning(f"Ignoring unreadable enrichment cache entry {path}: {e}")
+        return None
+
+
+def _cache_store(key: str, enrichment: dict) -> None:
+    """
+    Store an enrichment result on disk, skipping LLM fallback results.
+    
+    The entry is written to a temporary file and renamed into place so
+    concurrent readers never see a partial file.
+    
+    Args:
+        key (str): Cache key from _cache_key
+        enrichment (dict): Enrichment data to cache
+    """
+    if "fallback" in enrichment.get("tags", []):
+        return
+    
+    cache_dir = _config().cache_dir
+    path = os.path.join(cache_dir, f"{key}.json")
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(enrichment))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Failed to write enrichment cache entry {path}: {e}")
+
+
 def enrich_class(class_data: dict, methods: list[str]) -> dict:
     """
     Enrich class-level metadata using LLM or mock data.
@@ -598,11 +836,8 @@ def enrich_class(class_data: dict, methods: list[str]) -> dict:
     
     try:
         # Load class-specific prompt template
-        class_prompt_path = os.path.join(os.path.dirname(__file__), '..', 'prompt_templates', 'csharp_class_enrich_prompt.txt')
-        if os.path.exists(class_prompt_path):
-            with open(class_prompt_path, 'r') as f:
-                prompt_template = f.read()
-        else:
+        prompt_template = _load_prompt_template('csharp_class_enrich_prompt.txt')
+        if prompt_template is None:
             # Fallback template
             prompt_template = """Analyze this C# class and return ONLY JSON:
             
@@ -622,7 +857,13 @@ def enrich_class(class_data: dict, methods: list[str]) -> dict:
             "base_types": class_data.get('baseTypes', [])
         }
         
-        prompt = prompt_template.replace('{{AST_JSON}}', json.dumps(class_summary, indent=2))
+        cache_key = _cache_key("class", class_summary)
+        cached = _cache_load(cache_key)
+        if cached is not None:
+            logger.debug(f"Using cached enrichment for class: {class_data['name']}")
+            return cached
+        
+        prompt = prompt_template.replace('{{AST_JSON}}', orjson.dumps(class_summary).decode())
         
         logger.info(f"Enriching class: {class_data['name']}")
         result = call_llm_with_retry(prompt, max_retries=3, timeout=45)
@@ -630,6 +871,8 @@ def enrich_class(class_data: dict, methods: list[str]) -> dict:
         
         # Validate and ensure we have proper structure
         if enrichment and isinstance(enrichment, dict):
+            if not result.get("fallback"):
+                _cache_store(cache_key, enrichment)
             return enrichment
         else:
             return {"summary": f"Analysis of {class_data['name']} class", "tags": ["class"], "dependencies": []}
@@ -640,81 +883,249 @@ def enrich_class(class_data: dict, methods: list[str]) -> dict:
         return mock_enrich_class(class_data, methods)
 
 
-def enrich_method(class_name: str, method_data: dict) -> dict:
+# Canned enrichment for methods whose behaviour is predictable from the
+# signature alone; keyed by name prefix (or modifier) checked in _is_trivial
+_TRIVIAL_PREFIXES = ("get_", "set_", "add_", "remove_")
+_TRIVIAL_ENRICHMENT = {
+    "get_": {"summary": "Property getter", "tags": ["accessor", "getter"]},
+    "set_": {"summary": "Property setter", "tags": ["accessor", "setter"]},
+    "add_": {"summary": "Event subscription accessor", "tags": ["accessor", "event"]},
+    "remove_": {"summary": "Event unsubscription accessor", "tags": ["accessor", "event"]},
+    "abstract": {"summary": "Abstract method declaration", "tags": ["abstract", "declaration"]},
+    "extern": {"summary": "External method declaration", "tags": ["extern", "declaration"]},
+    "empty": {"summary": "Method with an empty or single-statement body", "tags": ["trivial"]},
+}
+
+
+def _trivial_kind(method_data: dict) -> str | None:
     """
-    Enrich individual method using LLM or mock data.
+    Classify a method as trivial, i.e. not worth an LLM call.
     
     Args:
-        class_name (str): Name of the containing class
         method_data (dict): Method metadata
         
     Returns:
-        dict: Enriched method metadata
+        str | None: Key into _TRIVIAL_ENRICHMENT, or None if the method needs enrichment
     """
-    # Use mock enrichment if LLM is unavailable or mock mode is enabled
-    if is_mock_mode():
-        logger.debug(f"Using mock enrichment for method: {class_name}.{method_data['name']}")
-        return mock_enrich_method(class_name, method_data)
+    name = method_data.get("name", "")
+    if name.startswith(_TRIVIAL_PREFIXES):
+        return name[:name.index("_") + 1]
     
-    try:
-        # Load method-specific prompt template
-        method_prompt_path = os.path.join(os.path.dirname(__file__), '..', 'prompt_templates', 'csharp_method_enrich_prompt.txt')
-        if os.path.exists(method_prompt_path):
-            with open(method_prompt_path, 'r') as f:
-                prompt_template = f.read()
-        else:
-            # Fallback template
-            prompt_template = """Analyze this C# method and return ONLY JSON:
-            
-            Method: {{AST_JSON}}
-            
-            Required JSON format:
-            {"summary":"brief description","tags":["keywords"],"dependencies":["types"]}
-            
-            JSON:"""
+    modifiers = method_data.get("modifiers", [])
+    for modifier in ("abstract", "extern"):
+        if modifier in modifiers:
+            return modifier
+    
+    # The parser does not emit method bodies today; only judge them when present
+    if "body" in method_data and len(method_data["body"] or []) <= 1:
+        return "empty"
+    
+    return None
+
+
+def _is_trivial(method_data: dict) -> bool:
+    """
+    Check whether a method is trivial (accessor, abstract, extern or empty).
+    
+    Args:
+        method_data (dict): Method metadata
         
-        # Prepare method data with validation
-        method_summary = {
-            "class": class_name,
-            "name": method_data.get('name', 'UnknownMethod'),
-            "type": method_data.get('type', 'method'),
-            "returnType": method_data.get('returnType', 'void'),
-            "parameters": method_data.get('parameters', [])[:3],  # Limit params
-            "modifiers": method_data.get('modifiers', [])
+    Returns:
+        bool: True if the method can be enriched without calling the LLM
+    """
+    return _trivial_kind(method_data) is not None
+
+
+def _trivial_enrichment(method_data: dict) -> dict:
+    """
+    Build the canned enrichment for a trivial method.
+    
+    Args:
+        method_data (dict): Method metadata
+        
+    Returns:
+        dict: Method metadata with enrichment attached
+    """
+    canned = _TRIVIAL_ENRICHMENT[_trivial_kind(method_data)]
+    return {
+        **method_data,
+        "enrichment": {
+            "summary": canned["summary"],
+            "tags": list(canned["tags"]),
+            "dependencies": []
         }
+    }
+
+
+# In-flight method enrichments keyed by a hash of the method summary, so
+# concurrent identical methods share one LLM request. Entries are removed as
+# soon as the request finishes; later callers are served by the on-disk cache
+_inflight: dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def _request_method_enrichment(method_summary: dict, prompt: str) -> dict | None:
+    """
+    Call the LLM for a single method prompt and normalize the enrichment.
+    
+    Args:
+        method_summary (dict): Summary of the method sent in the prompt
+        prompt (str): Complete method prompt
         
-        # Add some context about the method for better LLM understanding
-        if method_data.get('parameters'):
-            method_summary["parameterCount"] = len(method_data['parameters'])
-        if method_data.get('body'):
-            method_summary["hasBody"] = True
+    Returns:
+        dict | None: Enrichment data, or None if the LLM response was invalid
+    """
+    qualified_name = f"{method_summary['class']}.{method_summary['name']}"
+    result = call_llm_with_retry(prompt, max_retries=2, timeout=30)
+    
+    # Validate the LLM response
+    if not result or "response" not in result:
+        logger.warning(f"Invalid LLM response for method {qualified_name}: {result}")
+        return None
+    
+    enrichment = extract_enriched_data(result)
+    
+    # Validate enrichment result
+    if not enrichment or not isinstance(enrichment, dict):
+        logger.warning(f"Failed to extract enrichment for method {qualified_name}")
+        enrichment = {"summary": f"Method {method_summary['name']}", "tags": ["method"], "dependencies": []}
+    
+    # Ensure all required fields are present
+    enrichment.setdefault("summary", f"Method {method_summary['name']}")
+    enrichment.setdefault("tags", ["method"])
+    enrichment.setdefault("dependencies", [])
+    return enrichment
+
+
+def _shared_method_enrichment(method_summary: dict, prompt: str) -> dict | None:
+    """
+    Enrich a method, sharing the result between identical method summaries.
+    
+    The first caller for a given summary consults the on-disk cache and, on a
+    miss, performs the LLM request; concurrent callers wait on the same
+    Future, which is dropped from the in-flight map once it completes. Failed
+    requests are not cached, so a later caller will retry.
+    
+    Args:
+        method_summary (dict): Summary of the method sent in the prompt
+        prompt (str): Complete method prompt
         
-        # Ensure we have valid data to send
-        if not method_summary.get("name") or method_summary["name"] == "UnknownMethod":
-            logger.warning(f"Method data missing or invalid for class {class_name}: {method_data}")
-            return mock_enrich_method(class_name, method_data)
+    Returns:
+        dict | None: A private copy of the enrichment, or None on failure
+    """
+    key = _cache_key("method", method_summary)
+    
+    with _inflight_lock:
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _inflight[key] = future
+    
+    if owner:
+        enrichment = None
+        try:
+            enrichment = _cache_load(key)
+            if enrichment is None:
+                enrichment = _request_method_enrichment(method_summary, prompt)
+                if enrichment is not None:
+                    _cache_store(key, enrichment)
+        finally:
+            with _inflight_lock:
+                _inflight.pop(key, None)
+            future.set_result(enrichment)
+    else:
+        logger.debug(f"Reusing enrichment for identical method: {method_summary['class']}.{method_summary['name']}")
+        enrichment = future.result()
+    
+    if enrichment is None:
+        return None
+    return {
+        **enrichment,
+        "tags": list(enrichment.get("tags", [])),
+        "dependencies": list(enrichment.get("dependencies", []))
+    }
+
+
+def _method_summary(class_name: str, method_data: dict) -> dict | None:
+    """
+    Build the method description sent to the LLM (and hashed for the cache).
+    
+    Args:
+        class_name (str): Name of the containing class
+        method_data (dict): Method metadata
         
-        prompt = prompt_template.replace('{{AST_JSON}}', json.dumps(method_summary, indent=2))
+    Returns:
+        dict | None: Method summary, or None if the method has no usable name
+    """
+    method_summary = {
+        "class": class_name,
+        "name": method_data.get('name', 'UnknownMethod'),
+        "type": method_data.get('type', 'method'),
+        "returnType": method_data.get('returnType', 'void'),
+        "parameters": method_data.get('parameters', [])[:3],  # Limit params
+        "modifiers": method_data.get('modifiers', [])
+    }
+    
+    # Add some context about the method for better LLM understanding
+    if method_data.get('parameters'):
+        method_summary["parameterCount"] = len(method_data['parameters'])
+    if method_data.get('body'):
+        method_summary["hasBody"] = True
+    
+    # Ensure we have valid data to send
+    if not method_summary.get("name") or method_summary["name"] == "UnknownMethod":
+        return None
+    return method_summary
+
+
+def enrich_method(class_name: str, method_data: dict) -> dict:
+    """
+    Enrich individual method using LLM or mock data.
+    
+    Args:
+        class_name (str): Name of the containing class
+        method_data (dict): Method metadata
         
-        logger.debug(f"Enriching method: {class_name}.{method_data['name']} with data: {method_summary}")
-        result = call_llm_with_retry(prompt, max_retries=2, timeout=30)
+    Returns:
+        dict: Enriched method metadata
+    """
+    # Use mock enrichment if LLM is unavailable or mock mode is enabled
+    if is_mock_mode():
+        logger.debug(f"Using mock enrichment for method: {class_name}.{method_data['name']}")
+        return mock_enrich_method(class_name, method_data)
+    
+    # Skip the LLM for accessors and declarations without real behaviour
+    if _is_trivial(method_data):
+        logger.debug(f"Skipping LLM for trivial method: {class_name}.{method_data['name']}")
+        return _trivial_enrichment(method_data)
+    
+    try:
+        # Load method-specific prompt template
+        prompt_template = _load_prompt_template('csharp_method_enrich_prompt.txt')
+        if prompt_template is None:
+            # Fallback template
+            prompt_template = """Analyze this C# method and return ONLY JSON:
+            
+            Method: {{AST_JSON}}
+            
+            Required JSON format:
+            {"summary":"brief description","tags":["keywords"],"dependencies":["types"]}
+            
+            JSON:"""
         
-        # Validate the LLM response
-        if not result or "response" not in result:
-            logger.warning(f"Invalid LLM response for method {class_name}.{method_data['name']}: {result}")
+        # Prepare method data with validation
+        method_summary = _method_summary(class_name, method_data)
+        if method_summary is None:
+            logger.warning(f"Method data missing or invalid for class {class_name}: {method_data}")
             return mock_enrich_method(class_name, method_data)
         
-        enrichment = extract_enriched_data(result)
+        prompt = prompt_template.replace('{{AST_JSON}}', orjson.dumps(method_summary).decode())
         
-        # Validate enrichment result
-        if not enrichment or not isinstance(enrichment, dict):
-            logger.warning(f"Failed to extract enrichment for method {class_name}.{method_data['name']}")
-            enrichment = {"summary": f"Method {method_data['name']}", "tags": ["method"], "dependencies": []}
-        
-        # Ensure all required fields are present
-        enrichment.setdefault("summary", f"Method {method_data.get('name', 'Unknown')}")
-        enrichment.setdefault("tags", ["method"])
-        enrichment.setdefault("dependencies", [])
+        logger.debug(f"Enriching method: {class_name}.{method_data['name']} with data: {method_summary}")
+        enrichment = _shared_method_enrichment(method_summary, prompt)
+        if enrichment is None:
+            return mock_enrich_method(class_name, method_data)
         
         # Return method with enrichment
         return {
@@ -728,6 +1139,153 @@ def enrich_method(class_name: str, method_data: dict) -> dict:
         return mock_enrich_method(class_name, method_data)
 
 
+# Stop sequences for batched prompts; the per-method ones would cut the JSON
+# array off after its first object
+_BATCH_STOP_SEQUENCES = ["```", "SYSTEM:", "INSTRUCTION:", "FORMAT:", "RULES:", "Methods:"]
+
+
+def _parse_batch_enrichment(raw_resp: dict, count: int) -> list[dict] | None:
+    """
+    Parse a batched LLM response into one enrichment per method.
+    
+    Args:
+        raw_resp (dict): Raw JSON response from the LLM API
+        count (int): Number of methods in the prompt
+        
+    Returns:
+        list[dict] | None: Enrichments in prompt order, or None if the response
+        is not a JSON array of exactly `count` objects
+    """
+    text = raw_resp.get("response", "").strip()
+    start, end = text.find("["), text.rfind("]")
+    parsed = None
+    if start != -1 and end > start:
+        try:
+            parsed = orjson.loads(text[start:end + 1])
+        except orjson.JSONDecodeError:
+            parsed = None
+    if not isinstance(parsed, list):
+        parsed = repair_json(text, return_objects=True)
+    if not isinstance(parsed, list) or len(parsed) != count:
+        return None
+    if not all(isinstance(item, dict) for item in parsed):
+        return None
+    return [_augment(item) for item in parsed]
+
+
+def enrich_method_batch(method_chunks: list[dict]) -> list[dict]:
+    """
+    Enrich several methods with a single LLM call.
+    
+    Methods that need no LLM call (mock mode, trivial or already cached) are
+    resolved individually; the rest share one prompt that asks for a JSON
+    array with one object per method. If the response cannot be matched back
+    to the methods, each of them is enriched on its own instead.
+    
+    Args:
+        method_chunks (list[dict]): Method chunks as produced by extract_chunks
+        
+    Returns:
+        list[dict]: Enriched methods in the same order as method_chunks
+    """
+    results = [None] * len(method_chunks)
+    # Identical methods share a prompt slot: cache key -> (summary, chunk indices)
+    pending: dict[str, tuple[dict, list[int]]] = {}
+    
+    for index, chunk in enumerate(method_chunks):
+        class_name, method_data = chunk["class_name"], chunk["method"]
+        summary = None
+        if not is_mock_mode() and not _is_trivial(method_data):
+            summary = _method_summary(class_name, method_data)
+        if summary is None:
+            results[index] = enrich_method(class_name, method_data)
+            continue
+        key = _cache_key("method", summary)
+        if key in pending:
+            pending[key][1].append(index)
+            continue
+        cached = _cache_load(key)
+        if cached is not None:
+            results[index] = {**method_data, "enrichment": cached}
+            continue
+        pending[key] = (summary, [index])
+    
+    enrichments = None
+    if len(pending) > 1:
+        summaries = [summary for summary, _ in pending.values()]
+        # Load batch prompt template
+        prompt_template = _load_prompt_template('csharp_method_batch_enrich_prompt.txt')
+        if prompt_template is None:
+            # Fallback template
+            prompt_template = """Analyze these {{COUNT}} C# methods and return ONLY a JSON array with one object per method, in order:
+            
+            Methods: {{AST_JSON}}
+            
+            Required JSON format:
+            [{"summary":"brief description","tags":["keywords"],"dependencies":["types"]}]
+            
+            JSON:"""
+        prompt = prompt_template.replace('{{COUNT}}', str(len(summaries))).replace('{{AST_JSON}}', orjson.dumps(summaries).decode())
+        logger.info(f"Enriching {len(summaries)} methods in one LLM call")
+        result = call_llm_with_retry(prompt, max_retries=2, timeout=30 + 15 * len(summaries),
+                                     num_predict=150 * len(summaries), stop=_BATCH_STOP_SEQUENCES)
+        if not result.get("fallback"):
+            enrichments = _parse_batch_enrichment(result, len(summaries))
+        if enrichments is None:
+            logger.warning(f"Batched enrichment of {len(summaries)} methods failed, enriching them one by one")
+    
+    for position, (key, (summary, indices)) in enumerate(pending.items()):
+        if enrichments is not None:
+            _cache_store(key, enrichments[position])
+        for index in indices:
+            chunk = method_chunks[index]
+            if enrichments is None:
+                results[index] = enrich_method(chunk["class_name"], chunk["method"])
+            else:
+                enrichment = enrichments[position]
+                results[index] = {
+                    **chunk["method"],
+                    "enrichment": {
+                        **enrichment,
+                        "tags": list(enrichment.get("tags", [])),
+                        "dependencies": list(enrichment.get("dependencies", []))
+                    }
+                }
+    return results
+
+
+def enrich_methods_threaded(method_chunks: list[dict], workers: int | None = None) -> list[dict]:
+    """
+    Enrich method chunks concurrently using a thread pool.
+    
+    LLM calls are blocking HTTP requests, so threads overlap them and keep
+    the Ollama server's parallel slots busy.
+    
+    Args:
+        method_chunks (list[dict]): Method chunks as produced by extract_chunks
+        workers (int | None): Number of worker threads; defaults to
+            ENRICH_WORKERS, then OLLAMA_NUM_PARALLEL (or 8)
+        
+    Returns:
+        list[dict]: Enriched methods in the same order as method_chunks
+    """
+    if not method_chunks:
+        return []
+    
+    workers = workers or _config().workers
+    results = [None] * len(method_chunks)
+    
+    with _enrichment_executor(workers) as executor:
+        futures = {
+            executor.submit(enrich_method, chunk["class_name"], chunk["method"]): index
+            for index, chunk in enumerate(method_chunks)
+        }
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    
+    return results
+
+
 def compose_enriched_class(class_core: dict, class_meta: dict, enriched_methods: list[dict]) -> dict:
     """
     Merge class core data, class-level enrichment, and enriched methods.
@@ -750,7 +1308,266 @@ def compose_enriched_class(class_core: dict, class_meta: dict, enriched_methods:
     return enriched_class
 
 
-def enrich_ast(ast_nodes: list[dict], enriched_output_path: str) -> dict:
+def _incremental_key(class_data: dict, class_method_chunks: list[dict]) -> str:
+    """
+    Hash everything that determines a class's enrichment.
+    
+    Args:
+        class_data (dict): Class core metadata
+        class_method_chunks (list[dict]): Method chunks belonging to the class
+        
+    Returns:
+        str: Hex BLAKE2b digest
+    """
+    config = _config()
+    material = {
+        "model": config.model,
+        "mock": config.mock_mode,
+        "class": class_data,
+        "methods": [mc["method"] for mc in class_method_chunks]
+    }
+    return hashlib.blake2b(orjson.dumps(material, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+
+
+def _incremental_path(enriched_output_path: str) -> str:
+    """
+    Location of the incremental sidecar for an enriched output file.
+    
+    Args:
+        enriched_output_path (str): Path of the enriched JSON output
+        
+    Returns:
+        str: Path of the sidecar JSON under the enrichment cache directory
+    """
+    digest = hashlib.sha256(os.path.abspath(enriched_output_path).encode("utf-8")).hexdigest()[:32]
+    return os.path.join(_config().cache_dir, "incremental", f"{digest}.json")
+
+
+def _load_incremental(enriched_output_path: str) -> dict:
+    """
+    Load the enriched classes recorded by the previous run for this output.
+    
+    Args:
+        enriched_output_path (str): Path of the enriched JSON output
+        
+    Returns:
+        dict: Class name -> {"key", "enriched_class"}; empty if none recorded
+    """
+    path = _incremental_path(enriched_output_path)
+    try:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    except FileNotFoundError:
+        return {}
+    except (OSError, orjson.JSONDecodeError) as e:
+        logger.warning(f"Ignoring unreadable incremental cache {path}: {e}")
+        return {}
+
+
+def _save_incremental(enriched_output_path: str, entries: dict) -> None:
+    """
+    Record this run's enriched classes for reuse by the next run.
+    
+    Args:
+        enriched_output_path (str): Path of the enriched JSON output
+        entries (dict): Class name -> {"key", "enriched_class"}
+    """
+    path = _incremental_path(enriched_output_path)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(entries, option=_JSON_OPTIONS))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Failed to write incremental cache {path}: {e}")
+
+
+def _enrich_class_chunks(class_chunks: list[dict], method_chunks: list[dict], executor,
+                         previous: dict | None = None, current: dict | None = None,
+                         batch_size: int | None = None) -> list[dict]:
+    """
+    Enrich classes and their methods on a shared executor and compose them.
+    
+    When ``previous`` is given, a class whose core metadata and methods hash
+    the same as last run is reused without any LLM calls. When ``current``
+    is given, it is filled with this run's entries for the next run.
+    
+    Args:
+        class_chunks (list[dict]): Class chunks as produced by extract_chunks
+        method_chunks (list[dict]): Method chunks as produced by extract_chunks
+        executor (Executor): Pool used for the LLM calls
+        previous (dict | None): Incremental entries from the previous run
+        current (dict | None): Incremental entries for this run, filled in place
+        batch_size (int | None): Methods per LLM call; defaults to ENRICH_METHOD_BATCH
+        
+    Returns:
+        list[dict]: Enriched classes in the same order as class_chunks
+    """
+    # Classes and their methods are matched up by qualified name
+    def class_key(class_data):
+        return class_data.get("qualifiedName", class_data["name"])
+    
+    def method_class_key(method_chunk):
+        return method_chunk.get("qualified_class_name", method_chunk["class_name"])
+    
+    chunks_by_class = defaultdict(list)
+    for mc in method_chunks:
+        chunks_by_class[method_class_key(mc)].append(mc)
+    
+    # Work out which classes are unchanged since the previous run
+    keys = []
+    reused = {}
+    if previous is not None or current is not None:
+        for index, class_data in enumerate(class_chunks):
+            key = _incremental_key(class_data, chunks_by_class.get(class_key(class_data), []))
+            keys.append(key)
+            entry = (previous or {}).get(class_key(class_data))
+            if entry and entry.get("key") == key:
+                reused[index] = entry["enriched_class"]
+    if reused:
+        logger.info(f"Reusing {len(reused)} unchanged classes from the previous run")
+    reused_names = {class_key(class_chunks[index]) for index in reused}
+    
+    # Methods go to the LLM in batches; with a batch size of 1 each method
+    # is its own request
+    batch_size = batch_size or _config().method_batch
+    pending_methods = [mc for mc in method_chunks if method_class_key(mc) not in reused_names]
+    method_futures = []
+    for start in range(0, len(pending_methods), batch_size):
+        batch = pending_methods[start:start + batch_size]
+        if batch_size == 1:
+            future = executor.submit(enrich_method, batch[0]["class_name"], batch[0]["method"])
+            method_futures.append((batch, future, False))
+        else:
+            method_futures.append((batch, executor.submit(enrich_method_batch, batch), True))
+    class_futures = {
+        index: executor.submit(enrich_class, class_data, class_data.get("method_names", []))
+        for index, class_data in enumerate(class_chunks)
+        if index not in reused
+    }
+    
+    # Index enriched methods by their declaring class
+    methods_by_class = defaultdict(list)
+    for batch, future, batched in method_futures:
+        enriched_methods = future.result() if batched else [future.result()]
+        for method_chunk, enriched_method in zip(batch, enriched_methods):
+            methods_by_class[method_class_key(method_chunk)].append(enriched_method)
+    
+    enriched_classes = []
+    for index, class_data in enumerate(class_chunks):
+        enriched_class = reused.get(index)
+        if enriched_class is None:
+            # Compose the complete enriched class
+            class_meta = class_futures[index].result()
+            class_enriched_methods = methods_by_class.get(class_key(class_data), [])
+            enriched_class = compose_enriched_class(class_data, class_meta, class_enriched_methods)
+        # Don't carry LLM-failure fallbacks over to the next run
+        failed = "fallback" in enriched_class.get("enrichment", {}).get("tags", [])
+        if current is not None and not failed:
+            current[class_key(class_data)] = {"key": keys[index], "enriched_class": enriched_class}
+        enriched_classes.append(enriched_class)
+    return enriched_classes
+
+
+def _collect_class_enrichment(enriched_class: dict, summaries: list[str],
+                              tags: set[str], dependencies: set[str]) -> None:
+    """
+    Fold one enriched class into the file-level summary, tags and dependencies.
+    
+    Args:
+        enriched_class (dict): Enriched class from compose_enriched_class
+        summaries (list[str]): Per-class summaries, appended to
+        tags (set[str]): Tag set, updated in place
+        dependencies (set[str]): Dependency set, updated in place
+    """
+    class_enrich = enriched_class.get("enrichment", {})
+    if class_enrich.get("summary"):
+        summaries.append(f"{enriched_class['name']}: {class_enrich['summary']}")
+    # LLM output is not guaranteed to be flat strings
+    tags.update(t for t in class_enrich.get("tags", []) if isinstance(t, str))
+    dependencies.update(d for d in class_enrich.get("dependencies", []) if isinstance(d, str))
+
+
+def _substitute_enriched_classes(node: dict, enriched_by_name: dict, prefix: str = "") -> dict:
+    """
+    Return an AST node with its classes replaced by enriched versions.
+    
+    Recurses through namespace and class bodies to any depth. An enriched
+    class takes the place of the original, but its body keeps every
+    original member: methods are swapped for their enriched versions in
+    order, and nested classes are substituted in turn.
+    
+    Args:
+        node (dict): AST node
+        enriched_by_name (dict): Enriched classes keyed by qualified name
+        prefix (str): Qualified name of the enclosing node ("" at top level)
+        
+    Returns:
+        dict: The node itself, or a copy with enriched classes substituted
+    """
+    node_type = node.get(_TYPE)
+    if node_type not in _CONTAINER_TYPES:
+        # Keep other nodes as-is
+        return node
+    
+    qualified_name = _qualify(prefix, node.get(_NAME, ""))
+    if node_type == "Namespace":
+        return {
+            **node,
+            _BODY: [_substitute_enriched_classes(item, enriched_by_name, qualified_name)
+                    for item in node.get(_BODY, [])]
+        }
+    
+    enriched_class = enriched_by_name.get(qualified_name)
+    # The enriched body holds only the methods, in declaration order
+    enriched_methods = iter(enriched_class.get(_BODY, []) if enriched_class is not None else ())
+    enriched_body = []
+    for item in node.get(_BODY, []):
+        if item.get(_TYPE) == "Method":
+            enriched_body.append(next(enriched_methods, item))
+        else:
+            enriched_body.append(_substitute_enriched_classes(item, enriched_by_name, qualified_name))
+    return {**(enriched_class if enriched_class is not None else node), _BODY: enriched_body}
+
+
+def _enrich_whole_ast(ast_nodes: list[dict], enriched_output_path: str) -> dict:
+    """
+    Enrich the AST with a single whole-file LLM call and save the result.
+    
+    Shared by enrich_ast (when there are no methods to chunk) and
+    enrich_ast_original. In mock mode no LLM call is made.
+    
+    Args:
+        ast_nodes (list[dict]): List of AST node dictionaries to enrich
+        enriched_output_path (str): Path where the enriched JSON will be saved
+        
+    Returns:
+        dict: Combined data with the original AST and enrichment metadata
+    """
+    if is_mock_mode():
+        logger.info("Using mock enrichment for whole AST")
+        enriched = {
+            "summary": f"Mock analysis of {len(ast_nodes)} top-level nodes",
+            "dependencies": [],
+            "tags": ["mock"]
+        }
+    else:
+        enriched = extract_enriched_data(call_llm(ast_nodes))
+    
+    final_output = {
+        "ast": ast_nodes,
+        "summary": enriched.get("summary", ""),
+        "dependencies": enriched.get("dependencies", []),
+        "tags": enriched.get("tags", []),
+        "processing_info": {"strategy": "original"}
+    }
+    _dump_json(final_output, enriched_output_path)
+    logger.info(f"Original enrichment completed. Saved to {enriched_output_path}")
+    return final_output
+
+
+def enrich_ast(ast_nodes: list[dict], enriched_output_path: str, batch_size: int | None = None) -> dict:
     """
     Chunked enrichment pipeline: processes classes and methods separately.
     
@@ -764,6 +1581,7 @@ def enrich_ast(ast_nodes: list[dict], enriched_output_path: str) -> dict:
     Args:
         ast_nodes (list[dict]): List of AST node dictionaries to enrich
         enriched_output_path (str): Path where the enriched JSON will be saved
+        batch_size (int | None): Methods per LLM call; defaults to ENRICH_METHOD_BATCH
         
     Returns:
         dict: Combined data with the original AST and enrichment metadata
@@ -782,97 +1600,46 @@ def enrich_ast(ast_nodes: list[dict], enriched_output_path: str) -> dict:
         # If no methods to enrich, use original pipeline for simplicity
         if not method_chunks:
             logger.info("No method chunks detected, using original enrichment strategy...")
-            raw_response = call_llm(ast_nodes)
-            enriched = extract_enriched_data(raw_response)
-            final_output = {
-                "ast": ast_nodes,
-                "summary": enriched.get("summary", ""),
-                "dependencies": enriched.get("dependencies", []),
-                "tags": enriched.get("tags", []),
-                "processing_info": {"strategy": "original"}
-            }
-            with open(enriched_output_path, "w", encoding="utf-8") as f:
-                json.dump(final_output, f, indent=2)
-            logger.info(f"Original enrichment completed. Saved to {enriched_output_path}")
-            return final_output
+            return _enrich_whole_ast(ast_nodes, enriched_output_path)
         
         logger.info(f"Found {len(class_chunks)} classes and {len(method_chunks)} methods")
         
-        # Step 2: Enrich classes
-        enriched_classes = []
-        for class_data in class_chunks:
-            class_methods = class_data.get("method_names", [])
-            class_meta = enrich_class(class_data, class_methods)
-            
-            # Find enriched methods for this class
-            class_enriched_methods = []
-            for method_chunk in method_chunks:
-                if method_chunk["class_name"] == class_data["name"]:
-                    enriched_method = enrich_method(method_chunk["class_name"], method_chunk["method"])
-                    class_enriched_methods.append(enriched_method)
-            
-            # Compose the complete enriched class
-            enriched_class = compose_enriched_class(class_data, class_meta, class_enriched_methods)
-            enriched_classes.append(enriched_class)
+        # Step 2: Enrich methods and classes concurrently on one shared pool
+        # (classes unchanged since the previous run for this output are reused)
+        previous_classes = _load_incremental(enriched_output_path)
+        current_classes = {}
+        with _enrichment_executor(_config().workers) as executor:
+            enriched_classes = _enrich_class_chunks(
+                class_chunks, method_chunks, executor, previous_classes, current_classes, batch_size
+            )
+        _save_incremental(enriched_output_path, current_classes)
         
         # Step 3: Aggregate class-level data for overall summary
         all_summaries = []
-        all_tags = []
-        all_dependencies = []
+        unique_tags: set[str] = set()
+        unique_dependencies: set[str] = set()
         
         for enriched_class in enriched_classes:
-            class_enrich = enriched_class.get("class_enrichment", {})
-            if class_enrich.get("summary"):
-                all_summaries.append(f"{enriched_class['name']}: {class_enrich['summary']}")
-            all_tags.extend(class_enrich.get("tags", []))
-            all_dependencies.extend(class_enrich.get("dependencies", []))
-        
-        # Remove duplicates and create overall summary
-        unique_tags = list(set(all_tags))
-        unique_dependencies = list(set(all_dependencies))
+            _collect_class_enrichment(enriched_class, all_summaries, unique_tags, unique_dependencies)
+        
+        # Create overall summary
         overall_summary = "; ".join(all_summaries) if all_summaries else "C# code analysis"
         
         # Step 4: Replace classes in AST with enriched versions
-        enriched_ast = []
-        for node in ast_nodes:
-            if node.get("type") == "Namespace":
-                # Create new namespace with enriched classes
-                enriched_body = []
-                for body_item in node.get("body", []):
-                    if body_item.get("type") == "Class":
-                        # Find the corresponding enriched class
-                        enriched_class = None
-                        for ec in enriched_classes:
-                            if ec["name"] == body_item["name"]:
-                                enriched_class = ec
-                                break
-                        
-                        if enriched_class:
-                            enriched_body.append(enriched_class)
-                        else:
-                            # Keep original if no enrichment found
-                            enriched_body.append(body_item)
-                    else:
-                        # Keep non-class items as-is
-                        enriched_body.append(body_item)
-                
-                # Create new namespace with enriched body
-                enriched_namespace = {
-                    **node,
-                    "body": enriched_body
-                }
-                enriched_ast.append(enriched_namespace)
-            else:
-                # Keep non-namespace nodes as-is
-                enriched_ast.append(node)
+        enriched_by_name = {}
+        for class_data, ec in zip(class_chunks, enriched_classes):
+            enriched_by_name.setdefault(class_data["qualifiedName"], ec)
+        
+        enriched_ast = [_substitute_enriched_classes(node, enriched_by_name) for node in ast_nodes]
         
         # Step 5: Create final output
         final_output = {
             "ast": enriched_ast,
             "summary": overall_summary,
-            "dependencies": unique_dependencies,
-            "tags": unique_tags,
-            "enriched_classes": enriched_classes,
+            "dependencies": sorted(unique_dependencies),
+            "tags": sorted(unique_tags),
+            # Enriched classes are inlined in "ast"; list names only to avoid duplicating them
+            "enriched_class_names": [ec["name"] for ec in enriched_classes],
             "processing_info": {
                 "classes_processed": len(class_chunks),
                 "methods_processed": len(method_chunks),
@@ -881,8 +1648,7 @@ def enrich_ast(ast_nodes: list[dict], enriched_output_path: str) -> dict:
         }
 
         # Step 6: Save the enriched data
-        with open(enriched_output_path, "w", encoding="utf-8") as f:
-            json.dump(final_output, f, indent=2)
+        _dump_json(final_output, enriched_output_path)
 
         logger.info(f"Chunked enrichment completed. Saved to {enriched_output_path}")
         logger.info(f"Processed {len(class_chunks)} classes and {len(method_chunks)} methods")
@@ -907,8 +1673,7 @@ def enrich_ast(ast_nodes: list[dict], enriched_output_path: str) -> dict:
         
         # Try to save the fallback output
         try:
-            with open(enriched_output_path, "w", encoding="utf-8") as f:
-                json.dump(fallback_output, f, indent=2)
+            _dump_json(fallback_output, enriched_output_path)
             logger.info(f"Fallback output saved to {enriched_output_path}")
         except Exception as save_error:
             logger.error(f"Failed to save fallback output: {save_error}")
@@ -917,69 +1682,86 @@ def enrich_ast(ast_nodes: list[dict], enriched_output_path: str) -> dict:
         raise
 
 
-# Original enrichment functions (kept for backward compatibility)
-
-def call_llm_original(ast_nodes: list[dict]) -> dict:
+def enrich_ast_stream(ast_path: str, enriched_output_path: str) -> dict:
     """
-    Original function: Calls the LLM with full AST and returns raw JSON response.
-    Kept for backward compatibility.
+    Chunked enrichment that streams the AST from disk instead of loading it.
+    
+    Top-level nodes are read one at a time with ijson, enriched, and written
+    straight to the output file, so peak memory is bounded by the largest
+    top-level node rather than the whole AST. Unlike enrich_ast there is no
+    whole-AST fallback for files without methods, since that needs the
+    entire AST in one prompt.
     
     Args:
-        ast_nodes (list[dict): List of AST node dictionaries to analyze
+        ast_path (str): Path to the AST JSON file (a top-level array)
+        enriched_output_path (str): Path where the enriched JSON will be saved
         
     Returns:
-        dict: Raw JSON response from the LLM API
+        dict: Enrichment metadata (everything in the output except "ast")
+        
+    Raises:
+        Exception: If any step in the pipeline fails
     """
-    prompt = build_prompt(ast_nodes)
-    logger.debug(f"Prompt length: {len(prompt)} characters")
+    summaries: list[str] = []
+    unique_tags: set[str] = set()
+    unique_dependencies: set[str] = set()
+    class_names: list[str] = []
+    counts = {"classes_processed": 0, "methods_processed": 0}
+    previous_classes = _load_incremental(enriched_output_path)
+    current_classes = {}
     
-    payload = {
-        "model": LLM_MODEL,
-        "prompt": prompt,
-        "stream": False,
-        "options": {
-            "temperature": 0.0,
-            "top_p": 0.9,
-            "max_tokens": 512
-        }
-    }
+    def enriched_nodes(f, executor):
+        for node in ijson.items(f, "item", use_float=True):
+            chunks = extract_chunks([node])
+            class_chunks = chunks["class_chunks"]
+            if class_chunks:
+                enriched_classes = _enrich_class_chunks(
+                    class_chunks, chunks["method_chunks"], executor, previous_classes, current_classes
+                )
+                counts["classes_processed"] += len(class_chunks)
+                counts["methods_processed"] += len(chunks["method_chunks"])
+                
+                enriched_by_name = {}
+                for class_data, ec in zip(class_chunks, enriched_classes):
+                    _collect_class_enrichment(ec, summaries, unique_tags, unique_dependencies)
+                    class_names.append(ec["name"])
+                    enriched_by_name.setdefault(class_data["qualifiedName"], ec)
+                node = _substitute_enriched_classes(node, enriched_by_name)
+            yield node
     
-    logger.info(f"Using LLM model: {LLM_MODEL}")
+    metadata = {}
+    
+    def sections(f, executor):
+        # Everything after "ast" is computed once the AST has been streamed
+        yield "ast", enriched_nodes(f, executor)
+        metadata.update({
+            "summary": "; ".join(summaries) if summaries else "C# code analysis",
+            "dependencies": sorted(unique_dependencies),
+            "tags": sorted(unique_tags),
+            "enriched_class_names": class_names,
+            "processing_info": {**counts, "strategy": "chunked_stream"}
+        })
+        yield from metadata.items()
     
     try:
-        logger.info(f"Sending request to Ollama API at {OLLAMA_BASE_URL}/api/generate")
-        
-        response = requests.post(
-            f"{OLLAMA_BASE_URL}/api/generate",
-            headers={"Content-Type": "application/json"},
-            json=payload,
-            timeout=600
-        )
-        
-        logger.info(f"Received response from Ollama API: HTTP {response.status_code}")
-        response.raise_for_status()
-        
-        try:
-            result = response.json()
-            if result:
-                logger.info(f"Response keys: {list(result.keys())}")
-            return result
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON from response: {e}")
-            logger.error(f"Raw response text: {response.text[:200]}...")
-            return {
-                "response": "",
-                "error": f"Invalid JSON in response: {str(e)}",
-                "raw_text": response.text[:500] if response.text else ""
-            }
-            
-    except requests.RequestException as e:
-        logger.error(f"Error calling Ollama LLM: {e}")
-        return {
-            "response": "",
-            "error": f"Request failed: {str(e)}",
-            "exception_type": type(e).__name__
-        }
+        logger.info(f"Starting streaming chunked enrichment of {ast_path}...")
+        with open(ast_path, "rb") as f, _enrichment_executor(_config().workers) as executor:
+            _dump_json(sections(f, executor), enriched_output_path)
+        _save_incremental(enriched_output_path, current_classes)
+        
+        logger.info(f"Streaming enrichment completed. Saved to {enriched_output_path}")
+        logger.info(f"Processed {counts['classes_processed']} classes and {counts['methods_processed']} methods")
+        return metadata
+    except Exception as e:
+        logger.error(f"Error in streaming enrichment pipeline: {e}")
+        raise
+
+
+# Original enrichment functions (kept for backward compatibility)
+
+# call_llm used to be rebound to a separate call_llm_original; both names
+# now refer to the same implementation
+call_llm_original = call_llm
 
 
 def enrich_ast_original(ast_nodes: list[dict], enriched_output_path: str) -> dict:
@@ -996,24 +1778,7 @@ def enrich_ast_original(ast_nodes: list[dict], enriched_output_path: str) -> dic
     """
     try:
         logger.info("Using original enrichment strategy...")
-        raw_response = call_llm_original(ast_nodes)
-        enriched = extract_enriched_data(raw_response)
-
-        final_output = {
-            "ast": ast_nodes,
-            "summary": enriched.get("summary", ""),
-            "dependencies": enriched.get("dependencies", []),
-            "tags": enriched.get("tags", []),
-            "processing_info": {
-                "strategy": "original"
-            }
-        }
-
-        with open(enriched_output_path, "w", encoding="utf-8") as f:
-            json.dump(final_output, f, indent=2)
-
-        logger.info(f"Original enrichment completed. Saved to {enriched_output_path}")
-        return final_output
+        return _enrich_whole_ast(ast_nodes, enriched_output_path)
     except Exception as e:
         logger.error(f"Error in original enrichment pipeline: {e}")
         fallback_output = {
@@ -1025,21 +1790,34 @@ def enrich_ast_original(ast_nodes: list[dict], enriched_output_path: str) -> dic
         }
         
         try:
-            with open(enriched_output_path, "w", encoding="utf-8") as f:
-                json.dump(fallback_output, f, indent=2)
+            _dump_json(fallback_output, enriched_output_path)
             logger.info(f"Fallback output saved to {enriched_output_path}")
         except Exception as save_error:
             logger.error(f"Failed to save fallback output: {save_error}")
             
         raise
 
-# Alias for backward compatibility
-call_llm = call_llm_original
 
 # Mock enrichment for testing without LLM
 def is_mock_mode():
-    """Check if mock enrichment mode is enabled."""
-    return os.getenv("MOCK_ENRICHMENT", "false").lower() == "true"
+    """Check if mock enrichment mode is enabled (resolved once per process)."""
+    return _config().mock_mode
+
+
+def refresh_mock_mode():
+    """Re-read MOCK_ENRICHMENT (and the other LLM settings) from the environment."""
+    _config.cache_clear()
+
+
+# Class-name suffixes recognised by mock_enrich_class:
+# suffix -> (tags, summary template for the rest of the name, extra dependencies)
+_SUFFIX_META = {
+    "Controller": (("controller", "api", "web"), "API controller for {} operations", ("IActionResult", "HttpContext")),
+    "Service": (("service", "business-logic"), "Business service handling {} logic", ("Repository", "Domain")),
+    "Repository": (("repository", "data-access", "persistence"), "Data access repository for {} entities", ("Entity", "DbContext")),
+    "Request": (("dto", "request", "model"), "Data transfer object for {} requests", ()),
+}
+
 
 def mock_enrich_class(class_data: dict, methods: list[str]) -> dict:
     """
@@ -1048,37 +1826,31 @@ def mock_enrich_class(class_data: dict, methods: list[str]) -> dict:
     class_name = class_data.get('name', 'Unknown')
     base_types = class_data.get('baseTypes', [])
     
-    # Generate realistic mock data based on class characteristics
-    if 'Controller' in class_name:
-        return {
-            "summary": f"API controller for {class_name.replace('Controller', '').lower()} operations",
-            "tags": ["controller", "api", "web"],
-            "dependencies": base_types + ["IActionResult", "HttpContext"]
-        }
-    elif 'Service' in class_name:
-        return {
-            "summary": f"Business service handling {class_name.replace('Service', '').lower()} logic",
-            "tags": ["service", "business-logic"],
-            "dependencies": base_types + ["Repository", "Domain"]
-        }
-    elif 'Repository' in class_name:
-        return {
-            "summary": f"Data access repository for {class_name.replace('Repository', '').lower()} entities",
-            "tags": ["repository", "data-access", "persistence"],
-            "dependencies": base_types + ["Entity", "DbContext"]
-        }
-    elif 'Request' in class_name:
-        return {
-            "summary": f"Data transfer object for {class_name.replace('Request', '').lower()} requests",
-            "tags": ["dto", "request", "model"],
-            "dependencies": base_types
-        }
-    else:
-        return {
-            "summary": f"Domain entity representing {class_name.lower()}",
-            "tags": ["entity", "domain", "model"],
-            "dependencies": base_types
-        }
+    # Generate realistic mock data based on the class name suffix
+    for suffix, (tags, template, extra_dependencies) in _SUFFIX_META.items():
+        if class_name.endswith(suffix):
+            return {
+                "summary": template.format(class_name[:-len(suffix)].lower()),
+                "tags": list(tags),
+                "dependencies": base_types + list(extra_dependencies)
+            }
+    
+    return {
+        "summary": f"Domain entity representing {class_name.lower()}",
+        "tags": ["entity", "domain", "model"],
+        "dependencies": base_types
+    }
+
+
+# Method-name prefixes recognised by mock_enrich_method, longest first:
+# (lower-case prefix, (tags, summary template for the rest of the name))
+_PREFIX_DISPATCH = tuple(sorted({
+    "get": (("getter", "query", "read"), "Retrieves {} data"),
+    "create": (("create", "write", "insert"), "Creates a new {}"),
+    "update": (("update", "write", "modify"), "Updates existing {}"),
+    "delete": (("delete", "write", "remove"), "Deletes {}"),
+}.items(), key=lambda item: len(item[0]), reverse=True))
+
 
 def mock_enrich_method(class_name: str, method_data: dict) -> dict:
     """
@@ -1093,24 +1865,19 @@ def mock_enrich_method(class_name: str, method_data: dict) -> dict:
     tags = ["method"]
     dependencies = []
     
+    lowered = method_name.lower()
     if method_type == "Constructor":
         summary = f"Initializes a new instance of {class_name}"
         tags.extend(["constructor", "initialization"])
-    elif method_name.lower().startswith('get'):
-        summary = f"Retrieves {method_name[3:].lower()} data"
-        tags.extend(["getter", "query", "read"])
-    elif method_name.lower().startswith('create'):
-        summary = f"Creates a new {method_name[6:].lower()}"
-        tags.extend(["create", "write", "insert"])
-    elif method_name.lower().startswith('update'):
-        summary = f"Updates existing {method_name[6:].lower()}"
-        tags.extend(["update", "write", "modify"])
-    elif method_name.lower().startswith('delete'):
-        summary = f"Deletes {method_name[6:].lower()}"
-        tags.extend(["delete", "write", "remove"])
     else:
-        summary = f"Performs {method_name.lower()} operation"
-        tags.append("operation")
+        for prefix, (prefix_tags, template) in _PREFIX_DISPATCH:
+            if lowered.startswith(prefix):
+                summary = template.format(lowered[len(prefix):])
+                tags.extend(prefix_tags)
+                break
+        else:
+            summary = f"Performs {lowered} operation"
+            tags.append("operation")
     
     # Add dependencies from parameters and return type
     if return_type:
@@ -1124,11 +1891,16 @@ def mock_enrich_method(class_name: str, method_data: dict) -> dict:
         "enrichment": {
             "summary": summary,
             "tags": tags,
-            "dependencies": list(set(dependencies))  # Remove duplicates
+            "dependencies": list(dict.fromkeys(dependencies))  # Remove duplicates, keep order
         }
     }
 
-def call_llm_with_retry(prompt: str, max_retries: int = 3, timeout: int = 45) -> dict:
+# Default stop sequences: end generation after a single JSON object
+_STOP_SEQUENCES = ["}\n", "}\r\n", "}\r", "JSON:", "\n\n", "```", "SYSTEM:", "INSTRUCTION:", "FORMAT:", "RULES:", "Method:", "Class:"]
+
+
+def call_llm_with_retry(prompt: str, max_retries: int = 3, timeout: int = 45,
+                        num_predict: int = 150, stop: list[str] | None = None) -> dict:
     """
     Call LLM with retry mechanism for better reliability.
     
@@ -1136,6 +1908,8 @@ def call_llm_with_retry(prompt: str, max_retries: int = 3, timeout: int = 45) ->
         prompt (str): The prompt to send to the LLM
         max_retries (int): Maximum number of retry attempts
         timeout (int): Timeout for each request
+        num_predict (int): Maximum number of tokens to generate
+        stop (list[str] | None): Stop sequences; defaults to ending after a single JSON object
         
     Returns:
         dict: LLM response or error response
@@ -1145,35 +1919,36 @@ def call_llm_with_retry(prompt: str, max_retries: int = 3, timeout: int = 45) ->
     for attempt in range(max_retries):
         try:
             payload = {
-                "model": LLM_MODEL,
+                "model": _config().model,
                 "prompt": prompt,
                 "stream": False,
                 "options": {
                     "temperature": 0.0,     # Deterministic output
                     "top_p": 0.1,          # Very focused
                     "max_tokens": 200,     # Shorter responses
-                    "stop": ["}\n", "}\r\n", "}\r", "JSON:", "\n\n", "```", "SYSTEM:", "INSTRUCTION:", "FORMAT:", "RULES:", "Method:", "Class:"],  # Stop after JSON object
+                    "stop": stop if stop is not None else _STOP_SEQUENCES,  # Stop after JSON object
                     "repeat_penalty": 1.0,  # No penalty
-                    "num_predict": 150,     # Predict fewer tokens
+                    "num_predict": num_predict,  # Predict fewer tokens
                     "mirostat": 2,         # Use mirostat for better stopping
                     "mirostat_tau": 1.0
                 }
             }
             
             logger.debug(f"LLM call attempt {attempt + 1}/{max_retries}")
-            response = requests.post(
-                f"{OLLAMA_BASE_URL}/api/generate",
+            response = _SESSION.post(
+                f"{_config().base_url}/api/generate",
                 headers={"Content-Type": "application/json"},
-                json=payload,
+                data=orjson.dumps(payload),
                 timeout=timeout
             )
             response.raise_for_status()
             
-            # Log the raw response for debugging
-            raw_response_text = response.text[:300] if response.text else "No response text"
-            logger.debug(f"Raw LLM response (attempt {attempt + 1}): {raw_response_text}")
+            # Log the raw response for debugging; only decode it when it will be shown
+            if logger.isEnabledFor(logging.DEBUG):
+                raw_response_text = response.content[:300].decode("utf-8", "replace") or "No response text"
+                logger.debug(f"Raw LLM response (attempt {attempt + 1}): {raw_response_text}")
             
-            result = response.json()
+            result = orjson.loads(response.content)
             
             # Validate that we got a proper response
             if "response" in result:
@@ -1191,14 +1966,13 @@ def call_llm_with_retry(prompt: str, max_retries: int = 3, timeout: int = 45) ->
             else:
                 raise ValueError("No 'response' field in LLM result")
                 
-        except (requests.RequestException, json.JSONDecodeError, ValueError) as e:
+        except (requests.RequestException, orjson.JSONDecodeError, ValueError) as e:
             last_error = e
             logger.warning(f"LLM call attempt {attempt + 1} failed: {e}")
             if attempt < max_retries - 1:
                 # Wait before retrying (exponential backoff)
                 wait_time = 2 ** attempt
                 logger.info(f"Retrying in {wait_time} seconds...")
-                import time
                 time.sleep(wait_time)
             continue
     
@@ -1,7 +1,9 @@
 import os
 import zipfile
 import shutil
-from typing import List, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 
 # Default folder where ZIPs or raw folders are dropped
 DEFAULT_INPUT_DIR = os.path.abspath(
@@ -14,9 +16,130 @@ RAW_DIR_DEFAULT = os.path.abspath(
 )
 
 
-def extract_source(input_path: str = None, raw_dir: str = None) -> List[str]:
+def _fast_copy(src: str, dst: str) -> str:
+    """Hard-links src to dst, falling back to a real copy.
+
+    On the same filesystem a hard link costs one directory entry instead of
+    rewriting every byte. The pipeline only reads from and removes files in
+    raw_dir, so sharing the inode with the input is safe. Cross-device
+    links (and filesystems without link support) fall back to copy2.
+    """
+    if os.path.lexists(dst):
+        # os.link will not overwrite, and copy2 onto an existing link to
+        # the same inode raises SameFileError
+        os.unlink(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+    return dst
+
+
+def _extract_member(zf: zipfile.ZipFile, name: str, raw_dir: str) -> None:
+    """Extracts one archive member, tolerating concurrent directory creation.
+
+    ZipFile.extract checks for the parent directory and then creates it, so
+    two threads extracting into the same new directory can race; the loser
+    gets FileExistsError and simply retries now that the directory exists.
+    """
+    try:
+        zf.extract(name, raw_dir)
+    except FileExistsError:
+        zf.extract(name, raw_dir)
+
+
+def _extract_zips(zip_paths: List[str], raw_dir: str, workers: Optional[int] = None) -> None:
+    """Extracts the members of one or more ZIP files into raw_dir in parallel.
+
+    zlib releases the GIL while inflating, so members are spread over a
+    thread pool. Each worker thread opens its own ZipFile handle per archive
+    because a ZipFile's underlying file object cannot be shared safely. A
+    member path found in several archives is taken from the last of them.
+
+    Args:
+        zip_paths: ZIP files to extract.
+        raw_dir: Destination directory.
+        workers: Number of extraction threads (defaults to min(8, CPU count)).
+    """
+    # One task per target path: when archives share a member, only the last
+    # archive's copy is extracted (as with sequential extraction), so no two
+    # threads ever write the same file
+    member_sources = {}
+    for zip_path in zip_paths:
+        with zipfile.ZipFile(zip_path, 'r') as zf:
+            for name in zf.namelist():
+                member_sources[name] = zip_path
+    tasks = [(zip_path, name) for name, zip_path in member_sources.items()]
+
+    workers = workers or min(8, os.cpu_count() or 1)
+    if workers == 1 or len(tasks) < 2:
+        for zip_path in zip_paths:
+            with zipfile.ZipFile(zip_path, 'r') as zf:
+                zf.extractall(raw_dir)
+        return
+
+    local = threading.local()
+    handles: List[zipfile.ZipFile] = []
+    handles_lock = threading.Lock()
+
+    def extract(task: Tuple[str, str]) -> None:
+        zip_path, name = task
+        thread_handles = getattr(local, 'handles', None)
+        if thread_handles is None:
+            thread_handles = local.handles = {}
+        zf = thread_handles.get(zip_path)
+        if zf is None:
+            zf = thread_handles[zip_path] = zipfile.ZipFile(zip_path, 'r')
+            with handles_lock:
+                handles.append(zf)
+        _extract_member(zf, name, raw_dir)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # list() re-raises the first extraction error, if any
+            list(executor.map(extract, tasks))
+    finally:
+        for zf in handles:
+            zf.close()
+
+
+def _scan_files(root_dir: str, allowed_exts: Tuple[str, ...]) -> Tuple[List[str], bool]:
+    """Lists every file under root_dir in a single os.scandir traversal.
+
+    Args:
+        root_dir: Directory to scan.
+        allowed_exts: Tuple of allowed (lower-case) file extensions.
+
+    Returns:
+        Tuple of (file paths, whether any file has an allowed extension).
+    """
+    files: List[str] = []
+    found = False
+    stack = [root_dir]
+    while stack:
+        directory = stack.pop()
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    files.append(entry.path)
+                    if not found and entry.name.lower().endswith(allowed_exts):
+                        found = True
+    return files, found
+
+
+def extract_source(
+    input_path: str = None,
+    raw_dir: str = None,
+    allowed_exts: Tuple[str, ...] = ('.cs',)
+) -> Tuple[List[str], bool]:
     """Extracts a ZIP (or multiple ZIPs) or copies a folder into raw_dir.
        If input_path is None, uses the project’s input_code folder.
+
+    Returns:
+        Tuple of (extracted file paths, whether any file has an allowed
+        extension). Pass the flag to validate_raw to avoid re-walking raw_dir.
     """
     # pick up default input_code folder if none provided
     if input_path is None:
@@ -34,8 +157,7 @@ def extract_source(input_path: str = None, raw_dir: str = None) -> List[str]:
     try:
         if zipfile.is_zipfile(input_path):
             # directly extract a single zip
-            with zipfile.ZipFile(input_path, 'r') as zf:
-                zf.extractall(raw_dir)
+            _extract_zips([input_path], raw_dir)
 
         elif os.path.isdir(input_path):
             # first, extract any .zip files in that folder
@@ -44,19 +166,19 @@ def extract_source(input_path: str = None, raw_dir: str = None) -> List[str]:
                 if name.lower().endswith('.zip')
             ]
             if zip_files:
-                for zname in zip_files:
-                    zpath = os.path.join(input_path, zname)
-                    with zipfile.ZipFile(zpath, 'r') as zf:
-                        zf.extractall(raw_dir)
+                _extract_zips(
+                    [os.path.join(input_path, zname) for zname in zip_files],
+                    raw_dir
+                )
             else:
                 # no zips found → copy all files/dirs as raw
                 for name in os.listdir(input_path):
                     src = os.path.join(input_path, name)
                     dst = os.path.join(raw_dir, name)
                     if os.path.isdir(src):
-                        shutil.copytree(src, dst, dirs_exist_ok=True)
+                        shutil.copytree(src, dst, copy_function=_fast_copy, dirs_exist_ok=True)
                     else:
-                        shutil.copy2(src, dst)
+                        _fast_copy(src, dst)
         else:
             raise RuntimeError(f"Unsupported input type: {input_path}")
 
@@ -64,20 +186,23 @@ def extract_source(input_path: str = None, raw_dir: str = None) -> List[str]:
         raise RuntimeError(f"Failed to extract {input_path}: {e}") from e
 
     # collect and return file list
-    extracted_files: List[str] = []
-    for root, _, files in os.walk(raw_dir):
-        for fname in files:
-            extracted_files.append(os.path.join(root, fname))
+    extracted_files, found = _scan_files(raw_dir, allowed_exts)
     print("Extraction successful")
-    return extracted_files
+    return extracted_files, found
 
 
-def validate_raw(raw_dir: str, allowed_exts: Tuple[str, ...] = ('.cs',)) -> None:
+def validate_raw(
+    raw_dir: str,
+    allowed_exts: Tuple[str, ...] = ('.cs',),
+    found: Optional[bool] = None
+) -> None:
     """Validates that raw_dir contains at least one file with allowed extensions.
 
     Args:
         raw_dir: Directory to validate.
         allowed_exts: Tuple of allowed file extensions.
+        found: Result already computed by extract_source; when given,
+            raw_dir is not walked again.
 
     Raises:
         ValueError: if no allowed files are found.
@@ -85,14 +210,8 @@ def validate_raw(raw_dir: str, allowed_exts: Tuple[str, ...] = ('.cs',)) -> None
     if not os.path.isdir(raw_dir):
         raise ValueError(f"Raw directory does not exist: {raw_dir}")
 
-    found = False
-    for root, _, files in os.walk(raw_dir):
-        for fname in files:
-            if os.path.splitext(fname)[1].lower() in allowed_exts:
-                found = True
-                break
-        if found:
-            break
+    if found is None:
+        _, found = _scan_files(raw_dir, allowed_exts)
 
     if not found:
         raise ValueError(
@@ -120,8 +239,8 @@ if __name__ == "__main__":
     raw_dir = args.raw_dir or RAW_DIR_DEFAULT
 
     try:
-        files = extract_source(args.input_path, raw_dir)
-        validate_raw(raw_dir)
+        files, found = extract_source(args.input_path, raw_dir)
+        validate_raw(raw_dir, found=found)
         print(f"Extracted {len(files)} files into {raw_dir}")
     except Exception as e:
         print(f"Error during extraction: {e}")
@@ -1,32 +1,382 @@
 """Graph insertion module."""
-import json
+import orjson
 import sys
 import os
 import logging
-from datetime import datetime
-from pipeline.models import CodeEntity,File,ContainsRel,Project,Module 
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from neomodel import ConstraintValidationFailed, config, db
+from neo4j.exceptions import TransientError
+from pipeline.models import close_connection, install_schema
 from  pathlib import Path
 
 logger = logging.getLogger("csharp-parser")
 
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "4"))
+INGEST_READAHEAD = 64
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "5000"))
+INGEST_RETRIES = 3
+INGEST_RETRY_DELAY = 0.5
+
+INGEST_TX_ROWS = int(os.getenv("INGEST_TX_ROWS", "20000"))
+# Curated files of a directory handed to one ingest_enriched_batch call
+INGEST_BATCH_FILES = 200
+
+_ROW_BUFFER_KEYS = ("seeds", "entities", "links", "contains", "params", "returns", "impls")
+_row_buffers = threading.local()
+
+# Drivers opened by ingestion worker threads, closed once the pool finishes
+_worker_drivers = []
+_worker_drivers_lock = threading.Lock()
+
+_ACCESS_MODIFIERS = frozenset({"public", "private", "protected", "internal"})
+
+# Keys under which an AST node nests its children; CONTAINS edges are only
+# created for the first three.
+_CHILD_KEYS = ("body", "members", "statements", "children")
+_CONTAINS_KEYS = ("body", "members", "statements")
+
+# Project -> Module -> File chain for each curated file, merged in one query.
+MERGE_SEEDS_QUERY = """
+UNWIND $rows AS r
+MERGE (p:Project {uid: r.project_uid})
+ON CREATE SET p.name = r.project_name, p.created_at = $now
+MERGE (m:Module {uid: r.module_uid})
+ON CREATE SET m.name = r.module_name, m.path = r.module_path, m.module_type = r.module_type
+MERGE (p)-[:HAS_MODULE]->(m)
+MERGE (f:File {uid: r.file_uid})
+ON CREATE SET f += r.file_props, f.last_modified = $now
+MERGE (m)-[:HAS_FILE]->(f)
+"""
+
+# Existence probe for the entities being written.
+EXISTING_ENTITIES_QUERY = """
+UNWIND $uids AS u
+MATCH (e:CodeEntity {uid: u})
+RETURN u
+"""
+
+# One round-trip per batch instead of a get_or_none/save pair per AST node.
+MERGE_ENTITIES_QUERY = """
+UNWIND $rows AS r
+MERGE (e:CodeEntity {uid: r.uid})
+ON CREATE SET e += r.props
+"""
+
+MERGE_FILE_ENTITIES_QUERY = """
+UNWIND $rows AS r
+MATCH (f:File {uid: r.f}), (e:CodeEntity {uid: r.uid})
+MERGE (f)-[rel:HAS_ENTITY]->(e)
+ON CREATE SET rel.start_line = r.s, rel.end_line = r.e
+RETURN count(rel)
+"""
+
+MERGE_CONTAINS_QUERY = """
+UNWIND $rows AS r
+MATCH (p:CodeEntity {uid: r.p}), (c:CodeEntity {uid: r.c})
+MERGE (p)-[rel:CONTAINS]->(c)
+ON CREATE SET rel.start_line = r.s, rel.end_line = r.e
+RETURN count(rel)
+"""
+
+MERGE_PARAMETERS_QUERY = """
+UNWIND $rows AS r
+MATCH (m:CodeEntity {uid: r.m})
+MERGE (p:CodeEntity {uid: r.uid})
+ON CREATE SET p.name = r.name, p.type = 'Parameter', p.metadata = r.metadata
+MERGE (m)-[rel:HAS_PARAMETER]->(p)
+RETURN count(rel)
+"""
+
+# ReturnType and Interface nodes repeat across methods and classes, so the
+# distinct ones are merged once and the edge queries only match them.
+MERGE_TYPE_NODES_QUERY = """
+UNWIND $rows AS r
+MERGE (t:CodeEntity {uid: r.uid})
+ON CREATE SET t.name = r.name, t.type = r.type
+"""
+
+MERGE_RETURNS_QUERY = """
+UNWIND $rows AS r
+MATCH (m:CodeEntity {uid: r.m}), (t:CodeEntity {uid: r.uid})
+MERGE (m)-[rel:RETURNS]->(t)
+RETURN count(rel)
+"""
+
+MERGE_IMPLEMENTS_QUERY = """
+UNWIND $rows AS r
+MATCH (c:CodeEntity {uid: r.f}), (i:CodeEntity {uid: r.uid})
+MERGE (c)-[rel:IMPLEMENTS]->(i)
+RETURN count(rel)
+"""
+
+class AstNode:
+    """
+    Slotted view of one AST dict holding just the fields ingestion reads.
+
+    Built once per node during traversal so the later passes use attribute
+    access instead of repeated dict lookups with defaults.
+    """
+    __slots__ = ("uid", "type", "name", "start_line", "end_line", "modifiers", "base_types",
+                 "return_type", "parameters", "enrichment", "method_names")
+
+    def __init__(self, raw, node_type):
+        self.type = node_type
+        self.name = raw.get("name")
+        self.start_line = raw.get("startLine")
+        self.end_line = raw.get("endLine")
+        self.modifiers = raw.get("modifiers") or ()
+        self.base_types = raw.get("baseTypes") or ()
+        self.return_type = raw.get("returnType", "void")
+        self.parameters = raw.get("parameters") or ()
+        self.enrichment = raw.get("enrichment") or {}
+        self.method_names = raw.get("method_names") or ()
+        if node_type and self.name:
+            self.uid = f"{node_type}:{self.name}:{raw.get('startLine', 0)}"
+        else:
+            self.uid = None
+
 def collect_all_nodes(ast_node):
-    """Recursively collect all nodes from AST."""
+    """
+    Iteratively collect all nodes from AST in a single breadth-first pass.
+
+    Each dict is converted to an AstNode once, and untyped enum members are
+    typed as "EnumMember" on the way down.
+
+    Returns:
+        Tuple of (nodes, contains_edges), where nodes are AstNode objects and
+        contains_edges holds (parent_uid, child_uid, start_line, end_line) tuples.
+    """
     nodes = []
-    queue = [ast_node]
+    contains_edges = []
+    root = AstNode(ast_node, ast_node.get("type"))
+    queue = deque([(ast_node, root)])
     while queue:
-        current = queue.pop()
-        nodes.append(current)
-        children = []
-        for key in ["body", "members", "statements", "children"]:
-            if key in current and isinstance(current[key], list):
-                children.extend(current[key])
-        queue.extend(children)
-    return nodes
+        current, node = queue.popleft()
+        nodes.append(node)
+        parent_uid = node.uid
+        for key in _CHILD_KEYS:
+            children = current.get(key)
+            if not children or not isinstance(children, list):
+                continue
+            for child in children:
+                if not isinstance(child, dict):
+                    continue
+                child_type = child.get("type")
+                # Handle enum members which might not have a type field
+                if key == "members" and "type" not in child and "name" in child and child.get("startLine"):
+                    child_type = "EnumMember"
+                    logger.debug(f"Fixed enum member node: {child['name']} at line {child.get('startLine')}")
+                child_node = AstNode(child, child_type)
+                if parent_uid and child_node.uid and key in _CONTAINS_KEYS:
+                    contains_edges.append((parent_uid, child_node.uid, child_node.start_line, child_node.end_line))
+                queue.append((child, child_node))
+    return nodes, contains_edges
+
+def _new_row_buffers():
+    """Return empty Cypher row buffers for one write."""
+    buffers = {key: [] for key in _ROW_BUFFER_KEYS}
+    # Keyed by uid so entities and ReturnType/Interface nodes are deduplicated
+    buffers["uids"] = {}
+    buffers["types"] = {}
+    return buffers
+
+def _thread_row_buffers():
+    """
+    Return this thread's Cypher row buffers, emptied for a new file.
+
+    The lists are reused across files instead of reallocated; they are
+    per-thread because files are ingested concurrently, and safe to clear
+    once the previous file's queries have returned.
+    """
+    buffers = getattr(_row_buffers, "rows", None)
+    if buffers is None:
+        buffers = _row_buffers.rows = _new_row_buffers()
+        return buffers
+    for buffer in buffers.values():
+        buffer.clear()
+    return buffers
+
+def _row_count(rows):
+    """Total number of rows queued for writing."""
+    return sum(len(buffer) for buffer in rows.values())
+
+def _batches(items, size=None):
+    """Yield consecutive slices of at most `size` items (INGEST_BATCH_SIZE by default)."""
+    size = size or INGEST_BATCH_SIZE
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def _run_count(query, rows, **params):
+    """
+    Run a batched UNWIND query and return the total count it reports.
+
+    Rows are sent INGEST_BATCH_SIZE at a time so a very large file does not
+    turn into a single huge UNWIND; all batches share the caller's transaction.
+    """
+    total = 0
+    for batch in _batches(rows):
+        results, _ = db.cypher_query(query, {**params, "rows": batch})
+        total += results[0][0] if results else 0
+    return total
+
+def _merge_type_nodes(rows):
+    """Merge the distinct ReturnType/Interface nodes of a file and return how many there are."""
+    for batch in _batches(rows):
+        db.cypher_query(MERGE_TYPE_NODES_QUERY, {"rows": batch})
+    return len(rows)
+
+def _count_existing(uids):
+    """Return how many of the given CodeEntity uids are already in the graph."""
+    uids = list(uids)
+    existing = 0
+    for batch in _batches(uids):
+        results, _ = db.cypher_query(EXISTING_ENTITIES_QUERY, {"uids": batch})
+        existing += len(results)
+    return existing
 
-def ingest_enriched_json(curated_path: str):
+def _entity_props(node):
+    """
+    Build the CodeEntity property map for an AstNode.
+
+    JSON properties are serialized the same way neomodel's JSONProperty
+    stores them so nodes written by Cypher inflate like OGM-created ones.
+    """
+    access_modifier = next((m for m in node.modifiers if m in _ACCESS_MODIFIERS), "")
+    signature = ""
+    if node.type == "Method":
+        params = ", ".join(f"{p.get('type', '')} {p.get('name', '')}" for p in node.parameters)
+        signature = f"{node.return_type} {node.name}({params})"
+    return {
+        "name": node.name,
+        "type": node.type,
+        "summary": node.enrichment.get("summary", ""),
+        "tags": orjson.dumps(node.enrichment.get("tags", [])).decode(),
+        "access_modifier": access_modifier,
+        "signature": signature,
+        "metadata": orjson.dumps({
+            "startLine": node.start_line,
+            "endLine": node.end_line,
+            "modifiers": node.modifiers,
+            "baseTypes": node.base_types,
+            "method_names": node.method_names
+        }).decode()
+    }
+
+def _advise_willneed(path):
+    """Ask the kernel to start reading a file into the page cache."""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _advise_dontneed(fd):
+    """Drop a curated file's pages from the page cache once it has been read."""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+
+def _open_worker_connection():
+    """Thread pool initializer: connect this worker and register its driver for shutdown."""
+    try:
+        db.set_connection(config.DATABASE_URL)
+    except Exception as e:
+        # Queries will retry the connection lazily and report per-file errors
+        logger.warning(f"Ingestion worker could not connect to Neo4j: {e}")
+        return
+    with _worker_drivers_lock:
+        _worker_drivers.append(db.driver)
+
+@contextmanager
+def ingest_session():
+    """
+    Hold one Neo4j connection open for a series of ingest calls on this thread.
+
+    neomodel keeps a driver per thread and opens it on the first query, so a
+    loader thread would otherwise leave its driver (and pooled connections)
+    open after it finishes. The schema is installed up front and the
+    driver is closed on exit.
+    """
+    try:
+        install_schema()
+    except Exception as e:
+        logger.warning(f"Could not install Neo4j constraints, MERGE will be slower: {e}")
+    if db.driver is None:
+        try:
+            db.set_connection(config.DATABASE_URL)
+        except Exception as e:
+            # Queries will retry the connection lazily and report per-file errors
+            logger.warning(f"Could not connect to Neo4j: {e}")
+    try:
+        yield
+    finally:
+        close_connection()
+
+def _iter_json_files(directory):
+    """Yield the JSON files directly inside a directory as the scan proceeds."""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.endswith(".json") and entry.is_file():
+                yield Path(entry.path)
+
+def _file_groups(paths, size=INGEST_BATCH_FILES):
+    """Yield lists of at most `size` consecutive paths as they are produced."""
+    group = []
+    for path in paths:
+        group.append(path)
+        if len(group) >= size:
+            yield group
+            group = []
+    if group:
+        yield group
+
+def _readahead(paths, depth=INGEST_READAHEAD):
+    """
+    Yield paths while keeping up to `depth` upcoming files in flight.
+
+    Reads of the next files are queued with the kernel before the current
+    one is processed, so storage sees a deep queue instead of one blocking
+    read at a time.
+    """
+    window = deque()
+    for path in paths:
+        _advise_willneed(path)
+        window.append(path)
+        if len(window) > depth:
+            yield window.popleft()
+    yield from window
+
+def ingest_enriched_json(curated_path, workers: int = None):
     """
     Read enriched JSON and create nodes/edges in Neo4j.
+
+    Args:
+        curated_path: A curated JSON file or a directory of them, or a dict
+            of already-loaded curated documents keyed by their file path
+            (the path supplies the project, module and file names)
+        workers: Number of files to ingest concurrently (defaults to INGEST_WORKERS)
     """
+    if isinstance(curated_path, dict):
+        logger.info(f"Starting ingestion of {len(curated_path)} in-memory curated documents")
+        # Nothing to read or scan; everything goes through one batched ingestion
+        ingest_enriched_batch(list(curated_path), documents=curated_path)
+        return
+
     logger.info(f"Starting ingestion of enriched JSON: {curated_path}")
     curated_path = Path(curated_path)
 
@@ -34,36 +384,75 @@ def ingest_enriched_json(curated_path: str):
         logger.error(f"Path does not exist: {curated_path}")
         return
 
+    # One timestamp for the whole run, stored as UTC epoch seconds like
+    # neomodel's DateTimeProperty
+    run_ts = datetime.now(timezone.utc).timestamp()
+
+    try:
+        install_schema()
+    except Exception as e:
+        logger.warning(f"Could not install Neo4j constraints, MERGE will be slower: {e}")
+
     # If a file is passed, process just that file
     if curated_path.is_file() and curated_path.suffix == ".json":
-        _process_single_file(curated_path)
+        _process_single_file(curated_path, run_ts)
         return
 
-    # If a directory is passed, process all JSON files inside
+    # If a directory is passed, process all JSON files inside. Files are
+    # ingested in groups whose rows are merged into one UNWIND per label and
+    # relationship type, rather than a round of queries per file.
     if curated_path.is_dir():
-        json_files = list(curated_path.glob("*.json"))
-        if not json_files:
+        file_groups = _file_groups(_iter_json_files(curated_path))
+        workers = max(1, workers or INGEST_WORKERS)
+        submitted = 0
+        if workers == 1:
+            for group in file_groups:
+                ingest_enriched_batch(group, run_ts=run_ts)
+                submitted += len(group)
+        else:
+            # Groups are independent and network-bound, so threads overlap the Bolt
+            # round-trips; neomodel keeps a separate connection per thread.
+            # Submission is bounded so the directory scan stays just ahead of
+            # the workers instead of being consumed at once.
+            # Every finished future's result() is taken, so a failed group
+            # raises here just as it would in the single-worker loop.
+            try:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest",
+                                        initializer=_open_worker_connection) as executor:
+                    pending = set()
+                    for group in file_groups:
+                        if len(pending) >= workers * 2:
+                            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                future.result()
+                        pending.add(executor.submit(ingest_enriched_batch, group, run_ts=run_ts))
+                        submitted += len(group)
+                    for future in wait(pending).done:
+                        future.result()
+            except Exception as e:
+                logger.error(f"Ingestion of {curated_path} failed: {e}")
+                raise
+            finally:
+                # neomodel's connection is thread-local, so each worker opened its own driver
+                with _worker_drivers_lock:
+                    drivers = list(_worker_drivers)
+                    _worker_drivers.clear()
+                for driver in drivers:
+                    driver.close()
+        if not submitted:
             logger.warning(f"No JSON files found in curated directory: {curated_path}")
-            return
-        for json_file in json_files:
-            _process_single_file(json_file)
         return
 
     logger.error(f"Invalid curated path: {curated_path}")
 
 
-def _process_single_file(file_path: Path):
+def _curated_names(file_path: Path):
     """
-    Process a single curated JSON file and create nodes/edges in Neo4j.
+    Derive the project, module and file names from a curated file name.
+
+    Returns:
+        Tuple of (project_name, module_name, file_name)
     """
-    logger.info(f"Processing curated file: {file_path}")
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    except Exception as e:
-        logger.error(f"Failed to read JSON file {file_path}: {e}")
-        return
-    
     file_stem = file_path.stem  # Remove .json
     parts = file_stem.split("_")
     if parts[-1].lower() == "enriched":
@@ -71,227 +460,312 @@ def _process_single_file(file_path: Path):
     project_name = parts[0]
     module_name = parts[1] if len(parts) >= 2 else "UnknownModule"
     file_name = parts[2] if len(parts) >= 3 else file_stem
+    return project_name, module_name, file_name
 
-    # --- Project node ---
-    project_uid = f"Project:{project_name}"
-    project_node = Project.nodes.get_or_none(uid=project_uid)
-    if not project_node:
-        project_node = Project(uid=project_uid, name=project_name).save()
-        logger.info(f"Created Project node: {project_name}")
-
-    # --- Module node ---
-    module_uid = f"Module:{project_name}/{module_name}"
-    module_node = Module.nodes.get_or_none(uid=module_uid)
-    if not module_node:
-        module_node = Module(
-            uid=module_uid,
-            name=module_name,
-            path=str(file_path.parent),
-            module_type="folder" if file_path.parent != file_path.parents[1] else "root"                
-        ).save()
-        logger.info(f"project_node.modules expects: {project_node.modules.definition['node_class']}")
-        logger.info(f"module_node is instance of: {type(module_node)}")
-        project_node.modules.connect(module_node) 
-        logger.info(f"Created Module node: {module_name}")
+def _read_curated_file(file_path: Path):
+    """
+    Load a curated JSON file and derive its project/module/file names.
+
+    Returns:
+        Tuple of (data, project_name, module_name, file_name), or None if the
+        file cannot be read.
+    """
+    try:
+        with open(file_path, "rb") as f:
+            data = orjson.loads(f.read())
+            _advise_dontneed(f.fileno())
+    except Exception as e:
+        logger.error(f"Failed to read JSON file {file_path}: {e}")
+        return None
+    return (data, *_curated_names(file_path))
+
+def _build_file_rows(file_path, data, project_name, module_name, rows):
+    """
+    Append the Cypher rows for one curated file to `rows`.
+
+    Entities and type nodes are deduplicated across everything already in
+    `rows`, so several files can share one set of buffers; HAS_ENTITY links
+    are always added for the file's own entities.
+
+    Returns:
+        Number of AST nodes collected from the file.
+    """
     file_uid = f"File:{file_path}"
-    file_node = File.nodes.get_or_none(uid=file_uid)
-    if not file_node:
-        try:
-            file_node = File(
-                uid=file_uid,
-                name=file_path.name,
-                path=str(file_path),
-                file_type=file_path.suffix.lstrip("."),
-                last_modified=datetime.now(),
-                content_hash=data.get("file_hash", ""),
-                lines_of_code=data.get("loc", 0),
-                size_bytes=data.get("size", 0)
-            ).save()
-            # Create HAS_FILE relationship between module and file
-            module_node.files.connect(file_node)
-            logger.info(f"Created File node: {file_name} and connected it to module: {module_name}")
-        except Exception as e:
-            logger.error(f"File node creation failed: {e}")
-            return
-    
-    
+    rows["seeds"].append({
+        "project_uid": f"Project:{project_name}",
+        "project_name": project_name,
+        "module_uid": f"Module:{project_name}/{module_name}",
+        "module_name": module_name,
+        "module_path": str(file_path.parent),
+        "module_type": "folder" if file_path.parent != file_path.parents[1] else "root",
+        "file_uid": file_uid,
+        "file_props": {
+            "name": file_path.name,
+            "path": str(file_path),
+            "file_type": file_path.suffix.lstrip("."),
+            "content_hash": data.get("file_hash", ""),
+            "lines_of_code": data.get("loc", 0),
+            "size_bytes": data.get("size", 0)
+        }
+    })
+
     ast_nodes = []
+    contains_edges = []
     for root in data.get("ast", []):
-        ast_nodes.extend(collect_all_nodes(root))
-    logger.info(f"Collected {len(ast_nodes)} AST nodes")
-
-    node_map = {}
-    new_nodes, new_links = 0, 0
-    
-    # First pass: Create all CodeEntity nodes including enum members
-    all_nodes_to_process = []
-    for node in ast_nodes:
-        all_nodes_to_process.append(node)
-        # Also add enum members if they exist
-        for child in node.get("members", []):
-            if isinstance(child, dict):
-                # Handle enum members which might not have a type field
-                if "type" not in child and "name" in child and child.get("startLine"):
-                    child["type"] = "EnumMember"
-                    logger.info(f"Fixed enum member node: {child['name']} at line {child.get('startLine')}")
-                all_nodes_to_process.append(child)
-        # Also add body items
-        for child in node.get("body", []):
-            if isinstance(child, dict):
-                all_nodes_to_process.append(child)
-        # Also add statements
-        for child in node.get("statements", []):
-            if isinstance(child, dict):
-                all_nodes_to_process.append(child)
-    
-    # Create CodeEntity nodes for all collected nodes
-    for node in all_nodes_to_process:
-        node_type = node.get("type")
-        node_name = node.get("name")
-        if not node_type or not node_name:
-            continue  # Skip malformed nodes
-
-        uid = f"{node_type}:{node_name}:{node.get('startLine', 0)}"
-        if uid in node_map:
-            continue
-        try:
-            enrichment = node.get("enrichment", {})
-            access_modifier = next((m for m in node.get("modifiers", []) if m in ["public", "private", "protected", "internal"]), "")
-            signature = ""
-            if node["type"] == "Method":
-                return_type = node.get("returnType", "void")
-                params = ", ".join(f"{p.get('type', '')} {p.get('name', '')}" for p in node.get("parameters", []))
-                signature = f"{return_type} {node_name}({params})"
-
-            entity = CodeEntity.nodes.get_or_none(uid=uid)
-            if not entity:
-                entity = CodeEntity(
-                    uid=uid,
-                    name=node_name,
-                    type=node_type,
-                    summary=enrichment.get("summary", ""),
-                    tags=enrichment.get("tags", []),
-                    access_modifier=access_modifier,
-                    signature=signature,
-                    metadata={
-                        "startLine": node.get("startLine"),
-                        "endLine": node.get("endLine"),
-                        "modifiers": node.get("modifiers", []),
-                        "baseTypes": node.get("baseTypes", []),
-                        "method_names": node.get("method_names", [])
-                    }
-                ).save()
-                new_nodes += 1
-            if not file_node.entities.is_connected(entity):
-                file_node.entities.connect(entity, {
-                    "start_line": node.get("startLine", 0),
-                    "end_line": node.get("endLine", 0)
-                })
-                new_links += 1
-
-            node_map[uid] = entity
-      
-        except Exception as e:
-            logger.error(f"Failed to process AST node {node.get('name')}: {e}")
-
-    logger.info(f"Created {new_nodes} new CodeEntity nodes and {new_links} file→entity connections")
+        nodes, edges = collect_all_nodes(root)
+        ast_nodes.extend(nodes)
+        contains_edges.extend(edges)
 
-    # Second Pass: Entity-to-entity CONTAINS relationships
-    contains_count = 0
+    # First pass: CodeEntity rows for every distinct node, enum members included.
+    # collect_all_nodes already visits every child, so each uid is seen once here.
+    entity_rows = rows["entities"]
+    link_rows = rows["links"]
+    node_map = rows["uids"]
+    file_uids = set()
     for node in ast_nodes:
-        if not isinstance(node, dict):
-            continue
-            
-        # Continue with the normal validation
-        if "type" not in node or "name" not in node:
-            continue
-        parent_uid = f"{node['type']}:{node['name']}:{node.get('startLine', 0)}"
-        parent = node_map.get(parent_uid)
-        if not parent:
-            continue
-        for key in ["body", "members", "statements"]:
-            for child in node.get(key, []):
-                if not isinstance(child, dict):
-                    continue
-                # Handle enum members which might not have a type field
-                if "type" not in child and "name" in child and child.get("startLine"):
-                    child["type"] = "EnumMember"
-                if 'type' not in child or 'name' not in child:
-                    continue
-                child_uid = f"{child['type']}:{child['name']}:{child.get('startLine', 0)}"
-                child_entity = node_map.get(child_uid)
-                if child_entity and not parent.contains.is_connected(child_entity):
-                    parent.contains.connect(child_entity,{
-                        "start_line": child.get("startLine"),
-                        "end_line": child.get("endLine")
-                    })
-                    contains_count += 1
-    logger.info(f"Created {contains_count} CONTAINS relationships")
+        uid = node.uid
+        if not uid or uid in file_uids:
+            continue  # Skip malformed and duplicate nodes
+        file_uids.add(uid)
+        link_rows.append({
+            "f": file_uid,
+            "uid": uid,
+            "s": node.start_line or 0,
+            "e": node.end_line or 0
+        })
+        if uid not in node_map:
+            node_map[uid] = node
+            entity_rows.append({"uid": uid, "props": _entity_props(node)})
+
+    # Second Pass: Entity-to-entity CONTAINS relationships, gathered during traversal
+    rows["contains"].extend(
+        {"p": parent_uid, "c": child_uid, "s": start, "e": end}
+        for parent_uid, child_uid, start, end in contains_edges
+    )
 
     # HAS_PARAMETER and RETURNS
-    param_count = 0
-    return_count = 0
+    param_rows = rows["params"]
+    return_rows = rows["returns"]
+    type_nodes = rows["types"]
     for node in ast_nodes:
-        if node.get("type") != "Method":
+        if node.type != "Method":
             continue
-        method_uid = f"Method:{node['name']}:{node.get('startLine', 0)}"
-        method_node = node_map.get(method_uid)
-        if not method_node:
+        method_uid = node.uid
+        if method_uid not in file_uids:
             continue
 
-            # Parameters
-        for p in node.get("parameters", []):
+        # Parameters
+        for p in node.parameters:
             pname = p.get("name")
             ptype = p.get("type")
             if not pname or not ptype:
                 continue
-            param_uid = f"Parameter:{method_uid}:{pname}"
-            param_node = CodeEntity.nodes.get_or_none(uid=param_uid)
-            if not param_node:
-                param_node = CodeEntity(
-                    uid=param_uid,
-                    name=pname,
-                    type="Parameter",
-                    metadata={"dataType": ptype}
-                ).save()
-                node_map[param_uid] = param_node
-            if not method_node.has_parameter.is_connected(param_node):
-                method_node.has_parameter.connect(param_node)
-                param_count += 1
+            param_rows.append({
+                "m": method_uid,
+                "uid": f"Parameter:{method_uid}:{pname}",
+                "name": pname,
+                "metadata": orjson.dumps({"dataType": ptype}).decode()
+            })
 
         # Return type
-        return_type = node.get("returnType", "void")
+        return_type = node.return_type
         return_uid = f"ReturnType:{return_type}"
-        return_node = node_map.get(return_uid) or CodeEntity.nodes.get_or_none(uid=return_uid)
-        if not return_node:
-            return_node = CodeEntity(uid=return_uid, name=return_type, type="ReturnType").save()
-            node_map[return_uid] = return_node
-
-        if not method_node.returns.is_connected(return_node):
-            method_node.returns.connect(return_node)
-            return_count += 1
-
-    logger.info(f"Created {param_count} HAS_PARAMETER and {return_count} RETURNS relationships")
+        if return_uid not in type_nodes:
+            type_nodes[return_uid] = {"uid": return_uid, "name": return_type, "type": "ReturnType"}
+        return_rows.append({"m": method_uid, "uid": return_uid})
 
     # IMPLEMENTS relationships
-    impl_count = 0
+    impl_rows = rows["impls"]
     for node in ast_nodes:
-        if node.get("baseTypes"):
-            from_uid = f"{node['type']}:{node['name']}:{node.get('startLine', 0)}"
-            from_node = node_map.get(from_uid)
-            for base in node["baseTypes"]:
-                to_uid = f"Interface:{base}:0"
-                to_node = node_map.get(to_uid) or CodeEntity.nodes.get_or_none(uid=to_uid)
-                if not to_node:
-                    to_node = CodeEntity(uid=to_uid, name=base, type="Interface").save()
-                    node_map[to_uid] = to_node
-                if not from_node.implements.is_connected(to_node):
-                    from_node.implements.connect(to_node)
-                    impl_count += 1
-        else:
-            continue
-    logger.info(f"Created {impl_count} IMPLEMENTS relationships")
+        if node.base_types and node.uid:
+            from_uid = node.uid
+            for base in node.base_types:
+                interface_uid = f"Interface:{base}:0"
+                if interface_uid not in type_nodes:
+                    type_nodes[interface_uid] = {"uid": interface_uid, "name": base, "type": "Interface"}
+                impl_rows.append({"f": from_uid, "uid": interface_uid})
+
+    return len(ast_nodes)
+
+def _write_rows(rows, run_ts):
+    """
+    Write the Project/Module/File nodes and all batched rows.
+
+    Everything is plain parameterized Cypher; the neomodel classes only
+    declare the schema. Must run inside a transaction; the caller owns
+    commit and rollback.
+
+    Returns:
+        Dict of node and relationship counts for logging.
+    """
+    for batch in _batches(rows["seeds"]):
+        db.cypher_query(MERGE_SEEDS_QUERY, {"rows": batch, "now": run_ts})
+
+    existing_count = _count_existing(rows["uids"])
+    for batch in _batches(rows["entities"]):
+        db.cypher_query(MERGE_ENTITIES_QUERY, {"rows": batch})
+    counts = {
+        "new_nodes": len(rows["uids"]) - existing_count,
+        "new_links": _run_count(MERGE_FILE_ENTITIES_QUERY, rows["links"]),
+        "contains": _run_count(MERGE_CONTAINS_QUERY, rows["contains"]),
+        "params": _run_count(MERGE_PARAMETERS_QUERY, rows["params"])
+    }
+    # Type nodes must exist before the RETURNS/IMPLEMENTS queries match them
+    counts["types"] = _merge_type_nodes(list(rows["types"].values()))
+    counts["returns"] = _run_count(MERGE_RETURNS_QUERY, rows["returns"])
+    counts["impls"] = _run_count(MERGE_IMPLEMENTS_QUERY, rows["impls"])
+    return counts
+
+def _write_with_retry(rows, run_ts, label):
+    """
+    Write rows in a single transaction, retrying transient failures.
+
+    Returns:
+        Dict of counts, or None if the write failed and was rolled back.
+    """
+    for attempt in range(1, INGEST_RETRIES + 1):
+        try:
+            with db.transaction:
+                return _write_rows(rows, run_ts)
+        except (TransientError, ConstraintValidationFailed) as e:
+            # Concurrent files can deadlock or race on shared ReturnType/Interface/Project nodes
+            if attempt == INGEST_RETRIES:
+                logger.error(f"Failed to ingest {label} after {attempt} attempts: {e}")
+                return None
+            logger.warning(f"Retrying ingestion of {label} (attempt {attempt}): {e}")
+            time.sleep(INGEST_RETRY_DELAY * attempt)
+        except Exception as e:
+            logger.error(f"Failed to ingest {label}, transaction rolled back: {e}")
+            return None
+
+def _log_counts(counts):
+    """Log the counts returned by _write_rows."""
+    # MERGE is idempotent, so relationship counts include edges that already existed
+    logger.info(f"Created {counts['new_nodes']} new CodeEntity nodes, merged {counts['new_links']} file→entity connections")
+    logger.info(f"Merged {counts['contains']} CONTAINS relationships")
+    logger.info(f"Merged {counts['params']} HAS_PARAMETER and {counts['returns']} RETURNS relationships")
+    logger.info(f"Merged {counts['impls']} IMPLEMENTS relationships")
+
+def _process_single_file(file_path: Path, run_ts: float = None, data: dict = None) -> bool:
+    """
+    Process a single curated JSON file and create nodes/edges in Neo4j.
+
+    Args:
+        file_path: Curated JSON file to ingest
+        run_ts: Ingestion timestamp (UTC epoch seconds) shared by the whole run
+        data: The file's content if already in memory; read from disk otherwise
+
+    Returns:
+        True if the file was written, False otherwise.
+    """
+    if run_ts is None:
+        run_ts = datetime.now(timezone.utc).timestamp()
+    logger.info(f"Processing curated file: {file_path}")
+    if data is None:
+        curated = _read_curated_file(file_path)
+        if curated is None:
+            return False
+        data, project_name, module_name, file_name = curated
+    else:
+        project_name, module_name, file_name = _curated_names(file_path)
+
+    rows = _thread_row_buffers()
+    node_count = _build_file_rows(file_path, data, project_name, module_name, rows)
+    logger.info(f"Collected {node_count} AST nodes")
+
+    # All writes for this file share one transaction; the JSON read and row
+    # building above stay outside it so the transaction is only held while writing.
+    counts = _write_with_retry(rows, run_ts, file_path)
+    if counts is None:
+        return False
+    _log_counts(counts)
 
     logger.info(f"✅ Completed ingestion: {file_name}")
+    return True
+
+def ingest_enriched_data(data: dict, file_path) -> bool:
+    """
+    Ingest an enriched document that is already in memory.
+
+    Skips re-reading the curated JSON the enrich step just wrote; the graph
+    is the same as ingesting `file_path` itself.
+
+    Args:
+        data: Enriched document, as returned by enrich_ast
+        file_path: Curated file the document was saved to (names the project,
+            module and file nodes)
+
+    Returns:
+        True if the document was written, False otherwise.
+    """
+    try:
+        install_schema()
+    except Exception as e:
+        logger.warning(f"Could not install Neo4j constraints, MERGE will be slower: {e}")
+    return _process_single_file(Path(file_path), data=data)
+
+def ingest_enriched_batch(file_paths, max_rows: int = None, documents: dict = None,
+                          run_ts: float = None) -> list:
+    """
+    Ingest several curated JSON files with as few transactions as possible.
+
+    Rows from consecutive files are accumulated and written together once
+    they reach `max_rows` (INGEST_TX_ROWS by default), so many small files
+    share one transaction and one round-trip per query instead of one per
+    file. If a combined write fails, its files are retried one by one.
+
+    Args:
+        file_paths: Curated JSON files to ingest
+        max_rows: Row count at which the accumulated files are written
+        documents: Already-loaded content keyed by file path; these files are
+            not read from disk
+        run_ts: Timestamp stamped on the written nodes (defaults to now)
+
+    Returns:
+        List of the file paths that were ingested.
+    """
+    max_rows = max_rows or INGEST_TX_ROWS
+    documents = {Path(path): data for path, data in (documents or {}).items()}
+    run_ts = run_ts or datetime.now(timezone.utc).timestamp()
+    try:
+        install_schema()
+    except Exception as e:
+        logger.warning(f"Could not install Neo4j constraints, MERGE will be slower: {e}")
+
+    loaded = []
+    pending = []
+    rows = _new_row_buffers()
+
+    def flush():
+        nonlocal rows
+        if not pending:
+            return
+        counts = _write_with_retry(rows, run_ts, f"batch of {len(pending)} files")
+        if counts is not None:
+            _log_counts(counts)
+            loaded.extend(pending)
+        else:
+            # Isolate the failing file(s) instead of dropping the whole batch
+            loaded.extend(path for path in pending if _process_single_file(path, run_ts, documents.get(path)))
+        pending.clear()
+        rows = _new_row_buffers()
+
+    paths = (Path(path) for path in file_paths)
+    # Readahead only pays off when the files are read from disk
+    for file_path in (paths if documents else _readahead(paths)):
+        data = documents.get(file_path)
+        if data is None:
+            curated = _read_curated_file(file_path)
+            if curated is None:
+                continue
+            data, project_name, module_name, _ = curated
+        else:
+            project_name, module_name, _ = _curated_names(file_path)
+        _build_file_rows(file_path, data, project_name, module_name, rows)
+        pending.append(file_path)
+        if _row_count(rows) >= max_rows:
+            flush()
+    flush()
 
-        
+    logger.info(f"Ingested {len(loaded)} curated files in batches of up to {max_rows} rows")
+    return loaded
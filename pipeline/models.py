@@ -1,17 +1,24 @@
 """Data models for the pipeline."""
 
 import os
+import atexit
 from dotenv import load_dotenv
 from neomodel import (StructuredNode, StructuredRel, StringProperty, JSONProperty, IntegerProperty, UniqueIdProperty, RelationshipTo, RelationshipFrom,
-    DateTimeProperty, BooleanProperty, ArrayProperty, config)
+    DateTimeProperty, BooleanProperty, ArrayProperty, config, db, install_labels)
 
 load_dotenv()
 uri = os.getenv("NEO4J_BOLT_URL")
 user = os.getenv("NEO4J_USERNAME")
 pwd = os.getenv("NEO4J_PASSWORD")
-print(f"BOLT_URL = {uri}")
 config.DATABASE_URL = f"bolt://{user}:{pwd}@{uri.split('://')[1]}"
 
+# Driver pool settings. neomodel keeps one driver per thread, so this bounds
+# each ingestion worker's pool rather than the process total.
+config.MAX_CONNECTION_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "32"))
+config.CONNECTION_ACQUISITION_TIMEOUT = 60.0
+config.MAX_CONNECTION_LIFETIME = 3600
+config.KEEP_ALIVE = True
+
 
 
 # Relationship properties
@@ -92,4 +99,39 @@ class CodeEntity(StructuredNode):
 
     
     # Belongs to file
-    file = RelationshipFrom(File, "HAS_ENTITY", model=ContainsRel)
\ No newline at end of file
+    file = RelationshipFrom(File, "HAS_ENTITY", model=ContainsRel)
+
+
+_schema_installed = False
+
+def install_schema():
+    """
+    Create the unique constraints and indexes declared on the models.
+
+    The batched ingestion MERGEs on CodeEntity.uid, File.uid, Module.uid and
+    Project.uid; without their unique constraints every MERGE falls back to a
+    label scan. Runs once per process.
+    """
+    global _schema_installed
+    if _schema_installed:
+        return
+    for model in (Project, File, CodeEntity):
+        install_labels(model)
+    # Module.path is declared unique, but curated files from one directory
+    # share it across modules, so only the uid constraint is enforced.
+    db.cypher_query(
+        "CREATE CONSTRAINT constraint_unique_Module_uid IF NOT EXISTS "
+        "FOR (n:Module) REQUIRE n.uid IS UNIQUE"
+    )
+    _schema_installed = True
+
+
+def close_connection():
+    """Close the current thread's Neo4j driver, if one was opened."""
+    driver = db.driver
+    if driver is not None:
+        driver.close()
+        db.driver = None
+        db.url = None
+
+atexit.register(close_connection)
@@ -4,7 +4,7 @@ ETL Pipeline Orchestrator
 This module orchestrates the complete ETL (Extract, Transform, Load) pipeline
 for C# code analysis. It coordinates:
 1. Extract: Unzip/copy source files to raw/
-2. Parse: Convert C# files to AST JSON in staging/ast/
+2. Parse: Convert C# files to AST JSON, packed into JSONL shards in staging/ast/
 3. Enrich: Add LLM metadata to AST and save to curated/
 4. Load: Insert enriched data into Neo4j graph database
 5. Archive: Move processed files from raw/ to archive/
@@ -13,20 +13,24 @@ This module implements task D2 from the batch ETL requirements.
 """
 
 import os
-import json
 import logging
 import sys
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import argparse
+import hashlib
+import queue
+import shutil
+import time
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from itertools import repeat
 
-# Import pipeline components
-from .extract import extract_source, validate_raw
-from .cs_parser import parse_cs_file, serialize_to_json
-from .enrich import enrich_ast
-from .insert_graph import ingest_enriched_json
-from .archive import archive_processed_files
+import orjson
+
+# Pipeline components (parser, LLM client, Neo4j driver) are imported in the
+# phases that use them, so --help and runs that skip phases start quickly
 
 # Import centralized logging module
 from logs.logger import get_logger, log_etl_summary
@@ -35,7 +39,7 @@ from logs.logger import get_logger, log_etl_summary
 logger = get_logger(__name__)
 
 # Default directories relative to project root
-PROJECT_ROOT = Path(__file__).parent.parent.absolute()
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
 DEFAULT_DIRS = {
     'input': PROJECT_ROOT / 'input_code',
     'raw': PROJECT_ROOT / 'raw', 
@@ -46,6 +50,322 @@ DEFAULT_DIRS = {
 }
 
 
+# Parse worker processes (defaults to one per CPU) and files handed to each per batch
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "0")) or os.cpu_count() or 1
+PARSE_CHUNKSIZE = 8
+
+# Files enriched concurrently, and the bound on enriched files waiting for
+# the Neo4j loader when stages are pipelined
+ENRICH_FILE_WORKERS = int(os.getenv("ENRICH_FILE_WORKERS", "2"))
+STAGE_QUEUE_SIZE = 32
+
+# Size cap of the parse cache; least recently used ASTs are evicted above it
+PARSE_CACHE_MAX_BYTES = int(os.getenv("PARSE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# RAM-backed filesystem used for staging ASTs with --staging-tmpfs
+TMPFS_ROOT = Path('/dev/shm')
+
+# Staged ASTs are packed into JSONL shards, one source file per line; a new
+# shard is started after this many files or bytes
+STAGING_SHARD_FILES = 1000
+STAGING_SHARD_BYTES = 100 * 1024 * 1024
+
+# Write buffer of the shard being written, so records reach the file in a
+# few large writes
+STAGING_WRITE_BUFFER = 8 * 1024 * 1024
+
+
+def _advise_dontneed(fd: int) -> None:
+    """Drop a consumed intermediate file's pages from the page cache"""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+
+
+def _scan_cs(path: str):
+    """
+    Yield the paths of all .cs files under a directory.
+    
+    os.scandir reports entry types from the directory listing itself, so
+    no per-entry stat is needed to tell files from directories.
+    """
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _scan_cs(entry.path)
+            elif entry.name.endswith('.cs'):
+                yield Path(entry.path)
+
+
+def _ast_output_name(cs_file: Path, raw_dir: str) -> Tuple[str, str]:
+    """Return the source path relative to raw_dir and its AST JSON file name"""
+    rel_path = cs_file.relative_to(raw_dir).as_posix()
+    return rel_path, rel_path.replace('/', '_')[:-3] + '_ast.json'
+
+
+def _init_parse_worker() -> None:
+    """
+    Prepare a parse worker process before it receives any files.
+    
+    Importing the generated ANTLR lexer and parser and priming their
+    prediction caches happens once per process instead of on the first
+    file each worker is handed.
+    """
+    from .cs_parser import warm_up_parser
+    warm_up_parser()
+
+
+def _parse_one(cs_file: Path, raw_dir: str) -> Tuple[Optional[Dict], int, Optional[str], Optional[bytes]]:
+    """
+    Parse a single C# file into a staging record.
+    
+    Runs in a worker process, so it only takes and returns picklable values.
+    The record is serialized here, so only bytes cross back to the parent.
+    
+    Args:
+        cs_file: Path to the C# source file
+        raw_dir: Raw directory the source path is made relative to
+        
+    Returns:
+        Tuple of (parsed file entry, node count, error message or None,
+        JSONL staging record or None)
+    """
+    try:
+        # Parse the C# file
+        from .cs_parser import parse_cs_file
+        ast_nodes = parse_cs_file(str(cs_file))
+        
+        # Generate output filename
+        rel_path, output_name = _ast_output_name(cs_file, raw_dir)
+        
+        # Add file metadata to each node
+        source_file = cs_file.name
+        for node in ast_nodes:
+            node['filePath'] = rel_path
+            node['sourceFile'] = source_file
+            
+        # One JSONL line per source file
+        record = orjson.dumps({'ast_file': output_name, 'nodes': ast_nodes}) + b'\n'
+        
+        return {
+            'source_file': rel_path,
+            'ast_file': output_name,
+            'nodes_count': len(ast_nodes)
+        }, len(ast_nodes), None, record
+        
+    except Exception as e:
+        return None, 0, str(e), None
+
+
+class StagingShards:
+    """
+    JSONL shards holding the staged ASTs of many source files
+    
+    Each line is one source file's record ({"ast_file", "nodes"}), so a run
+    writes a handful of large files instead of one small file per source.
+    Records are appended from a single thread through a large write buffer,
+    and each shard is preallocated to its size cap so it is laid out in as
+    few extents as possible; unused space is released when it is closed.
+    """
+    
+    PATTERN = 'shard_*.jsonl'
+    
+    def __init__(self, staging_dir: Path,
+                 max_files: int = STAGING_SHARD_FILES,
+                 max_bytes: int = STAGING_SHARD_BYTES):
+        self.staging_dir = staging_dir
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.shard_index = 0
+        self.file = None
+        self.files = 0
+        self.size = 0
+        # Shards from an earlier run would otherwise be enriched again
+        for shard in staging_dir.glob(self.PATTERN):
+            shard.unlink()
+            
+    def append(self, record: bytes) -> None:
+        """Append one record, starting a new shard when the current one is full"""
+        if self.file is not None and (self.files >= self.max_files or self.size >= self.max_bytes):
+            self.close()
+        if self.file is None:
+            self.file = open(self.staging_dir / f"shard_{self.shard_index:04d}.jsonl", 'wb',
+                             buffering=STAGING_WRITE_BUFFER)
+            self._preallocate()
+            self.shard_index += 1
+            self.files = 0
+            self.size = 0
+        self.file.write(record)
+        self.files += 1
+        self.size += len(record)
+        
+    def _preallocate(self) -> None:
+        """Reserve the size cap of the shard just opened, where supported"""
+        if not hasattr(os, 'posix_fallocate'):
+            return
+        try:
+            os.posix_fallocate(self.file.fileno(), 0, self.max_bytes)
+        except OSError:
+            # Not supported by the filesystem, or not enough free space to
+            # reserve up front; the shard then simply grows as it is written
+            pass
+            
+    def close(self) -> None:
+        """Close the shard being written, trimming any unused preallocation"""
+        if self.file is not None:
+            self.file.flush()
+            os.ftruncate(self.file.fileno(), self.size)
+            self.file.close()
+            self.file = None
+            
+    @classmethod
+    def records(cls, staging_dir: Path):
+        """Yield the staged records of every shard, in shard order"""
+        for shard in sorted(staging_dir.glob(cls.PATTERN)):
+            with open(shard, 'rb') as f:
+                for line in f:
+                    # A shard left behind by an interrupted run still has
+                    # its zero-filled preallocation after the last record
+                    if line.startswith(b'\0'):
+                        break
+                    if line.strip():
+                        yield orjson.loads(line)
+                # The shard is not read again, so release its pages
+                _advise_dontneed(f.fileno())
+
+
+# Sources that determine the AST produced for a C# file: the visitor, the
+# ANTLR-generated parser it drives, and the grammar that parser came from
+PARSER_SOURCES = (
+    PROJECT_ROOT / 'pipeline' / 'cs_parser.py',
+    PROJECT_ROOT / 'generated' / 'csharp',
+    PROJECT_ROOT / 'grammar',
+)
+
+
+def _parser_fingerprint() -> bytes:
+    """
+    Hash the parser sources, so cached ASTs are dropped when the parser changes
+    
+    Returns:
+        bytes: BLAKE2b digest of every file in PARSER_SOURCES, in path order
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for source in PARSER_SOURCES:
+        files = sorted(source.glob('*.py')) + sorted(source.glob('*.g4')) if source.is_dir() else [source]
+        for path in files:
+            try:
+                content = path.read_bytes()
+            except OSError:
+                continue
+            digest.update(path.name.encode('utf-8'))
+            digest.update(content)
+    return digest.digest()
+
+
+class ParseCache:
+    """
+    On-disk cache of staging records from previous runs
+    
+    Entries are keyed on a BLAKE2b hash of the C# source, its path relative
+    to raw/ (the path is stored in every node) and the parser's own sources,
+    so unchanged files are staged from the cache instead of being parsed
+    again, and a parser or grammar change invalidates every entry. The index keeps
+    each entry's node count, size and last use for LRU eviction. New entries
+    are written by a background thread, so staging parse results never
+    waits on the cache directory.
+    """
+    
+    def __init__(self, cache_dir: Path, max_bytes: int = PARSE_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = cache_dir / 'index.json'
+        self.lock = threading.Lock()
+        self.writes = None
+        self.writer = None
+        self.parser_fingerprint = _parser_fingerprint()
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            self.index = orjson.loads(self.index_path.read_bytes())
+        except (OSError, ValueError):
+            self.index = {}
+            
+    def key(self, cs_file: Path, rel_path: str) -> str:
+        """Cache key for a C# file at a given path relative to raw/"""
+        digest = hashlib.blake2b(self.parser_fingerprint, digest_size=8)
+        digest.update(rel_path.encode('utf-8'))
+        digest.update(cs_file.read_bytes())
+        return digest.hexdigest()
+        
+    def fetch(self, key: str) -> Optional[Tuple[bytes, int]]:
+        """
+        Read a cached staging record
+        
+        Returns:
+            Optional[Tuple[bytes, int]]: The record and its node count, or None on a miss
+        """
+        with self.lock:
+            meta = self.index.get(key)
+        if meta is None:
+            return None
+        try:
+            record = (self.cache_dir / f"{key}.json").read_bytes()
+        except OSError:
+            with self.lock:
+                self.index.pop(key, None)
+            return None
+        meta['used'] = time.time()
+        return record, meta['nodes']
+        
+    def store(self, key: str, record: bytes, nodes_count: int) -> None:
+        """Queue a freshly parsed staging record to be added to the cache"""
+        if self.writer is None:
+            # Bounded, so a slow disk holds back staging instead of piling up records
+            self.writes = queue.Queue(maxsize=STAGE_QUEUE_SIZE)
+            self.writer = threading.Thread(target=self._write_loop, name="etl-cache-writer", daemon=True)
+            self.writer.start()
+        self.writes.put((key, record, nodes_count))
+        
+    def _write_loop(self) -> None:
+        """Write queued records to the cache until the end-of-run marker"""
+        while True:
+            item = self.writes.get()
+            if item is None:
+                return
+            key, record, nodes_count = item
+            try:
+                (self.cache_dir / f"{key}.json").write_bytes(record)
+            except OSError as e:
+                logger.warning(f"Could not cache AST record {key}: {e}")
+                continue
+            with self.lock:
+                self.index[key] = {'nodes': nodes_count, 'size': len(record), 'used': time.time()}
+                
+    def save(self) -> None:
+        """Evict least recently used entries above the size cap and write the index"""
+        if self.writer is not None:
+            # Let queued records reach the index first
+            self.writes.put(None)
+            self.writer.join()
+            self.writer = None
+            self.writes = None
+        with self.lock:
+            total = sum(meta['size'] for meta in self.index.values())
+            for key, meta in sorted(self.index.items(), key=lambda item: item[1]['used']):
+                if total <= self.max_bytes:
+                    break
+                (self.cache_dir / f"{key}.json").unlink(missing_ok=True)
+                total -= meta['size']
+                del self.index[key]
+            try:
+                self.index_path.write_bytes(orjson.dumps(self.index))
+            except OSError as e:
+                logger.warning(f"Could not save parse cache index: {e}")
+
+
 class ETLPipelineError(Exception):
     """Custom exception for ETL pipeline errors"""
     pass
@@ -62,7 +382,10 @@ class ETLRunner:
     def __init__(self, 
                  input_path: Optional[str] = None,
                  output_base: Optional[str] = None,
-                 skip_phases: Optional[List[str]] = None):
+                 skip_phases: Optional[List[str]] = None,
+                 use_cache: bool = True,
+                 staging_tmpfs: bool = False,
+                 log_dir: Optional[str] = None):
         """
         Initialize ETL Runner
         
@@ -70,8 +393,12 @@ class ETLRunner:
             input_path: Path to input zip/folder (defaults to input_code/)
             output_base: Base directory for outputs (defaults to project root)
             skip_phases: List of phases to skip ['extract', 'parse', 'enrich', 'load']
+            use_cache: Reuse ASTs of unchanged C# files from previous runs
+            staging_tmpfs: Stage AST JSON in /dev/shm for this run only
+            log_dir: Directory for the run summary (defaults to the shared logs/etl/)
         """
         self.input_path = input_path
+        self.log_dir = Path(log_dir) if log_dir else None
         self.skip_phases = skip_phases or []
         
         # Set up directories
@@ -91,11 +418,14 @@ class ETLRunner:
         for dir_path in self.dirs.values():
             dir_path.mkdir(parents=True, exist_ok=True)
             
+        self.parse_cache = ParseCache(self.dirs['staging_ast'].parent / '.cache') if use_cache else None
+            
         # ETL run metadata
-        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        started = datetime.now()
+        self.run_id = started.strftime("%Y%m%d_%H%M%S")
         self.stats = {
             'run_id': self.run_id,
-            'start_time': datetime.now().isoformat(),
+            'start_time': started.isoformat(),
             'phases_completed': [],
             'phases_skipped': self.skip_phases,
             'files_processed': 0,
@@ -103,6 +433,13 @@ class ETLRunner:
             'errors': []
         }
         
+        # ASTs are reproducible intermediates, so they can live in RAM for the
+        # run; the parse cache above stays on disk
+        self.staging_tmpfs = staging_tmpfs
+        if staging_tmpfs:
+            self.dirs['staging_ast'] = TMPFS_ROOT / f"etl_{self.run_id}"
+            self.dirs['staging_ast'].mkdir(parents=True, exist_ok=True)
+            
         logger.info(f"ETL Runner initialized - Run ID: {self.run_id}")
         logger.info(f"Skip phases: {self.skip_phases}")
         
@@ -125,26 +462,31 @@ class ETLRunner:
                 logger.info("Skipping extract phase")
                 self.stats['phases_skipped'].append('extract')
                 
-            # Phase 2: Parse  
-            if 'parse' not in self.skip_phases:
-                self._parse_phase()
-            else:
-                logger.info("Skipping parse phase")
-                self.stats['phases_skipped'].append('parse')
-                
-            # Phase 3: Enrich
-            if 'enrich' not in self.skip_phases:
-                self._enrich_phase()
+            # Phases 2-4: Parse, Enrich, Load. When all three run they are
+            # overlapped file by file instead of waiting on each other.
+            if not {'parse', 'enrich', 'load'} & set(self.skip_phases):
+                self._streaming_phases()
             else:
-                logger.info("Skipping enrich phase")
-                self.stats['phases_skipped'].append('enrich')
-                
-            # Phase 4: Load
-            if 'load' not in self.skip_phases:
-                self._load_phase()
-            else:
-                logger.info("Skipping load phase")
-                self.stats['phases_skipped'].append('load')
+                # Phase 2: Parse  
+                if 'parse' not in self.skip_phases:
+                    self._parse_phase()
+                else:
+                    logger.info("Skipping parse phase")
+                    self.stats['phases_skipped'].append('parse')
+                    
+                # Phase 3: Enrich
+                if 'enrich' not in self.skip_phases:
+                    self._enrich_phase()
+                else:
+                    logger.info("Skipping enrich phase")
+                    self.stats['phases_skipped'].append('enrich')
+                    
+                # Phase 4: Load
+                if 'load' not in self.skip_phases:
+                    self._load_phase()
+                else:
+                    logger.info("Skipping load phase")
+                    self.stats['phases_skipped'].append('load')
                 
             # Phase 5: Archive
             if 'archive' not in self.skip_phases:
@@ -174,22 +516,26 @@ class ETLRunner:
         finally:
             # Always save run statistics
             self._save_run_stats()
+            if self.staging_tmpfs:
+                shutil.rmtree(self.dirs['staging_ast'], ignore_errors=True)
             
         return self.stats
         
     def _extract_phase(self) -> None:
         """Phase 1: Extract source files from zip/folder to raw/"""
         logger.info("Phase 1: Extract - Starting")
+        from .extract import extract_source, validate_raw
         
         try:
             # Extract files using the extract module
-            extracted_files = extract_source(
+            extracted_files, found = extract_source(
                 input_path=self.input_path,
-                raw_dir=str(self.dirs['raw'])
+                raw_dir=str(self.dirs['raw']),
+                allowed_exts=('.cs',)
             )
             
             # Validate extraction results
-            validate_raw(str(self.dirs['raw']), allowed_exts=('.cs',))
+            validate_raw(str(self.dirs['raw']), allowed_exts=('.cs',), found=found)
             
             self.stats['files_extracted'] = len(extracted_files)
             self.stats['phases_completed'].append('extract')
@@ -203,58 +549,62 @@ class ETLRunner:
             raise ETLPipelineError(error_msg) from e
             
     def _parse_phase(self) -> None:
-        """Phase 2: Parse C# files to AST JSON"""
+        """Phase 2: Parse C# files to AST JSON shards"""
         logger.info("Phase 2: Parse - Starting")
         
         try:
-            # Find all .cs files in raw directory
-            cs_files = []
-            for root, _, files in os.walk(self.dirs['raw']):
-                for file in files:
-                    if file.endswith('.cs'):
-                        cs_files.append(os.path.join(root, file))
-                        
-            if not cs_files:
-                raise ETLPipelineError("No .cs files found in raw directory")
-                
-            logger.info(f"Found {len(cs_files)} C# files to parse")
+            cs_files = self._find_cs_files()
             
-            # Parse each file and save AST JSON
+            # Parse files in parallel; parsing is CPU-bound, so use processes
             total_nodes = 0
             parsed_files = []
+            raw_dir = str(self.dirs['raw'])
+            shards = StagingShards(self.dirs['staging_ast'])
             
-            for cs_file in cs_files:
-                try:
-                    # Parse the C# file
-                    ast_nodes = parse_cs_file(cs_file)
-                    
-                    # Generate output filename
-                    rel_path = os.path.relpath(cs_file, self.dirs['raw'])
-                    output_name = rel_path.replace('/', '_').replace('\\', '_').replace('.cs', '_ast.json')
-                    output_path = self.dirs['staging_ast'] / output_name
-                    
-                    # Add file metadata to each node
-                    for node in ast_nodes:
-                        node['filePath'] = rel_path
-                        node['sourceFile'] = os.path.basename(cs_file)
-                        
-                    # Save AST JSON
-                    serialize_to_json(ast_nodes, str(output_path))
-                    
-                    total_nodes += len(ast_nodes)
-                    parsed_files.append({
-                        'source_file': rel_path,
-                        'ast_file': output_name,
-                        'nodes_count': len(ast_nodes)
-                    })
-                    
-                    logger.info(f"Parsed {cs_file} -> {len(ast_nodes)} nodes")
-                    
-                except Exception as e:
-                    error_msg = f"Failed to parse {cs_file}: {e}"
+            def stage(cs_file, result, cache_key=None):
+                nonlocal total_nodes
+                entry, nodes_count, error, record = result
+                if error:
+                    error_msg = f"Failed to parse {cs_file}: {error}"
                     self.stats['errors'].append(error_msg)
                     logger.warning(error_msg)
-                    continue
+                    return
+                shards.append(record)
+                total_nodes += nodes_count
+                parsed_files.append(entry)
+                if cache_key is not None:
+                    self.parse_cache.store(cache_key, record, nodes_count)
+                logger.info(f"Parsed {cs_file} -> {nodes_count} nodes")
+                
+            try:
+                # Files unchanged since a previous run are staged from the cache
+                to_parse = []
+                for cs_file in cs_files:
+                    key, cached = self._fetch_cached_ast(cs_file, raw_dir)
+                    if cached is not None:
+                        stage(cs_file, cached)
+                    else:
+                        to_parse.append((cs_file, key))
+                workers = min(PARSE_WORKERS, len(to_parse))
+                
+                # Records are staged as results arrive, in source order
+                if workers > 1:
+                    with ProcessPoolExecutor(max_workers=workers, initializer=_init_parse_worker) as executor:
+                        results = executor.map(
+                            _parse_one, [cs_file for cs_file, _ in to_parse], repeat(raw_dir),
+                            chunksize=PARSE_CHUNKSIZE
+                        )
+                        for (cs_file, key), result in zip(to_parse, results):
+                            stage(cs_file, result, key)
+                else:
+                    for cs_file, key in to_parse:
+                        stage(cs_file, _parse_one(cs_file, raw_dir), key)
+            finally:
+                shards.close()
+                
+            if self.parse_cache:
+                self.parse_cache.save()
+                logger.info(f"Reused {len(cs_files) - len(to_parse)} cached ASTs")
                     
             self.stats['files_processed'] = len(parsed_files)
             self.stats['total_nodes_parsed'] = total_nodes
@@ -274,50 +624,47 @@ class ETLRunner:
         logger.info("Phase 3: Enrich - Starting")
         
         try:
-            # Find all AST JSON files in staging
-            ast_files = list(self.dirs['staging_ast'].glob('*_ast.json'))
-            
-            if not ast_files:
-                raise ETLPipelineError("No AST JSON files found in staging directory")
-                
-            logger.info(f"Found {len(ast_files)} AST files to enrich")
-            
             enriched_files = []
             total_enriched_nodes = 0
+            staged = 0
             
-            for ast_file in ast_files:
+            def enrich_record(record):
                 try:
-                    # Load AST data
-                    with open(ast_file, 'r', encoding='utf-8') as f:
-                        ast_nodes = json.load(f)
-                        
-                    if not ast_nodes:
-                        logger.warning(f"Empty AST file: {ast_file}")
-                        continue
-                        
-                    # Generate enriched output filename
-                    enriched_name = ast_file.name.replace('_ast.json', '_enriched.json')
-                    enriched_path = self.dirs['curated'] / enriched_name
-                    
-                    # Enrich the AST with LLM metadata
-                    enrichment_result = enrich_ast(ast_nodes, str(enriched_path))
-                    
-                    enriched_files.append({
-                        'ast_file': ast_file.name,
-                        'enriched_file': enriched_name,
-                        'nodes_enriched': len(ast_nodes),
-                        'enrichment_result': enrichment_result
-                    })
-                    
-                    total_enriched_nodes += len(ast_nodes)
+                    return record['ast_file'], self._enrich_one(record), None
+                except Exception as e:
+                    return record.get('ast_file'), None, e
                     
-                    logger.info(f"Enriched {ast_file.name} -> {enriched_name}")
+            def collect(futures):
+                nonlocal total_enriched_nodes
+                for future in futures:
+                    ast_file, entry, error = future.result()
+                    if error is not None:
+                        error_msg = f"Failed to enrich {ast_file}: {error}"
+                        self.stats['errors'].append(error_msg)
+                        logger.warning(error_msg)
+                        continue
+                    if entry is None:
+                        continue
+                    enriched_files.append(entry)
+                    total_enriched_nodes += entry['nodes_enriched']
                     
-                except Exception as e:
-                    error_msg = f"Failed to enrich {ast_file}: {e}"
-                    self.stats['errors'].append(error_msg)
-                    logger.warning(error_msg)
-                    continue
+            # Enrichment waits on LLM responses, so several files are enriched
+            # at once; a failing file does not stop the others. Records are read
+            # from the shards only slightly ahead of the workers.
+            with ThreadPoolExecutor(max_workers=ENRICH_FILE_WORKERS, thread_name_prefix="etl-enrich") as executor:
+                pending = set()
+                for record in StagingShards.records(self.dirs['staging_ast']):
+                    if len(pending) >= ENRICH_FILE_WORKERS * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(done)
+                    pending.add(executor.submit(enrich_record, record))
+                    staged += 1
+                collect(wait(pending).done)
+                
+            if not staged:
+                raise ETLPipelineError("No staged ASTs found in staging directory")
+                
+            logger.info(f"Enriched ASTs of {staged} staged files")
                     
             self.stats['files_enriched'] = len(enriched_files)
             self.stats['total_nodes_enriched'] = total_enriched_nodes  
@@ -332,35 +679,267 @@ class ETLRunner:
             logger.error(error_msg)
             raise ETLPipelineError(error_msg) from e
             
+    def _fetch_cached_ast(self, cs_file: Path, raw_dir: str) -> Tuple[Optional[str], Optional[Tuple]]:
+        """
+        Look up a C# file in the parse cache
+        
+        Returns:
+            Tuple of (cache key or None, _parse_one-style result on a hit or None)
+        """
+        if self.parse_cache is None:
+            return None, None
+        try:
+            rel_path, output_name = _ast_output_name(cs_file, raw_dir)
+            key = self.parse_cache.key(cs_file, rel_path)
+        except OSError:
+            return None, None
+        cached = self.parse_cache.fetch(key)
+        if cached is None:
+            return key, None
+        record, nodes_count = cached
+        entry = {'source_file': rel_path, 'ast_file': output_name, 'nodes_count': nodes_count}
+        return key, (entry, nodes_count, None, record)
+        
+    def _find_cs_files(self) -> List[Path]:
+        """Find all .cs files in the raw directory, failing if there are none"""
+        cs_files = list(_scan_cs(str(self.dirs['raw'])))
+        
+        if not cs_files:
+            raise ETLPipelineError("No .cs files found in raw directory")
+            
+        logger.info(f"Found {len(cs_files)} C# files to parse")
+        return cs_files
+        
+    def _enrich_one(self, record: Dict) -> Optional[Dict]:
+        """
+        Enrich a single staged AST into the curated directory
+        
+        Args:
+            record: Staging record with the AST file name and its nodes
+            
+        Returns:
+            Optional[Dict]: Enriched file entry, or None if the AST was empty
+        """
+        ast_file = record['ast_file']
+        ast_nodes = record['nodes']
+            
+        if not ast_nodes:
+            logger.warning(f"Empty AST: {ast_file}")
+            return None
+            
+        # Generate enriched output filename
+        enriched_name = ast_file.replace('_ast.json', '_enriched.json')
+        enriched_path = self.dirs['curated'] / enriched_name
+        
+        # Enrich the AST with LLM metadata
+        from .enrich import enrich_ast
+        enrichment_result = enrich_ast(ast_nodes, str(enriched_path))
+        
+        logger.info(f"Enriched {ast_file} -> {enriched_name}")
+        return {
+            'ast_file': ast_file,
+            'enriched_file': enriched_name,
+            'nodes_enriched': len(ast_nodes),
+            'enrichment_result': enrichment_result
+        }
+        
+    def _streaming_phases(self) -> None:
+        """
+        Phases 2-4 as a pipeline: Parse -> Enrich -> Load, file by file
+        
+        Parsing is CPU-bound, enrichment waits on the LLM and loading on
+        Neo4j, so each file moves to the next stage as soon as it is ready:
+        parse runs in a process pool, enrichment in a thread pool, and a
+        single loader thread drains a bounded queue of enriched files.
+        """
+        logger.info("Phases 2-4: Parse/Enrich/Load - Starting (pipelined)")
+        from .insert_graph import ingest_enriched_data, ingest_session
+        
+        try:
+            cs_files = self._find_cs_files()
+        except Exception as e:
+            error_msg = f"Parse phase failed: {e}"
+            self.stats['errors'].append(error_msg)
+            logger.error(error_msg)
+            raise ETLPipelineError(error_msg) from e
+            
+        raw_dir = str(self.dirs['raw'])
+        curated_dir = self.dirs['curated']
+        load_queue = queue.Queue(maxsize=STAGE_QUEUE_SIZE)
+        # Each stage keeps its own results; they are merged into self.stats
+        # once every stage has finished, so workers never share a lock
+        parsed_files, parse_errors, enrich_futures = [], [], []
+        loaded_files, load_errors = [], []
+        total_parsed = 0
+        load_queue_drained = False
+        load_failures = []
+        
+        def enrich_stage(ast_file, record):
+            try:
+                # Staged records are kept as bytes until a worker picks them up
+                entry = self._enrich_one(orjson.loads(record))
+            except Exception as e:
+                error_msg = f"Failed to enrich {ast_file}: {e}"
+                logger.warning(error_msg)
+                return None, error_msg
+            if entry is None:
+                return None, None
+            # Blocks when the loader falls behind, bounding documents in flight
+            load_queue.put((curated_dir / entry['enriched_file'], entry['enrichment_result']))
+            return entry, None
+            
+        def record_load_error(error_msg):
+            load_errors.append(error_msg)
+            logger.warning(error_msg)
+            
+        def load_stage():
+            # Runs until the end-of-run marker even if the Neo4j session
+            # fails, so enrichment workers never block on a dead loader
+            try:
+                # One connection for everything this thread loads
+                with ingest_session():
+                    load_items()
+            except Exception as e:
+                # Raised as the load phase's failure once every stage has stopped
+                load_failures.append(e)
+                logger.error(f"Load stage failed: {e}")
+            while not load_queue_drained:
+                item = load_queue.get()
+                if item is None:
+                    return
+                record_load_error(f"Skipped loading {item[0]} after the load stage failed")
+                
+        def load_items():
+            nonlocal load_queue_drained
+            while True:
+                item = load_queue.get()
+                if item is None:
+                    load_queue_drained = True
+                    return
+                enriched_file, document = item
+                try:
+                    # The enriched document is passed on in memory rather than re-read
+                    if not ingest_enriched_data(document, enriched_file):
+                        record_load_error(f"Failed to load {enriched_file}")
+                        continue
+                    loaded_files.append(enriched_file.name)
+                    logger.info(f"Loaded {enriched_file.name} into Neo4j")
+                except Exception as e:
+                    record_load_error(f"Failed to load {enriched_file}: {e}")
+                    
+        loader = threading.Thread(target=load_stage, name="etl-load", daemon=True)
+        loader.start()
+        shards = StagingShards(self.dirs['staging_ast'])
+        try:
+            parse_workers = max(1, min(PARSE_WORKERS, len(cs_files)))
+            with ProcessPoolExecutor(max_workers=parse_workers, initializer=_init_parse_worker) as parse_pool, \
+                    ThreadPoolExecutor(max_workers=ENRICH_FILE_WORKERS, thread_name_prefix="etl-enrich") as enrich_pool:
+                def parsed(cs_file, entry, nodes_count, record):
+                    nonlocal total_parsed
+                    # Staged for re-runs; enrichment takes the record straight from memory
+                    shards.append(record)
+                    parsed_files.append(entry)
+                    total_parsed += nodes_count
+                    logger.info(f"Parsed {cs_file} -> {nodes_count} nodes")
+                    enrich_futures.append(enrich_pool.submit(enrich_stage, entry['ast_file'], record))
+                    
+                futures = {}
+                cache_keys = {}
+                for cs_file in cs_files:
+                    key, cached = self._fetch_cached_ast(cs_file, raw_dir)
+                    if cached is not None:
+                        entry, nodes_count, _, record = cached
+                        parsed(cs_file, entry, nodes_count, record)
+                        continue
+                    if key is not None:
+                        cache_keys[cs_file] = key
+                    futures[parse_pool.submit(_parse_one, cs_file, raw_dir)] = cs_file
+                    
+                for future in as_completed(futures):
+                    cs_file = futures[future]
+                    entry, nodes_count, error, record = future.result()
+                    if error:
+                        error_msg = f"Failed to parse {cs_file}: {error}"
+                        parse_errors.append(error_msg)
+                        logger.warning(error_msg)
+                        continue
+                    if cs_file in cache_keys:
+                        self.parse_cache.store(cache_keys[cs_file], record, nodes_count)
+                    parsed(cs_file, entry, nodes_count, record)
+        finally:
+            shards.close()
+            load_queue.put(None)
+            loader.join()
+            if self.parse_cache:
+                self.parse_cache.save()
+                
+        enriched_files, enrich_errors = [], []
+        for future in enrich_futures:
+            entry, error_msg = future.result()
+            if error_msg:
+                enrich_errors.append(error_msg)
+            elif entry is not None:
+                enriched_files.append(entry)
+        self.stats['errors'].extend(parse_errors + enrich_errors + load_errors)
+            
+        if not parsed_files:
+            error_msg = "Enrich phase failed: No ASTs were produced by the parse phase"
+            self.stats['errors'].append(error_msg)
+            logger.error(error_msg)
+            raise ETLPipelineError(error_msg)
+            
+        self.stats['files_processed'] = len(parsed_files)
+        self.stats['total_nodes_parsed'] = total_parsed
+        self.stats['parsed_files'] = parsed_files
+        self.stats['phases_completed'].append('parse')
+        self.stats['files_enriched'] = len(enriched_files)
+        self.stats['total_nodes_enriched'] = sum(entry['nodes_enriched'] for entry in enriched_files)
+        self.stats['enriched_files'] = enriched_files
+        self.stats['phases_completed'].append('enrich')
+        if load_failures:
+            error_msg = f"Load phase failed: {load_failures[0]}"
+            self.stats['errors'].append(error_msg)
+            raise ETLPipelineError(error_msg) from load_failures[0]
+        self.stats['files_loaded'] = len(loaded_files)
+        self.stats['loaded_files'] = loaded_files
+        self.stats['phases_completed'].append('load')
+        
+        logger.info(f"Phases 2-4: Parse/Enrich/Load - Completed ({len(parsed_files)} parsed, "
+                    f"{len(enriched_files)} enriched, {len(loaded_files)} loaded)")
+        
     def _load_phase(self) -> None:
         """Phase 4: Load enriched data into Neo4j"""
         logger.info("Phase 4: Load - Starting")
+        from .insert_graph import ingest_enriched_batch, ingest_session
         
         try:
-            # Find all enriched JSON files
-            enriched_files = list(self.dirs['curated'].glob('*_enriched.json'))
+            # Hand this run's enriched documents over in memory; read the
+            # curated directory only when enrichment was skipped
+            curated_dir = self.dirs['curated']
+            documents = {
+                curated_dir / entry['enriched_file']: entry['enrichment_result']
+                for entry in self.stats.get('enriched_files', [])
+            }
+            if documents:
+                enriched_files = list(documents)
+            else:
+                enriched_files = list(curated_dir.glob('*_enriched.json'))
             
             if not enriched_files:
                 raise ETLPipelineError("No enriched JSON files found in curated directory")
                 
             logger.info(f"Found {len(enriched_files)} enriched files to load into Neo4j")
             
-            # Load each enriched file into Neo4j
-            loaded_files = []
+            # Load all enriched files together; rows from many files share
+            # one UNWIND query and transaction instead of one call per file
+            with ingest_session():
+                loaded = ingest_enriched_batch(enriched_files, documents=documents)
+            loaded_files = [enriched_file.name for enriched_file in loaded]
             
-            for enriched_file in enriched_files:
-                try:
-                    # Use the insert_graph module to load into Neo4j
-                    ingest_enriched_json(str(enriched_file))
-                    
-                    loaded_files.append(enriched_file.name)
-                    logger.info(f"Loaded {enriched_file.name} into Neo4j")
-                    
-                except Exception as e:
-                    error_msg = f"Failed to load {enriched_file}: {e}"
-                    self.stats['errors'].append(error_msg)
-                    logger.warning(error_msg)
-                    continue
+            for enriched_file in set(enriched_files).difference(loaded):
+                error_msg = f"Failed to load {enriched_file}"
+                self.stats['errors'].append(error_msg)
+                logger.warning(error_msg)
                     
             self.stats['files_loaded'] = len(loaded_files)
             self.stats['loaded_files'] = loaded_files
@@ -377,6 +956,7 @@ class ETLRunner:
     def _archive_phase(self) -> None:
         """Phase 5: Archive processed raw files"""
         logger.info("Phase 5: Archive - Starting")
+        from .archive import archive_processed_files
         
         try:
             # Archive all processed files from raw to archive directory
@@ -406,7 +986,7 @@ class ETLRunner:
         """Save ETL run statistics to logs directory"""
         try:
             # Use the centralized logging module to save ETL stats
-            log_file = log_etl_summary(self.run_id, self.stats)
+            log_file = log_etl_summary(self.run_id, self.stats, log_dir=self.log_dir)
             
             if log_file:
                 logger.info(f"ETL run statistics saved to: {log_file}")
@@ -417,7 +997,10 @@ class ETLRunner:
 
 def run_etl_pipeline(input_path: Optional[str] = None,
                     output_base: Optional[str] = None, 
-                    skip_phases: Optional[List[str]] = None) -> Dict:
+                    skip_phases: Optional[List[str]] = None,
+                    use_cache: bool = True,
+                    staging_tmpfs: bool = False,
+                    log_dir: Optional[str] = None) -> Dict:
     """
     Convenience function to run the complete ETL pipeline
     
@@ -425,13 +1008,19 @@ def run_etl_pipeline(input_path: Optional[str] = None,
         input_path: Path to input zip/folder (defaults to input_code/)
         output_base: Base directory for outputs (defaults to project root)
         skip_phases: List of phases to skip ['extract', 'parse', 'enrich', 'load', 'archive']
+        use_cache: Reuse ASTs of unchanged C# files from previous runs
+        staging_tmpfs: Stage AST JSON in /dev/shm for this run only
+        log_dir: Directory for the run summary (defaults to the shared logs/etl/)
         
     Returns:
         Dict: ETL execution statistics and results
     """
     runner = ETLRunner(input_path=input_path, 
                       output_base=output_base,
-                      skip_phases=skip_phases)
+                      skip_phases=skip_phases,
+                      use_cache=use_cache,
+                      staging_tmpfs=staging_tmpfs,
+                      log_dir=log_dir)
     return runner.run()
 
 
@@ -468,6 +1057,14 @@ def main():
         "--skip-archive", action="store_true",
         help="Skip the archive phase (keep files in raw/ directory)"
     )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="Re-parse every C# file instead of reusing ASTs from previous runs"
+    )
+    parser.add_argument(
+        "--staging-tmpfs", action="store_true",
+        help="Write AST JSON to /dev/shm instead of staging/ast (discarded after the run)"
+    )
     parser.add_argument(
         "--dry-run", action="store_true",
         help="Skip all phases except extract (useful for testing)"
@@ -506,7 +1103,9 @@ def main():
         result = run_etl_pipeline(
             input_path=args.input,
             output_base=args.output_base,
-            skip_phases=skip_phases
+            skip_phases=skip_phases,
+            use_cache=not args.no_cache,
+            staging_tmpfs=args.staging_tmpfs
         )
         
         # Print summary
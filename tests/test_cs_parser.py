@@ -4,6 +4,9 @@ import json
 import sys
 import pytest
 import logging
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
 from pipeline.cs_parser import parse_cs_file, serialize_to_json
 logger = logging.getLogger("csharp-parser")
 
@@ -11,6 +14,89 @@ logger = logging.getLogger("csharp-parser")
 RAW_INPUT_DIR = os.path.join("raw") 
 OUTPUT_DIR = os.path.join("staging")
 
+# Node types that make a parsed file count as valid
+_VALID_ENTITY_TYPES = frozenset({"Class", "Interface", "Enum"})
+
+
+@dataclass
+class AstSummary:
+    """What the test checks about one parsed file."""
+    classes: list = field(default_factory=list)
+    interfaces: int = 0
+    has_valid_entity: bool = False
+
+
+def _walk_ast(nodes):
+    """
+    Summarize an AST in a single iterative pass.
+    
+    Node lists are taken from an explicit stack rather than by recursion;
+    nested entities only appear under "body", so that is the only key
+    followed.
+    """
+    summary = AstSummary()
+    stack = deque([nodes])
+    while stack:
+        for node in stack.pop():
+            if not isinstance(node, dict):
+                continue
+            node_type = node.get("type")
+            if node_type in _VALID_ENTITY_TYPES:
+                summary.has_valid_entity = True
+                if node_type == "Class":
+                    summary.classes.append(node)
+                elif node_type == "Interface":
+                    summary.interfaces += 1
+            body = node.get("body")
+            if isinstance(body, list):
+                stack.append(body)
+    return summary
+
+
+def _scan_cs_files(root_dir):
+    """
+    Yield all .cs file paths under root_dir.
+    
+    Uses os.scandir, whose entries already know whether they are
+    directories, instead of stat-ing every path; directories still to be
+    scanned are kept on an explicit stack.
+    """
+    pending = [root_dir]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.name.endswith(".cs"):
+                    yield entry.path
+
+
+def _collect_all_cs_files(root_dir):
+    """
+    Return every .cs file under root_dir: subdirectories first, in name
+    order, then the files directly inside root_dir.
+    """
+    if not os.path.isdir(root_dir):
+        return []
+    subdirectories = []
+    root_files = []
+    with os.scandir(root_dir) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirectories.append(entry.path)
+            elif entry.name.endswith('.cs'):
+                root_files.append(entry.path)
+    cs_files = []
+    for subdir in sorted(subdirectories):
+        # Sorted so every xdist worker collects the same test ids in the same order
+        cs_files.extend(sorted(_scan_cs_files(subdir)))
+    return cs_files + sorted(root_files)
+
+
+# One test case per file, so pytest-xdist (pytest -n auto) spreads them over cores
+_ALL_CS = _collect_all_cs_files(RAW_INPUT_DIR)
+
+
 class TestCSharpParser:
     @pytest.fixture(autouse=True)
     def setup(self):
@@ -18,147 +104,32 @@ class TestCSharpParser:
         self.output_dir = OUTPUT_DIR
         os.makedirs(self.output_dir, exist_ok=True)
         
-    def test_parse_and_serialize(self):
+    @pytest.mark.parametrize("cs_path", _ALL_CS, ids=lambda path: os.path.relpath(path, RAW_INPUT_DIR))
+    def test_parse_one_file(self, cs_path):
         """
-        Test parsing and serialization for all .cs files in the raw input directory.
+        Test parsing and serialization of one .cs file from the raw input directory.
 
-        It walks through subdirectories and:
-        - Parses each .cs file
+        - Parses the .cs file
         - Validates the AST
-        - Saves a JSON file for each .cs file
+        - Saves a JSON file for it
         """
+        relative_path = os.path.relpath(cs_path, self.input_dir)
+        output_path = Path(self.output_dir, relative_path).with_suffix(".json")
+        output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        logger.info(f"Scanning directory: {self.input_dir}")
-        # First, identify all subdirectories
-        subdirectories = []
-        root_files = []
-        for entry in os.listdir(self.input_dir):
-            full_path = os.path.join(self.input_dir, entry)
-            if os.path.isdir(full_path):
-                subdirectories.append(full_path)
-            elif entry.endswith('.cs'):
-                root_files.append(full_path)
-        for subdir in sorted(subdirectories):
-            subdir_files = self._get_all_cs_files(subdir)
-            self._process_files(subdir_files)
-    
-        # Then process root-level files
-        self._process_files(sorted(root_files))
-       
-    def _process_files(self, files):
-        """
-        Process a list of .cs files by parsing them and serializing to JSON.
-        """
-        for file_path in files:
-            relative_path = os.path.relpath(file_path, self.input_dir)
-            output_path = os.path.join(self.output_dir, relative_path.replace(".cs", ".json"))
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-            logger.info(f"Parsing file: {file_path}")
-            try:
-                ast_nodes = parse_cs_file(file_path)
-                assert isinstance(ast_nodes, list)
-            
-                # Validate AST contains expected structures
-                if ast_nodes:
-                    entity = self._find_any_valid_entity(ast_nodes)
-                    assert entity, f"No valid entities found in {file_path}"
-                
-                    classes = self._find_all_classes(ast_nodes)
-                    interfaces = self._count_interfaces(ast_nodes)
-                
-                    logger.info(f"File {relative_path}: {len(classes)} classes parsed")
-                    if interfaces:
-                        logger.info(f"File {relative_path}: {interfaces} interfaces parsed")
-                
-                    # Serialize the AST to JSON
-                    serialize_to_json(ast_nodes, output_path)
-                else:
-                    logger.warning(f"No AST nodes found for {file_path}")
-            except Exception as e:
-                logger.error(f"Error processing {file_path}: {e}")
-                raise
-
-    def _get_all_cs_files(self, root_dir):
-        """
-        Walk through root_dir and return all .cs file paths.
-        """
-        cs_files = []
-        # First process subdirectory files
-        for root, dirs, files in os.walk(root_dir):
-            for file in files:
-                if file.endswith(".cs"):
-                    cs_files.append(os.path.join(root, file))
-        return cs_files
-    
-    def _find_any_class(self, nodes):
-        """
-        Recursively search for any class node in the AST.
-        Returns True if at least one class is found.
-        """
-        try:
-            for node in nodes:
-                try:
-                    if node.get("type") == "Class":
-                        return True
-                    if "body" in node and isinstance(node["body"], list):
-                        if self._find_any_class(node["body"]):
-                            return True
-                except Exception as e:
-                    logger.error(f"Error processing node in _find_any_class: {str(e)}")
-                    continue
-            return False
-        except Exception as e:
-            logger.error(f"Error in _find_any_class: {str(e)}")
-            return False
-
-    def _find_all_classes(self, nodes):
-        """
-        Recursively find all class nodes in the AST.
-        Returns a list of all class nodes found.
-        """
-        classes = []
-        try:
-            for node in nodes:
-                try:
-                    if node.get("type") == "Class":
-                        classes.append(node)
-                    # If the node has a "body" key with nested nodes, recurse into it
-                    if "body" in node and isinstance(node["body"], list):
-                        classes.extend(self._find_all_classes(node["body"]))
-                except Exception as e:
-                    logger.error(f"Error processing node in _find_all_classes: {str(e)}")
-                    continue
-            return classes
-        except Exception as e:
-            logger.error(f"Error in _find_all_classes: {str(e)}")
-            return classes
-    def _find_any_valid_entity(self, nodes):
-        """
-        Find any class or interface in the AST nodes.
-        """
-        if isinstance(nodes, list):
-            for node in nodes:
-                if not isinstance(node, dict):
-                    continue
-                if node.get("type") in ["Class", "Interface","Enum"]:
-                    return True
-                for value in node.values():
-                    if isinstance(value, list):
-                        if self._find_any_valid_entity(value):
-                            return True
-        return False
-    def _count_interfaces(self, nodes):
-        """
-        Count the number of interfaces in the AST nodes.
-        """
-        count = 0
-        if isinstance(nodes, list):
-            for node in nodes:
-                if isinstance(node, dict):
-                    if node.get("type") == "Interface":
-                        count += 1
-                    # Check in body if it exists
-                    if "body" in node and isinstance(node["body"], list):
-                        count += self._count_interfaces(node["body"])
-        return count
\ No newline at end of file
+        logger.info(f"Parsing file: {cs_path}")
+        ast_nodes = parse_cs_file(cs_path)
+        assert isinstance(ast_nodes, list)
+        if not ast_nodes:
+            logger.warning(f"No AST nodes found for {cs_path}")
+            return
+
+        # Validate AST contains expected structures
+        summary = _walk_ast(ast_nodes)
+        assert summary.has_valid_entity, f"No valid entities found in {cs_path}"
+
+        # Serialize the AST to JSON
+        serialize_to_json(ast_nodes, str(output_path))
+        logger.info(f"File {relative_path}: {len(summary.classes)} classes parsed")
+        if summary.interfaces:
+            logger.info(f"File {relative_path}: {summary.interfaces} interfaces parsed")
@@ -9,6 +9,23 @@ import pytest
 from unittest import mock
 from pipeline import enrich
 
+@pytest.fixture(autouse=True)
+def isolated_enrich_cache(tmp_path, monkeypatch):
+    """Point the enrichment cache at a per-test directory.
+    
+    Keeps tests from reading or writing the developer's real .enrich_cache.
+    Settings a test changes through monkeypatch are undone with it.
+    
+    Yields:
+        Path: The cache directory used by the test
+    """
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("ENRICH_CACHE_DIR", str(cache_dir))
+    enrich.refresh_mock_mode()
+    yield cache_dir
+    monkeypatch.undo()
+    enrich.refresh_mock_mode()
+
 @pytest.fixture
 def sample_ast():
     """Provide a minimal sample AST for testing.
@@ -52,13 +69,18 @@ def test_build_prompt_reads_template_and_inserts_ast(tmp_path, sample_ast):
     template_content = "Prompt with AST: {{AST_JSON}}"
     template_path.write_text(template_content, encoding="utf-8")
     
-    # Mock the open function to return our template content
-    with mock.patch("builtins.open", mock.mock_open(read_data=template_content)):
-        prompt = enrich.build_prompt(sample_ast)
-        # Verify placeholder was replaced
-        assert "{{AST_JSON}}" not in prompt
-        # Verify AST content was inserted
-        assert "MyClass" in prompt
+    # Mock the open function to return our template content; templates are
+    # cached per process, so the mocked one must not outlive this test
+    enrich._load_prompt_template.cache_clear()
+    try:
+        with mock.patch("builtins.open", mock.mock_open(read_data=template_content)):
+            prompt = enrich.build_prompt(sample_ast)
+            # Verify placeholder was replaced
+            assert "{{AST_JSON}}" not in prompt
+            # Verify AST content was inserted
+            assert "MyClass" in prompt
+    finally:
+        enrich._load_prompt_template.cache_clear()
 
 def test_call_llm_success(sample_ast, sample_llm_response):
     """Test successful LLM API call.
@@ -72,10 +94,10 @@ def test_call_llm_success(sample_ast, sample_llm_response):
         sample_llm_response: fixture providing a mock LLM response
     """
     # Mock the HTTP POST request to LLM service
-    with mock.patch("pipeline.enrich.requests.post") as mock_post:
+    with mock.patch.object(enrich._SESSION, "post") as mock_post:
         # Configure mock to return a successful response
         mock_post.return_value.status_code = 200
-        mock_post.return_value.json.return_value = sample_llm_response
+        mock_post.return_value.content = json.dumps(sample_llm_response).encode("utf-8")
         
         # Mock build_prompt to avoid template dependencies
         with mock.patch("pipeline.enrich.build_prompt", return_value="prompt"):
@@ -83,6 +105,65 @@ def test_call_llm_success(sample_ast, sample_llm_response):
             # Verify response structure
             assert "response" in resp
 
+def test_call_llm_reuses_cached_response(sample_ast, sample_llm_response):
+    """Test that a second call with an identical AST is answered from the cache.
+    
+    Args:
+        sample_ast: fixture providing a sample AST object
+        sample_llm_response: fixture providing a mock LLM response
+    """
+    with mock.patch.object(enrich._SESSION, "post") as mock_post, \
+         mock.patch("pipeline.enrich.build_prompt", return_value="prompt"):
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.content = json.dumps(sample_llm_response).encode("utf-8")
+        first = enrich.call_llm(sample_ast)
+        second = enrich.call_llm(sample_ast)
+    
+    assert mock_post.call_count == 1
+    assert second["response"] == first["response"]
+
+
+def test_call_llm_does_not_cache_unusable_response(sample_ast):
+    """Test that a reply which does not parse is not served from the cache.
+    
+    This test verifies that an identical AST is sent to the LLM again when
+    the previous reply was a refusal rather than an analysis.
+    """
+    with mock.patch.object(enrich._SESSION, "post") as mock_post, \
+         mock.patch("pipeline.enrich.build_prompt", return_value="prompt"):
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.content = json.dumps({"response": "I'm sorry, no code was given"}).encode("utf-8")
+        enrich.call_llm(sample_ast)
+        enrich.call_llm(sample_ast)
+    
+    assert mock_post.call_count == 2
+
+
+def test_call_llm_splits_oversized_single_namespace(monkeypatch, sample_llm_response):
+    """Test that an oversized file with one top-level namespace is split.
+    
+    This test verifies that the classes inside a lone namespace are sent in
+    separate LLM calls when the whole file does not fit the prompt budget.
+    """
+    monkeypatch.setenv("LLM_CTX_BYTES", "300")
+    enrich.refresh_mock_mode()
+    ast_nodes = [
+        {"type": "Namespace", "name": "Shop", "body": [
+            {"type": "Class", "name": name, "body": [], "modifiers": ["public"] * 10}
+            for name in ("OrderService", "CustomerService")
+        ]}
+    ]
+    
+    with mock.patch.object(enrich._SESSION, "post") as mock_post, \
+         mock.patch("pipeline.enrich.build_prompt", side_effect=lambda nodes: json.dumps(nodes)):
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.content = json.dumps(sample_llm_response).encode("utf-8")
+        result = enrich.call_llm(ast_nodes)
+    
+    assert mock_post.call_count == 2
+    assert enrich.extract_enriched_data(result)["summary"]
+
+
 def test_extract_enriched_data_success(sample_llm_response):
     """Test extracting data from a successful LLM response.
     
@@ -140,4 +221,163 @@ def test_enrich_ast_pipeline(tmp_path, sample_ast, sample_llm_response):
         
         # Verify returned data structure
         assert result["summary"] == "This is a sample class."
-        assert "ast" in result
\ No newline at end of file
+        assert "ast" in result
+
+
+def test_extract_chunks_handles_nested_namespaces_and_classes():
+    """Test that chunk extraction finds classes at any nesting depth.
+    
+    This test verifies that:
+    1. Classes inside nested namespaces are extracted
+    2. Nested classes are extracted with their own methods
+    3. Method chunks carry the name of their declaring class
+    """
+    ast_nodes = [
+        {"type": "Namespace", "name": "Outer", "body": [
+            {"type": "Namespace", "name": "Inner", "body": [
+                {"type": "Class", "name": "Service", "body": [
+                    {"type": "Method", "name": "Run"},
+                    {"type": "Class", "name": "Options", "body": [
+                        {"type": "Method", "name": "Validate"}
+                    ]}
+                ]}
+            ]}
+        ]}
+    ]
+    
+    chunks = enrich.extract_chunks(ast_nodes)
+    
+    class_names = [c["name"] for c in chunks["class_chunks"]]
+    assert class_names == ["Service", "Options"]
+    assert chunks["class_chunks"][0]["method_names"] == ["Run"]
+    assert [(m["class_name"], m["method"]["name"]) for m in chunks["method_chunks"]] == [
+        ("Service", "Run"),
+        ("Options", "Validate"),
+    ]
+    assert [c["qualifiedName"] for c in chunks["class_chunks"]] == [
+        "Outer.Inner.Service",
+        "Outer.Inner.Service.Options",
+    ]
+
+
+def test_enrich_ast_substitutes_nested_classes(tmp_path):
+    """Test that enriched classes replace the originals at any nesting depth.
+    
+    This test verifies that:
+    1. Classes in nested namespaces and nested classes are enriched in place
+    2. Non-method members of an enriched class are kept
+    3. Same-named classes in different namespaces are kept apart
+    """
+    ast_nodes = [
+        {"type": "Namespace", "name": "Outer", "body": [
+            {"type": "Namespace", "name": "Inner", "body": [
+                {"type": "Class", "name": "Service", "body": [
+                    {"type": "Property", "name": "Timeout"},
+                    {"type": "Method", "name": "Run", "returnType": "void"},
+                    {"type": "Class", "name": "Options", "body": [
+                        {"type": "Method", "name": "Validate", "returnType": "bool"}
+                    ]}
+                ]}
+            ]},
+            {"type": "Class", "name": "Options", "body": [
+                {"type": "Method", "name": "Load", "returnType": "void"}
+            ]}
+        ]}
+    ]
+    
+    with mock.patch("pipeline.enrich.is_mock_mode", return_value=True):
+        result = enrich.enrich_ast(ast_nodes, str(tmp_path / "enriched.json"))
+    
+    inner, outer_options = result["ast"][0]["body"]
+    service = inner["body"][0]
+    assert "enrichment" in service
+    assert [item["name"] for item in service["body"]] == ["Timeout", "Run", "Options"]
+    assert "enrichment" in service["body"][1]
+    nested_options = service["body"][2]
+    assert nested_options["qualifiedName"] == "Outer.Inner.Service.Options"
+    assert [m["name"] for m in nested_options["body"]] == ["Validate"]
+    assert outer_options["qualifiedName"] == "Outer.Options"
+    assert [m["name"] for m in outer_options["body"]] == ["Load"]
+    assert result["processing_info"]["classes_processed"] == 3
+
+
+def test_extract_enriched_data_repairs_malformed_json():
+    """Test that malformed LLM JSON is repaired instead of discarded.
+    
+    This test verifies that a response with leading prose and a missing
+    comma between properties is still parsed into enrichment data.
+    """
+    malformed = {
+        "response": 'Here is the JSON: {"summary": "Handles orders" "tags": ["service"]}'
+    }
+    
+    enriched = enrich.extract_enriched_data(malformed)
+    
+    assert enriched["summary"] == "Handles orders"
+    assert enriched["tags"] == ["service"]
+    assert enriched["dependencies"] == []
+
+def test_enrich_method_skips_llm_for_trivial_methods():
+    """Test that accessors and abstract methods never reach the LLM.
+    
+    This test verifies that trivial methods get canned enrichment and that
+    call_llm_with_retry is not invoked for them.
+    """
+    getter = {"type": "Method", "name": "get_Name", "returnType": "string", "modifiers": ["public"]}
+    abstract = {"type": "Method", "name": "Execute", "returnType": "void", "modifiers": ["public", "abstract"]}
+    
+    with mock.patch("pipeline.enrich.is_mock_mode", return_value=False), \
+         mock.patch("pipeline.enrich.call_llm_with_retry") as mock_llm:
+        enriched_getter = enrich.enrich_method("Customer", getter)
+        enriched_abstract = enrich.enrich_method("Command", abstract)
+    
+    mock_llm.assert_not_called()
+    assert "getter" in enriched_getter["enrichment"]["tags"]
+    assert "abstract" in enriched_abstract["enrichment"]["tags"]
+    assert enriched_getter["name"] == "get_Name"
+
+def test_enrich_ast_reuses_unchanged_classes(tmp_path):
+    """Test that a second run over an unchanged AST makes no enrichment calls.
+    
+    This test verifies that enriched classes are recorded per output file and
+    reused on the next run when neither the class nor its methods changed.
+    """
+    ast_nodes = [
+        {"type": "Class", "name": "OrderService", "body": [
+            {"type": "Method", "name": "PlaceOrder", "returnType": "void", "modifiers": ["public"]}
+        ]}
+    ]
+    output_path = tmp_path / "enriched.json"
+    class_meta = {"summary": "Places orders", "tags": ["service"], "dependencies": []}
+    
+    with mock.patch("pipeline.enrich.enrich_class", return_value=class_meta) as mock_class, \
+         mock.patch("pipeline.enrich.enrich_method", side_effect=lambda c, m: {**m, "enrichment": {}}):
+        first = enrich.enrich_ast(ast_nodes, str(output_path))
+        second = enrich.enrich_ast(ast_nodes, str(output_path))
+    
+    assert mock_class.call_count == 1
+    assert second["ast"] == first["ast"]
+
+def test_enrich_method_batch_makes_one_llm_call():
+    """Test that a batch of methods is enriched with a single LLM request.
+    
+    This test verifies that the JSON array returned by the LLM is matched
+    back to the methods in order, and that trivial methods stay out of it.
+    """
+    chunks = [
+        {"class_name": "OrderService", "method": {"type": "Method", "name": name, "returnType": "void"}}
+        for name in ("PlaceOrder", "get_Total", "CancelOrder")
+    ]
+    llm_response = {"response": json.dumps([
+        {"summary": "Places an order", "tags": ["order"], "dependencies": []},
+        {"summary": "Cancels an order", "tags": ["order"], "dependencies": []}
+    ])}
+    
+    with mock.patch("pipeline.enrich.is_mock_mode", return_value=False), \
+         mock.patch("pipeline.enrich.call_llm_with_retry", return_value=llm_response) as mock_llm:
+        enriched = enrich.enrich_method_batch(chunks)
+    
+    assert mock_llm.call_count == 1
+    assert [m["enrichment"]["summary"] for m in enriched] == [
+        "Places an order", "Property getter", "Cancels an order"
+    ]
@@ -1,23 +1,23 @@
 """Tests for the graph insertion module."""
 import os
-import json
-import tempfile
+import orjson
 import pytest
 from pipeline.insert_graph import ingest_enriched_json
-from pipeline.models import CodeEntity
 from pathlib import Path
 from neomodel import db 
 
+# Labels the ingestion writes; clearing only these uses the label indexes and
+# leaves unrelated data in the database alone
+INGESTED_LABELS = ("CodeEntity", "File", "Module", "Project")
 
-@pytest.fixture(autouse=True)
-def clean_neo4j_before_each_test():
-    db.cypher_query("MATCH (n) DETACH DELETE n")
-    yield
 
 @pytest.fixture(scope="module")
-def sample_project_folder():
+def sample_project_documents():
     """
-    Read and return path to a sample enriched JSON file from the enriched output folder.
+    Read the sample enriched JSON files from the curated folder once.
+
+    Returns the parsed documents keyed by file path, which ingest_enriched_json
+    accepts in place of the folder.
     """
    
     # Use the actual path to the existing cli_enriched.json file
@@ -26,15 +26,26 @@ def sample_project_folder():
 
     assert curated_folder.exists() and curated_folder.is_dir(), f"Curated folder {curated_folder} not found"
 
-    return str(curated_folder)
+    return {path: orjson.loads(path.read_bytes()) for path in sorted(curated_folder.glob("*.json"))}
+
+@pytest.fixture(scope="module")
+def ingested_graph(sample_project_documents):
+    """
+    Clear previously ingested nodes and ingest the sample project once for
+    the whole module.
+
+    The tests below only query the graph, so they share a single ingestion.
+    """
+    for label in INGESTED_LABELS:
+        db.cypher_query(f"MATCH (n:{label}) DETACH DELETE n")
+    ingest_enriched_json(sample_project_documents)
+    yield
+
 class TestGraphIngestion:
 
-    def test_ingest_json(self, sample_project_folder):
+    def test_ingest_json(self, ingested_graph):
         """Test that a File node is created and connected to the class node using direct Neo4j queries."""
 
-
-        ingest_enriched_json(sample_project_folder)    # Get the base name of the file without extension
-        
         # Print what nodes exist for debugging
         print("\nNodes in database:")
         result, _ = db.cypher_query("MATCH (n) RETURN count(n)")
@@ -43,9 +54,7 @@ class TestGraphIngestion:
         result, _ = db.cypher_query("MATCH ()-[r]->() RETURN count(r)")
         assert result[0][0] > 0, "Relationships should be created"
 
-    def test_has_parameter_and_returns(self, sample_project_folder):
-        ingest_enriched_json(sample_project_folder)
-
+    def test_has_parameter_and_returns(self, ingested_graph):
         result, _ = db.cypher_query(
             """
             MATCH (m:CodeEntity)-[:HAS_PARAMETER]->(p:CodeEntity)
@@ -64,9 +73,7 @@ class TestGraphIngestion:
         )
         assert result[0][0] > 0, "RETURNS relationship should exist"
 
-    def test_query_capabilities(self, sample_project_folder):
-        ingest_enriched_json(sample_project_folder)
-
+    def test_query_capabilities(self, ingested_graph):
         result, _ = db.cypher_query(
             """
             MATCH (c:CodeEntity)-[:IMPLEMENTS]->(i:CodeEntity)